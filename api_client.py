@@ -1,183 +1,817 @@
 # frontend/api_client.py
 import requests
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Tuple, Union, Iterator, Iterable
 import json
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from datetime import date, datetime
+from urllib.parse import urlencode
+from local_cache import LocalCache
+from offline_queue import OfflineQueue, QueueReplayer
+from json_stream import iter_json_array
+from sync_engine import SyncEngine
+from records import loads, Subscriber, Payment, Admin
+from metrics import MetricsRecorder, RequestSample, TimedHTTPAdapter, endpoint_name
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+
+# Timeout de una petición: segundos totales o tupla (conexión, lectura)
+Timeout = Union[float, Tuple[float, float]]
+DEFAULT_TIMEOUT = (3.05, 30)
+# Tiempo máximo (segundos) que una respuesta precargada se considera vigente
+PRIMED_TTL = 60
+# Número máximo de respuestas guardadas para peticiones condicionales (ETag/Last-Modified)
+HTTP_CACHE_MAX_ENTRIES = 128
+# Tamaño de página por defecto para iter_payments
+DEFAULT_PAGE_SIZE = 500
+# Pagos enviados a la vez cuando el servidor no tiene endpoint de carga masiva
+DEFAULT_BULK_WORKERS = 4
+# Reenvíos de un lote de pagos cuya respuesta no llegó a tiempo (con la misma clave de idempotencia)
+BULK_RESENDS = 1
+# Tiempo total (segundos, incluidos reintentos) que puede tardar una petición
+DEFAULT_DEADLINE = 20.0
+# Reintentos de un GET ante fallos de conexión o 502/503/504, con espera aleatoria creciente
+GET_RETRIES = 2
+RETRY_BACKOFF_BASE = 0.25
+RETRY_BACKOFF_MAX = 2.0
+RETRY_STATUSES = (502, 503, 504)
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """Se agotó el plazo total de la operación antes de obtener respuesta."""
+
+class _InflightCall:
+    """Resultado compartido de una petición GET en curso."""
+    
+    def __init__(self):
+        self._done = threading.Event()
+        self._result = None
+        self._error: Optional[BaseException] = None
+    
+    def set_result(self, result):
+        self._result = result
+        self._done.set()
+    
+    def set_error(self, error: BaseException):
+        self._error = error
+        self._done.set()
+    
+    def wait(self):
+        self._done.wait()
+        if self._error is not None:
+            raise self._error
+        return self._result
 
 class APIClient:
     """Cliente para comunicarse con la API REST del backend."""
     
-    def __init__(self, base_url: str = "https://backend.aguaspl.site"):
+    def __init__(self, base_url: str = "https://backend.aguaspl.site",
+                 pool_size: int = 10,
+                 timeout: Timeout = DEFAULT_TIMEOUT,
+                 cache_path: Optional[str] = None,
+                 cache_ttls: Optional[Dict[str, float]] = None,
+                 queue_path: Optional[str] = None,
+                 replica_path: Optional[str] = None,
+                 deadline: Optional[float] = DEFAULT_DEADLINE,
+                 breaker: Optional[CircuitBreaker] = None):
         self.base_url = base_url.rstrip('/')
-        self.token: Optional[str] = None
-        self.user_data: Optional[Dict] = None
+        self.timeout = timeout
+        self.deadline_seconds = deadline
+        # Plazo activo por hilo (ver `deadline()`)
+        self._deadlines = threading.local()
+        # Circuito por endpoint: si el backend falla repetidamente se responde sin esperarlo
+        self.breaker = breaker or CircuitBreaker()
+        self._token: Optional[str] = None
+        self._user_data: Optional[Dict] = None
+        self._lock = threading.Lock()
+        # Respuestas precargadas (p. ej. por AsyncAPIClient al iniciar sesión)
+        self._primed: Dict[Tuple, object] = {}
+        # Caché de respuestas con sus validadores: clave -> (etag, last_modified, datos)
+        self._http_cache: "OrderedDict[Tuple, Tuple[Optional[str], Optional[str], object]]" = OrderedDict()
+        # Peticiones GET en curso (para compartir el resultado entre hilos) y contadores
+        self._inflight: Dict[Tuple, "_InflightCall"] = {}
+        self._coalesce_stats = {'requests': 0, 'deduplicated': 0}
+        # None: aún no se sabe si el servidor tiene POST /payments/bulk
+        self._bulk_supported: Optional[bool] = None
+        # Caché persistente en disco (opcional) para usuarios, pagos y administradores
+        self.local_cache: Optional[LocalCache] = LocalCache(cache_path, ttls=cache_ttls) if cache_path else None
+        
+        # Diario de escrituras pendientes (opcional): pagos y cambios de suscriptores
+        # se confirman localmente y se reenvían al recuperar la conexión
+        self.offline_queue: Optional[OfflineQueue] = None
+        self._replayer: Optional[QueueReplayer] = None
+        if queue_path:
+            self.offline_queue = OfflineQueue(queue_path)
+            self._replayer = QueueReplayer(
+                self.offline_queue,
+                send=self._send_queued,
+                # Con la sesión vencida (401) la entrada espera al próximo inicio de sesión
+                is_retryable=lambda exc: self._is_connection_error(exc) or self._is_auth_error(exc),
+                is_already_applied=lambda entry, exc: (entry['method'] == 'POST' and entry['path'] == '/payments/'
+                                                       and self._is_duplicate_error(exc)),
+                on_sent=lambda entry, result: self._invalidate(*entry['resources']),
+                can_send=lambda: self.token is not None,
+            )
+        
+        # Réplica local de suscriptores y pagos sincronizada por deltas (opcional)
+        self.sync: Optional[SyncEngine] = SyncEngine(self, replica_path) if replica_path else None
+        
+        # Tiempos por endpoint y fase (conexión, primer byte, transferencia, decodificación)
+        self.metrics = MetricsRecorder()
+        
+        # Sesión compartida con pool de conexiones keep-alive (evita un
+        # handshake TCP/TLS por cada petición)
+        self.session = requests.Session()
+        adapter = TimedHTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, pool_block=True)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        
+        # El replayer envía con la sesión y registra métricas: se inicia con todo listo
+        if self._replayer:
+            self._replayer.start()
+    
+    @property
+    def token(self) -> Optional[str]:
+        with self._lock:
+            return self._token
+    
+    @token.setter
+    def token(self, value: Optional[str]):
+        with self._lock:
+            self._token = value
+    
+    @property
+    def user_data(self) -> Optional[Dict]:
+        with self._lock:
+            return self._user_data
+    
+    @user_data.setter
+    def user_data(self, value: Optional[Dict]):
+        with self._lock:
+            self._user_data = value
+    
+    def _set_session(self, token: Optional[str], user_data: Optional[Dict]):
+        """Actualiza token y datos del usuario de forma atómica entre hilos."""
+        with self._lock:
+            self._token = token
+            self._user_data = user_data
     
     def _get_headers(self) -> Dict[str, str]:
         """Obtiene los headers para las peticiones, incluyendo el token si existe."""
         headers = {"Content-Type": "application/json"}
-        if self.token:
-            headers["Authorization"] = f"Bearer {self.token}"
+        token = self.token
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
         return headers
     
+    @contextmanager
+    def deadline(self, seconds: float):
+        """Limita a `seconds` el tiempo total de todas las peticiones hechas dentro del bloque.
+        
+        Los plazos anidados se combinan: rige el más cercano.
+        """
+        previous = getattr(self._deadlines, 'value', None)
+        limit = time.monotonic() + seconds
+        self._deadlines.value = limit if previous is None else min(previous, limit)
+        try:
+            yield
+        finally:
+            self._deadlines.value = previous
+    
+    def _current_deadline(self) -> Optional[float]:
+        """Instante (monotónico) en que vence la petición actual, o None si no tiene plazo."""
+        deadline = getattr(self._deadlines, 'value', None)
+        if deadline is None and self.deadline_seconds:
+            deadline = time.monotonic() + self.deadline_seconds
+        return deadline
+    
+    @staticmethod
+    def _bounded_timeout(timeout: Timeout, deadline: Optional[float]) -> Timeout:
+        """Recorta el timeout para no exceder el plazo restante."""
+        if deadline is None:
+            return timeout
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise DeadlineExceeded("Error de conexión: se agotó el tiempo de espera del servidor")
+        if isinstance(timeout, tuple):
+            return tuple(min(value, remaining) for value in timeout)
+        return min(timeout, remaining)
+    
+    @staticmethod
+    def _is_backend_unavailable(exc: Exception) -> bool:
+        """Fallo atribuible al servidor o a la red (no a la petición en sí)."""
+        if isinstance(exc, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+            return True
+        return (isinstance(exc, requests.exceptions.HTTPError) and exc.response is not None
+                and exc.response.status_code >= 500)
+    
+    def _request(self, method: str, path: str,
+                 timeout: Optional[Timeout] = None,
+                 sample: Optional[RequestSample] = None,
+                 **kwargs) -> requests.Response:
+        """Ejecuta una petición sobre la sesión compartida y valida el estado HTTP.
+        
+        Respeta el plazo activo (`deadline`) y el circuito del endpoint. Los GET
+        (idempotentes) se reintentan ante fallos de red o 502/503/504. Los tiempos
+        se registran en `self.metrics`; si se pasa `sample`, quien llama la
+        completa (p. ej. con la decodificación) y la registra.
+        """
+        owned = sample is None
+        if owned:
+            sample = self.metrics.start(method, path)
+        endpoint = endpoint_name(method, path)
+        deadline = self._current_deadline()
+        attempts = 1 + (GET_RETRIES if method == 'GET' else 0)
+        kwargs.setdefault('headers', self._get_headers())
+        
+        for attempt in range(attempts):
+            admitted = recorded = False
+            try:
+                # El plazo se revisa antes de pedir paso al circuito: uno vencido no ocupa la petición de prueba
+                request_timeout = self._bounded_timeout(timeout or self.timeout, deadline)
+                self.breaker.before_call(endpoint)
+                admitted = True
+                response = self.session.request(method, f"{self.base_url}{path}",
+                                                timeout=request_timeout, **kwargs)
+                sample.response_received(response, streamed=kwargs.get('stream', False))
+                response.raise_for_status()
+                self.breaker.record_success(endpoint)
+                recorded = True
+            except Exception as e:
+                failed = self._is_backend_unavailable(e) and not isinstance(e, (CircuitOpenError, DeadlineExceeded))
+                if failed and attempt < attempts - 1 and (
+                        not isinstance(e, requests.exceptions.HTTPError)
+                        or e.response.status_code in RETRY_STATUSES):
+                    delay = random.uniform(0, min(RETRY_BACKOFF_MAX, RETRY_BACKOFF_BASE * 2 ** attempt))
+                    if deadline is None or time.monotonic() + delay < deadline:
+                        self.breaker.record_retry(endpoint)
+                        recorded = True
+                        time.sleep(delay)
+                        continue
+                
+                if admitted and not failed and isinstance(e, requests.exceptions.HTTPError):
+                    # 4xx: el servidor respondió, el endpoint está disponible
+                    self.breaker.record_success(endpoint)
+                    recorded = True
+                if owned:
+                    sample.finish(e)
+                    self.metrics.record(sample)
+                raise
+            finally:
+                # Toda petición admitida por el circuito deja un resultado (también ante errores de
+                # decodificación); si no, la petición de prueba del semiabierto quedaría tomada
+                if admitted and not recorded:
+                    self.breaker.record_failure(endpoint)
+            if owned:
+                self.metrics.record(sample)
+            return response
+    
+    def _primed_key(self, path: str, params: Optional[Dict] = None) -> Tuple:
+        return (path, tuple(sorted((params or {}).items())))
+    
+    def prime(self, path: str, data, params: Optional[Dict] = None, ttl: float = PRIMED_TTL):
+        """Registra una respuesta ya descargada para la próxima petición GET igual.
+        
+        La respuesta se consume una sola vez; las siguientes peticiones vuelven al servidor.
+        """
+        with self._lock:
+            self._primed[self._primed_key(path, params)] = (data, time.monotonic() + ttl)
+    
+    @staticmethod
+    def _to_records(data, record_type: Optional[type]):
+        """Convierte el JSON decodificado en registros compactos (`records`) si se indica un tipo."""
+        if record_type is None:
+            return data
+        if isinstance(data, list):
+            return record_type.from_list(data)
+        if isinstance(data, dict):
+            return record_type.from_dict(data)
+        return data
+    
+    def _get_json(self, path: str, params: Optional[Dict] = None,
+                  timeout: Optional[Timeout] = None, resource: Optional[str] = None,
+                  record_type: Optional[type] = None):
+        """Ejecuta un GET y decodifica el JSON (como `record_type` si se indica).
+        
+        Orden de consulta: respuesta precargada, caché en disco vigente (si la
+        petición pertenece a un `resource` cacheable) y, por último, el servidor
+        con una petición condicional: si responde 304 se devuelve el cuerpo guardado.
+        """
+        sample = self.metrics.start('GET', path)
+        key = self._primed_key(path, params)
+        with self._lock:
+            primed = self._primed.pop(key, None)
+        if primed is not None and primed[1] > time.monotonic():
+            data = self._to_records(primed[0], record_type)
+            sample.cache = 'precargado'
+            sample.mark_decoded()
+            self.metrics.record(sample)
+            return data
+        
+        # Si otro hilo ya está pidiendo lo mismo, compartir su resultado en vez de repetir la petición
+        with self._lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _InflightCall()
+                self._coalesce_stats['requests'] += 1
+            else:
+                self._coalesce_stats['deduplicated'] += 1
+        if not leader:
+            sample.cache = 'compartido'
+            try:
+                return call.wait()
+            finally:
+                self.metrics.record(sample)
+        
+        try:
+            data = self._fetch_json(key, path, params, timeout, resource, record_type, sample)
+        except BaseException as e:
+            call.set_error(e)
+            sample.finish(e)
+            raise
+        else:
+            call.set_result(data)
+            return data
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            self.metrics.record(sample)
+    
+    def _fetch_json(self, key: Tuple, path: str, params: Optional[Dict], timeout: Optional[Timeout],
+                    resource: Optional[str], record_type: Optional[type], sample: RequestSample):
+        """Parte de `_get_json` que consulta las cachés y el servidor."""
+        with self._lock:
+            cached = self._http_cache.get(key)
+        
+        disk_key = None
+        entry = None
+        if resource and self.local_cache:
+            disk_key = f"{path}?{urlencode(sorted((params or {}).items()))}"
+            entry = self.local_cache.get(disk_key, resource)
+            if entry is not None:
+                if entry.fresh:
+                    sample.size = len(entry.body)
+                    if cached and cached[2] is not None:
+                        sample.cache = 'memoria'
+                        return cached[2]
+                    sample.cache = 'disco'
+                    data = self._to_records(loads(entry.body), record_type)
+                    sample.mark_decoded()
+                    return data
+                if not cached:
+                    cached = (entry.etag, entry.last_modified, None)
+        
+        headers = self._get_headers()
+        if cached:
+            etag, last_modified, _ = cached
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+        
+        try:
+            response = self._request('GET', path, params=params, headers=headers, timeout=timeout, sample=sample)
+        except requests.exceptions.RequestException as e:
+            # Backend caído o circuito abierto: servir la última respuesta guardada, aunque no esté vigente
+            if not self._is_backend_unavailable(e):
+                raise
+            if cached and cached[2] is not None:
+                sample.cache = 'obsoleto'
+                return cached[2]
+            if entry is not None:
+                sample.cache = 'obsoleto'
+                data = self._to_records(loads(entry.body), record_type)
+                sample.mark_decoded()
+                return data
+            raise
+        if response.status_code == 304 and cached:
+            sample.cache = '304'
+            data = cached[2]
+            if disk_key:
+                self.local_cache.touch(disk_key)
+                if data is None:
+                    data = self._to_records(loads(self.local_cache.get(disk_key, resource).body), record_type)
+                    sample.mark_decoded()
+            self._remember(key, cached[0], cached[1], data)
+            return data
+        
+        data = self._to_records(loads(response.content), record_type)
+        sample.mark_decoded()
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if disk_key:
+            self.local_cache.put(disk_key, resource, response.content, etag, last_modified)
+        if etag or last_modified:
+            self._remember(key, etag, last_modified, data)
+        else:
+            with self._lock:
+                self._http_cache.pop(key, None)
+        return data
+    
+    def coalesce_stats(self) -> Dict[str, int]:
+        """Devuelve cuántas peticiones GET se enviaron y cuántas se resolvieron compartiendo una en curso."""
+        with self._lock:
+            return dict(self._coalesce_stats)
+    
+    def _remember(self, key: Tuple, etag: Optional[str], last_modified: Optional[str], data):
+        """Guarda una respuesta decodificada en la caché en memoria (LRU)."""
+        with self._lock:
+            self._http_cache[key] = (etag, last_modified, data)
+            self._http_cache.move_to_end(key)
+            while len(self._http_cache) > HTTP_CACHE_MAX_ENTRIES:
+                self._http_cache.popitem(last=False)
+    
+    def _invalidate(self, *resources: str):
+        """Descarta las respuestas guardadas de los recursos modificados por una mutación."""
+        resource_paths = {'users': '/users/', 'payments': '/payments/', 'payment': '/payments/', 'admins': '/admins/'}
+        prefixes = tuple(resource_paths[r] for r in resources if r in resource_paths)
+        with self._lock:
+            for key in [k for k in self._http_cache if k[0].startswith(prefixes)]:
+                del self._http_cache[key]
+        if self.local_cache:
+            self.local_cache.invalidate(resources)
+        if self.sync:
+            self.sync.invalidate(resources)
+    
+    @staticmethod
+    def _is_connection_error(exc: Exception) -> bool:
+        """Indica si un error se debe a falta de conectividad (y por tanto se puede reintentar).
+        
+        Solo cuentan los fallos de red, los timeouts y los 502/503/504 (proxy o
+        backend reiniciándose). Un 401 o un 500 son respuestas del servidor y
+        se informan como error, no quedan pendientes.
+        """
+        if isinstance(exc, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+            return True
+        if isinstance(exc, requests.exceptions.HTTPError) and exc.response is not None:
+            return exc.response.status_code in RETRY_STATUSES
+        return False
+    
+    @staticmethod
+    def _is_auth_error(exc: Exception) -> bool:
+        """Indica si el servidor rechazó la petición por sesión vencida o inválida (401)."""
+        return (isinstance(exc, requests.exceptions.HTTPError) and exc.response is not None
+                and exc.response.status_code == 401)
+    
+    @staticmethod
+    def _is_duplicate_error(exc: Exception) -> bool:
+        """Indica si el servidor rechazó la operación porque ya estaba registrada."""
+        if isinstance(exc, requests.exceptions.HTTPError) and exc.response is not None:
+            if exc.response.status_code == 409:
+                return True
+            return "Ya existe" in exc.response.text
+        return False
+    
+    def _send_queued(self, entry: Dict):
+        """Envía una entrada del diario de escrituras con su clave de idempotencia."""
+        headers = self._get_headers()
+        headers["Idempotency-Key"] = entry['idempotency_key']
+        return self._request(entry['method'], entry['path'], json=entry['payload'], headers=headers).json()
+    
+    def _write(self, method: str, path: str, payload: Optional[Dict] = None,
+               resources: Tuple[str, ...] = (), dedup_key: Optional[str] = None,
+               timeout: Optional[Timeout] = None, journal: bool = True):
+        """Ejecuta una escritura e invalida las cachés de los recursos afectados.
+        
+        Con diario de escrituras activo, la operación se registra en disco antes
+        de enviarse. Si no hay conexión queda pendiente y se devuelve el payload
+        marcado con `estado_envio = 'pendiente'`; el replayer la reenviará.
+        Con `journal=False` (operaciones que no se pueden repetir sin riesgo) se
+        envía directamente y los errores de conexión llegan a quien llama.
+        """
+        if not self.offline_queue or not journal:
+            result = self._request(method, path, json=payload, timeout=timeout).json()
+            self._invalidate(*resources)
+            return result
+        
+        # El replayer no toca la entrada mientras se intenta el envío directo
+        key = self.offline_queue.enqueue(method, path, payload, resources, dedup_key, hold=120)
+        try:
+            headers = self._get_headers()
+            headers["Idempotency-Key"] = key
+            result = self._request(method, path, json=payload, headers=headers, timeout=timeout).json()
+        except Exception as e:
+            if self._is_connection_error(e):
+                self.offline_queue.mark_retry(key, str(e))
+                self._replayer.wake()
+                return {**(payload or {}), 'estado_envio': 'pendiente', 'idempotency_key': key}
+            self.offline_queue.mark_rejected(key, str(e))
+            raise
+        self.offline_queue.mark_sent(key, result)
+        self._invalidate(*resources)
+        return result
+    
+    def pending_writes(self, path_prefix: Optional[str] = None) -> List[Dict]:
+        """Devuelve las escrituras pendientes de envío (p. ej. `'/payments/'`)."""
+        if not self.offline_queue:
+            return []
+        return self.offline_queue.pending(path_prefix)
+    
     def _serialize_date(self, obj):
         """Serializa objetos date/datetime a string para JSON."""
         if isinstance(obj, (date, datetime)):
             return obj.isoformat()
         raise TypeError(f"Type {type(obj)} not serializable")
     
-    def login(self, usuario: str, clave: str) -> Dict:
+    def login(self, usuario: str, clave: str, timeout: Optional[Timeout] = None) -> Dict:
         """Inicia sesión y guarda el token."""
-        url = f"{self.base_url}/auth/login"
         data = {"usuario": usuario, "clave": clave}
         
         try:
-            response = requests.post(url, json=data, headers={"Content-Type": "application/json"})
-            response.raise_for_status()
+            response = self._request('POST', '/auth/login', json=data,
+                                     headers={"Content-Type": "application/json"}, timeout=timeout)
             
             result = response.json()
-            self.token = result["access_token"]
-            self.user_data = result["user_data"]
+            self._set_session(result["access_token"], result["user_data"])
+            if self._replayer:
+                self._replayer.wake()
             return result
         except requests.exceptions.RequestException as e:
             raise Exception(f"Error al iniciar sesión: {str(e)}")
     
     def logout(self):
         """Cierra la sesión y elimina el token."""
-        self.token = None
-        self.user_data = None
+        self._set_session(None, None)
+        with self._lock:
+            self._primed.clear()
+            self._http_cache.clear()
+    
+    def close(self):
+        """Cierra las conexiones abiertas del pool, la caché en disco y el diario de escrituras."""
+        # El replayer puede estar enviando o marcando una entrada: se espera antes de cerrar el diario
+        replayer_stopped = self._replayer.stop() if self._replayer else True
+        self.session.close()
+        if self.local_cache:
+            self.local_cache.close()
+        if self.offline_queue and replayer_stopped:
+            # Si no terminó a tiempo el diario queda abierto: la entrada en curso sigue
+            # pendiente y se reenvía la próxima vez que se abra
+            self.offline_queue.close()
+        if self.sync:
+            self.sync.close()
     
     # ========== USUARIOS ==========
     
-    def get_users(self, active_only: bool = False) -> List[Dict]:
-        """Obtiene todos los usuarios."""
-        url = f"{self.base_url}/users/?active_only={'true' if active_only else 'false'}"
-        response = requests.get(url, headers=self._get_headers())
-        response.raise_for_status()
-        return response.json()
+    def get_users(self, active_only: bool = False, updated_since: Optional[str] = None,
+                  timeout: Optional[Timeout] = None) -> List[Subscriber]:
+        """Obtiene todos los usuarios (o solo los modificados desde `updated_since`)."""
+        params = {'active_only': 'true' if active_only else 'false'}
+        if updated_since:
+            # Consulta incremental: siempre al servidor, sin pasar por la caché en disco
+            params['updated_since'] = updated_since
+            return self._get_json("/users/", params=params, timeout=timeout, record_type=Subscriber)
+        return self._get_json("/users/", params=params, timeout=timeout, resource='users', record_type=Subscriber)
     
-    def get_user(self, user_id: int) -> Dict:
+    def get_user(self, user_id: int, timeout: Optional[Timeout] = None) -> Subscriber:
         """Obtiene un usuario por ID."""
-        url = f"{self.base_url}/users/{user_id}"
-        response = requests.get(url, headers=self._get_headers())
-        response.raise_for_status()
-        return response.json()
+        return self._get_json(f"/users/{user_id}", timeout=timeout, resource='users', record_type=Subscriber)
     
-    def create_user(self, user_data: Dict) -> Dict:
+    def create_user(self, user_data: Dict, timeout: Optional[Timeout] = None) -> Dict:
         """Crea un nuevo usuario."""
-        url = f"{self.base_url}/users/"
-        response = requests.post(url, json=user_data, headers=self._get_headers())
-        response.raise_for_status()
-        return response.json()
+        return self._write('POST', "/users/", user_data, resources=('users',), timeout=timeout)
     
-    def update_user(self, user_id: int, user_data: Dict) -> Dict:
+    def update_user(self, user_id: int, user_data: Dict, timeout: Optional[Timeout] = None) -> Dict:
         """Actualiza un usuario."""
-        url = f"{self.base_url}/users/{user_id}"
-        response = requests.put(url, json=user_data, headers=self._get_headers())
-        response.raise_for_status()
-        return response.json()
-    
-    def toggle_user_status(self, user_id: int) -> Dict:
-        """Cambia el estado de un usuario."""
-        url = f"{self.base_url}/users/{user_id}/toggle-status"
-        response = requests.patch(url, headers=self._get_headers())
-        response.raise_for_status()
-        return response.json()
+        # Los pagos incluyen nombre y paja del suscriptor
+        return self._write('PUT', f"/users/{user_id}", user_data,
+                           resources=('users', 'payments', 'payment'), timeout=timeout)
+    
+    def toggle_user_status(self, user_id: int, timeout: Optional[Timeout] = None) -> Dict:
+        """Cambia el estado de un usuario.
+        
+        No pasa por el diario de escrituras: el servidor invierte el estado en cada
+        llamada, así que reenviar una cuyo resultado se perdió lo revertiría.
+        """
+        return self._write('PATCH', f"/users/{user_id}/toggle-status", resources=('users',), timeout=timeout,
+                           journal=False)
     
     # ========== PAGOS ==========
     
-    def get_payments(self, search: Optional[str] = None) -> List[Dict]:
+    def get_payments(self, search: Optional[str] = None, timeout: Optional[Timeout] = None) -> List[Payment]:
         """Obtiene todos los pagos."""
-        url = f"{self.base_url}/payments/"
         params = {}
         if search:
             params['search'] = search
-        response = requests.get(url, params=params, headers=self._get_headers())
-        response.raise_for_status()
-        return response.json()
+        return self._get_json("/payments/", params=params, timeout=timeout, resource='payments',
+                              record_type=Payment)
+    
+    def iter_payments(self, page_size: int = DEFAULT_PAGE_SIZE, search: Optional[str] = None,
+                      since_id: Optional[int] = None, updated_since: Optional[str] = None,
+                      timeout: Optional[Timeout] = None) -> Iterator[List[Payment]]:
+        """Recorre los pagos página por página (parámetros `skip`/`limit` del servidor).
+        
+        Cada respuesta se decodifica en streaming, por lo que la memoria usada
+        depende del tamaño de página y no del historial completo. Si el servidor
+        ignora la paginación, la lista completa se entrega igualmente en páginas
+        de `page_size` elementos. `since_id` / `updated_since` limitan la consulta
+        a los pagos nuevos o modificados (sincronización incremental).
+        """
+        skip = 0
+        first_id = None
+        while True:
+            params = {'skip': skip, 'limit': page_size}
+            if search:
+                params['search'] = search
+            if since_id is not None:
+                params['since_id'] = since_id
+            if updated_since:
+                params['updated_since'] = updated_since
+            sample = self.metrics.start('GET', "/payments/")
+            response = self._request('GET', "/payments/", params=params, stream=True, timeout=timeout,
+                                     sample=sample)
+            count = 0
+            page = []
+            try:
+                chunks = sample.count_chunks(response.iter_content(chunk_size=64 * 1024))
+                for payment in iter_json_array(chunks):
+                    if count == 0:
+                        if skip and payment.get('id_pago') == first_id:
+                            # El servidor devolvió de nuevo la primera página: no pagina
+                            return
+                        if not skip:
+                            first_id = payment.get('id_pago')
+                    count += 1
+                    page.append(payment)
+                    if len(page) == page_size:
+                        yield Payment.from_list(page)
+                        page = []
+            finally:
+                response.close()
+                self.metrics.record(sample)
+            if page:
+                yield Payment.from_list(page)
+            if count != page_size:
+                return
+            skip += page_size
     
-    def get_payment(self, payment_id: int) -> Dict:
+    def get_payment(self, payment_id: int, timeout: Optional[Timeout] = None) -> Payment:
         """Obtiene un pago por ID."""
-        url = f"{self.base_url}/payments/{payment_id}"
-        response = requests.get(url, headers=self._get_headers())
-        response.raise_for_status()
-        return response.json()
+        return self._get_json(f"/payments/{payment_id}", timeout=timeout, resource='payment', record_type=Payment)
     
-    def create_payment(self, payment_data: Dict) -> Dict:
+    def _serialize_payment(self, payment_data: Dict) -> Dict:
+        """Copia del pago con las fechas convertidas a string ISO (ver `_serialize_date`)."""
+        return {key: self._serialize_date(value) if isinstance(value, (date, datetime)) else value
+                for key, value in payment_data.items()}
+    
+    def create_payment(self, payment_data: Dict, timeout: Optional[Timeout] = None) -> Dict:
         """Crea un nuevo pago."""
-        url = f"{self.base_url}/payments/"
-        # Convertir fechas a string ISO
-        if 'fecha_pago' in payment_data and isinstance(payment_data['fecha_pago'], (date, datetime)):
-            payment_data['fecha_pago'] = payment_data['fecha_pago'].isoformat()
+        payment_data = self._serialize_payment(payment_data)
+        
+        # Un solo pago por suscriptor y mes, también entre los pendientes de envío
+        dedup_key = f"pago:{payment_data.get('id_usuario')}:{payment_data.get('mes_pagado')}"
+        return self._write('POST', "/payments/", payment_data, resources=('payments',),
+                           dedup_key=dedup_key, timeout=timeout)
+    
+    def create_payments_bulk(self, payments: Iterable[Dict],
+                             max_workers: int = DEFAULT_BULK_WORKERS,
+                             timeout: Optional[Timeout] = None) -> List[Dict]:
+        """Registra varios pagos y devuelve un resultado por cada uno, en el mismo orden.
+        
+        Usa `POST /payments/bulk` si el servidor lo ofrece; si no, envía los pagos
+        con `create_payment` manteniendo como máximo `max_workers` peticiones en
+        curso. Un pago duplicado ("Ya existe") o inválido no detiene al resto.
+        Cada resultado es un dict con `index`, `ok`, `data`, `error` y `duplicate`.
         
-        response = requests.post(url, json=payment_data, headers=self._get_headers())
-        response.raise_for_status()
-        return response.json()
+        Solo se reparte pago por pago si el lote no llegó a enviarse (sin
+        conexión) o si el servidor no tiene el endpoint (404/405). Si el lote se
+        envió pero la respuesta no llegó a tiempo, se reenvía con la misma clave
+        de idempotencia; cualquier otro error se informa en cada resultado.
+        """
+        payments = [self._serialize_payment(payment) for payment in payments]
+        if not payments:
+            return []
+        
+        if self._bulk_supported is not False:
+            key = str(uuid.uuid4())
+            for attempt in range(1 + BULK_RESENDS):
+                try:
+                    return self._create_payments_batch(payments, key, timeout)
+                except requests.exceptions.ReadTimeout as e:
+                    # El servidor pudo haber aplicado el lote: nunca se reparte pago por pago
+                    if attempt == BULK_RESENDS:
+                        return self._bulk_error_results(len(payments), e)
+                except requests.exceptions.HTTPError as e:
+                    if attempt > 0 or e.response is None or e.response.status_code not in (404, 405):
+                        return self._bulk_error_results(len(payments), e)
+                    self._bulk_supported = False
+                    break
+                except (requests.exceptions.ConnectionError, DeadlineExceeded) as e:
+                    if attempt > 0:
+                        return self._bulk_error_results(len(payments), e)
+                    # Sin conexión o ConnectTimeout (el lote no salió): cada pago pasa por
+                    # create_payment (y el diario de escrituras)
+                    break
+                except (requests.exceptions.RequestException, ValueError) as e:
+                    return self._bulk_error_results(len(payments), e)
+        
+        results: List[Optional[Dict]] = [None] * len(payments)
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bulk-payments") as executor:
+            in_flight = {}
+            for index, payment in enumerate(payments):
+                if len(in_flight) >= max_workers:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        results[in_flight.pop(future)] = self._bulk_result(future)
+                future = executor.submit(self.create_payment, payment, timeout)
+                in_flight[future] = index
+            for future in list(in_flight):
+                results[in_flight.pop(future)] = self._bulk_result(future)
+        
+        for index, result in enumerate(results):
+            result['index'] = index
+        return results
+    
+    def _create_payments_batch(self, payments: List[Dict], key: str, timeout: Optional[Timeout]) -> List[Dict]:
+        """Envía todos los pagos en una sola petición al endpoint de carga masiva."""
+        body = json.dumps(payments, default=self._serialize_date)
+        headers = self._get_headers()
+        headers["Idempotency-Key"] = key
+        response = self._request('POST', "/payments/bulk", data=body, headers=headers, timeout=timeout)
+        self._bulk_supported = True
+        self._invalidate('payments')
+        
+        results = []
+        for index, item in enumerate(response.json()):
+            error = item.get('error') if isinstance(item, dict) else None
+            results.append({
+                'index': index,
+                'ok': error is None,
+                'data': item if error is None else None,
+                'error': error,
+                'duplicate': bool(error and ("Ya existe" in error or "duplicado" in error.lower())),
+            })
+        return results
+    
+    @staticmethod
+    def _bulk_error_results(count: int, exc: Exception) -> List[Dict]:
+        """Un resultado fallido por pago cuando el lote entero no se pudo registrar."""
+        error = str(exc)
+        if isinstance(exc, requests.exceptions.HTTPError) and exc.response is not None:
+            error = f"{error}: {exc.response.text}"
+        return [{'index': index, 'ok': False, 'data': None, 'error': error, 'duplicate': False}
+                for index in range(count)]
+    
+    def _bulk_result(self, future) -> Dict:
+        """Convierte el resultado de un `create_payment` en segundo plano al formato de carga masiva."""
+        try:
+            data = future.result()
+        except Exception as e:
+            error = str(e)
+            if isinstance(e, requests.exceptions.HTTPError) and e.response is not None:
+                error = f"{error}: {e.response.text}"
+            duplicate = self._is_duplicate_error(e) or "Ya existe" in error or "duplicado" in error.lower()
+            return {'ok': False, 'data': None, 'error': error, 'duplicate': duplicate}
+        return {'ok': True, 'data': data, 'error': None, 'duplicate': False}
     
     # ========== REPORTES ==========
     
-    def get_morosos_report(self) -> Dict:
+    def get_morosos_report(self, timeout: Optional[Timeout] = None) -> Dict:
         """Obtiene el reporte de morosos."""
-        url = f"{self.base_url}/reports/morosos"
-        response = requests.get(url, headers=self._get_headers())
-        response.raise_for_status()
-        return response.json()
+        return self._get_json("/reports/morosos", timeout=timeout)
     
-    def get_ingresos_report(self) -> Dict:
+    def get_ingresos_report(self, timeout: Optional[Timeout] = None) -> Dict:
         """Obtiene el reporte de ingresos por mes."""
-        url = f"{self.base_url}/reports/ingresos"
-        response = requests.get(url, headers=self._get_headers())
-        response.raise_for_status()
-        return response.json()
+        return self._get_json("/reports/ingresos", timeout=timeout)
     
-    def get_pagos_usuario_report(self) -> Dict:
+    def get_pagos_usuario_report(self, timeout: Optional[Timeout] = None) -> Dict:
         """Obtiene el reporte de pagos por usuario."""
-        url = f"{self.base_url}/reports/pagos-usuario"
-        response = requests.get(url, headers=self._get_headers())
-        response.raise_for_status()
-        return response.json()
+        return self._get_json("/reports/pagos-usuario", timeout=timeout)
     
     # ========== ADMINISTRADORES ==========
     
-    def get_admins(self) -> List[Dict]:
+    def get_admins(self, timeout: Optional[Timeout] = None) -> List[Admin]:
         """Obtiene todos los administradores."""
-        url = f"{self.base_url}/admins/"
-        response = requests.get(url, headers=self._get_headers())
-        response.raise_for_status()
-        return response.json()
+        return self._get_json("/admins/", timeout=timeout, resource='admins', record_type=Admin)
     
-    def get_admin(self, admin_id: int) -> Dict:
+    def get_admin(self, admin_id: int, timeout: Optional[Timeout] = None) -> Admin:
         """Obtiene un administrador por ID."""
-        url = f"{self.base_url}/admins/{admin_id}"
-        response = requests.get(url, headers=self._get_headers())
-        response.raise_for_status()
-        return response.json()
+        return self._get_json(f"/admins/{admin_id}", timeout=timeout, resource='admins', record_type=Admin)
     
-    def create_admin(self, admin_data: Dict) -> Dict:
+    def create_admin(self, admin_data: Dict, timeout: Optional[Timeout] = None) -> Dict:
         """Crea un nuevo administrador."""
-        url = f"{self.base_url}/admins/"
-        response = requests.post(url, json=admin_data, headers=self._get_headers())
-        response.raise_for_status()
-        return response.json()
+        result = self._request('POST', "/admins/", json=admin_data, timeout=timeout).json()
+        self._invalidate('admins')
+        return result
     
-    def update_admin(self, admin_id: int, admin_data: Dict) -> Dict:
+    def update_admin(self, admin_id: int, admin_data: Dict, timeout: Optional[Timeout] = None) -> Dict:
         """Actualiza un administrador."""
-        url = f"{self.base_url}/admins/{admin_id}"
-        response = requests.put(url, json=admin_data, headers=self._get_headers())
-        response.raise_for_status()
-        return response.json()
+        result = self._request('PUT', f"/admins/{admin_id}", json=admin_data, timeout=timeout).json()
+        self._invalidate('admins')
+        return result
     
-    def change_admin_password(self, admin_id: int, nueva_clave: str) -> Dict:
+    def change_admin_password(self, admin_id: int, nueva_clave: str, timeout: Optional[Timeout] = None) -> Dict:
         """Cambia la contraseña de un administrador."""
-        url = f"{self.base_url}/admins/{admin_id}/change-password"
         data = {"nueva_clave": nueva_clave}
-        response = requests.patch(url, json=data, headers=self._get_headers())
-        response.raise_for_status()
-        return response.json()
+        result = self._request('PATCH', f"/admins/{admin_id}/change-password", json=data, timeout=timeout).json()
+        self._invalidate('admins')
+        return result
     
-    def delete_admin(self, admin_id: int) -> Dict:
+    def delete_admin(self, admin_id: int, timeout: Optional[Timeout] = None) -> Dict:
         """Elimina un administrador."""
-        url = f"{self.base_url}/admins/{admin_id}"
-        response = requests.delete(url, headers=self._get_headers())
-        response.raise_for_status()
-        return response.json()
-
+        result = self._request('DELETE', f"/admins/{admin_id}", timeout=timeout).json()
+        self._invalidate('admins')
+        return result
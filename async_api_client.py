@@ -0,0 +1,247 @@
+# frontend/async_api_client.py
+import asyncio
+from typing import Optional, Dict, Iterable, List, Tuple, Union
+from datetime import date, datetime
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:  # httpx es opcional; sin él se usa solo APIClient
+    httpx = None
+    HTTPX_AVAILABLE = False
+
+from api_client import APIClient, DEFAULT_TIMEOUT
+
+try:
+    import h2  # noqa: F401  (habilita HTTP/2 en httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class AsyncAPIClient:
+    """Cliente asíncrono (asyncio + httpx) con la misma interfaz que APIClient.
+
+    Permite lanzar varias peticiones a la vez con `gather`, compartiendo una
+    sola conexión HTTP/2 cuando el servidor y el paquete `h2` lo permiten.
+    """
+
+    def __init__(self, base_url: str = "https://backend.aguaspl.site",
+                 token: Optional[str] = None,
+                 http2: bool = True,
+                 max_connections: int = 10,
+                 timeout: Union[float, Tuple[float, float]] = DEFAULT_TIMEOUT):
+        if not HTTPX_AVAILABLE:
+            raise RuntimeError("AsyncAPIClient requiere el paquete 'httpx' (pip install httpx[http2])")
+
+        self.base_url = base_url.rstrip('/')
+        self.token = token
+        self.user_data: Optional[Dict] = None
+
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            timeout_cfg = httpx.Timeout(read, connect=connect)
+        else:
+            timeout_cfg = httpx.Timeout(timeout)
+
+        self.client = httpx.AsyncClient(
+            http2=http2 and HTTP2_AVAILABLE,
+            timeout=timeout_cfg,
+            limits=httpx.Limits(max_connections=max_connections,
+                                max_keepalive_connections=max_connections),
+        )
+
+    @classmethod
+    def from_client(cls, api_client: APIClient, **kwargs) -> "AsyncAPIClient":
+        """Crea un cliente asíncrono con la URL, el token y el timeout de un APIClient.
+
+        Las conexiones no se comparten: httpx abre las suyas, independientes del
+        pool de `requests` del APIClient.
+        """
+        client = cls(api_client.base_url, token=api_client.token,
+                     timeout=api_client.timeout, **kwargs)
+        client.user_data = api_client.user_data
+        return client
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        """Cierra las conexiones abiertas."""
+        await self.client.aclose()
+
+    def _get_headers(self) -> Dict[str, str]:
+        """Obtiene los headers para las peticiones, incluyendo el token si existe."""
+        headers = {"Content-Type": "application/json"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        return headers
+
+    def _serialize(self, data: Dict) -> Dict:
+        """Convierte objetos date/datetime a string ISO antes de enviarlos."""
+        return {key: value.isoformat() if isinstance(value, (date, datetime)) else value
+                for key, value in data.items()}
+
+    async def _request(self, method: str, path: str, **kwargs):
+        """Ejecuta una petición y devuelve el JSON de la respuesta."""
+        response = await self.client.request(method, f"{self.base_url}{path}",
+                                             headers=self._get_headers(), **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    @staticmethod
+    async def gather(*coros, return_exceptions: bool = False) -> List:
+        """Ejecuta varias peticiones en paralelo y devuelve sus resultados en orden."""
+        return await asyncio.gather(*coros, return_exceptions=return_exceptions)
+
+    async def login(self, usuario: str, clave: str) -> Dict:
+        """Inicia sesión y guarda el token."""
+        data = {"usuario": usuario, "clave": clave}
+        try:
+            result = await self._request('POST', "/auth/login", json=data)
+        except httpx.HTTPError as e:
+            raise Exception(f"Error al iniciar sesión: {str(e)}")
+        self.token = result["access_token"]
+        self.user_data = result["user_data"]
+        return result
+
+    # ========== USUARIOS ==========
+
+    async def get_users(self, active_only: bool = False) -> List[Dict]:
+        """Obtiene todos los usuarios."""
+        params = {'active_only': 'true' if active_only else 'false'}
+        return await self._request('GET', "/users/", params=params)
+
+    async def get_user(self, user_id: int) -> Dict:
+        """Obtiene un usuario por ID."""
+        return await self._request('GET', f"/users/{user_id}")
+
+    async def create_user(self, user_data: Dict) -> Dict:
+        """Crea un nuevo usuario."""
+        return await self._request('POST', "/users/", json=user_data)
+
+    async def update_user(self, user_id: int, user_data: Dict) -> Dict:
+        """Actualiza un usuario."""
+        return await self._request('PUT', f"/users/{user_id}", json=user_data)
+
+    async def toggle_user_status(self, user_id: int) -> Dict:
+        """Cambia el estado de un usuario."""
+        return await self._request('PATCH', f"/users/{user_id}/toggle-status")
+
+    # ========== PAGOS ==========
+
+    async def get_payments(self, search: Optional[str] = None) -> List[Dict]:
+        """Obtiene todos los pagos."""
+        params = {}
+        if search:
+            params['search'] = search
+        return await self._request('GET', "/payments/", params=params)
+
+    async def get_payment(self, payment_id: int) -> Dict:
+        """Obtiene un pago por ID."""
+        return await self._request('GET', f"/payments/{payment_id}")
+
+    async def create_payment(self, payment_data: Dict) -> Dict:
+        """Crea un nuevo pago."""
+        return await self._request('POST', "/payments/", json=self._serialize(payment_data))
+
+    # ========== REPORTES ==========
+
+    async def get_morosos_report(self) -> Dict:
+        """Obtiene el reporte de morosos."""
+        return await self._request('GET', "/reports/morosos")
+
+    async def get_ingresos_report(self) -> Dict:
+        """Obtiene el reporte de ingresos por mes."""
+        return await self._request('GET', "/reports/ingresos")
+
+    async def get_pagos_usuario_report(self) -> Dict:
+        """Obtiene el reporte de pagos por usuario."""
+        return await self._request('GET', "/reports/pagos-usuario")
+
+    # ========== ADMINISTRADORES ==========
+
+    async def get_admins(self) -> List[Dict]:
+        """Obtiene todos los administradores."""
+        return await self._request('GET', "/admins/")
+
+    async def get_admin(self, admin_id: int) -> Dict:
+        """Obtiene un administrador por ID."""
+        return await self._request('GET', f"/admins/{admin_id}")
+
+    async def create_admin(self, admin_data: Dict) -> Dict:
+        """Crea un nuevo administrador."""
+        return await self._request('POST', "/admins/", json=admin_data)
+
+    async def update_admin(self, admin_id: int, admin_data: Dict) -> Dict:
+        """Actualiza un administrador."""
+        return await self._request('PUT', f"/admins/{admin_id}", json=admin_data)
+
+    async def change_admin_password(self, admin_id: int, nueva_clave: str) -> Dict:
+        """Cambia la contraseña de un administrador."""
+        data = {"nueva_clave": nueva_clave}
+        return await self._request('PATCH', f"/admins/{admin_id}/change-password", json=data)
+
+    async def delete_admin(self, admin_id: int) -> Dict:
+        """Elimina un administrador."""
+        return await self._request('DELETE', f"/admins/{admin_id}")
+
+
+# (ruta, parámetros, método de AsyncAPIClient, argumentos) de los datos que
+# las ventanas piden al abrirse. Los pagos no se incluyen: la ventana los pide
+# por páginas (o desde la réplica local), no con un único GET precargable.
+INITIAL_REQUESTS = [
+    ("/users/", {'active_only': 'false'}, 'get_users', (False,)),
+    ("/users/", {'active_only': 'true'}, 'get_users', (True,)),
+    ("/reports/morosos", {}, 'get_morosos_report', ()),
+    ("/reports/ingresos", {}, 'get_ingresos_report', ()),
+    ("/reports/pagos-usuario", {}, 'get_pagos_usuario_report', ()),
+]
+ADMIN_REQUESTS = [
+    ("/admins/", {}, 'get_admins', ()),
+]
+
+
+async def _fetch_initial_data(api_client: APIClient,
+                              requests_list: List[Tuple]) -> List[Tuple[str, Dict, object]]:
+    async with AsyncAPIClient.from_client(api_client) as client:
+        results = await client.gather(
+            *(getattr(client, method)(*args) for _, _, method, args in requests_list),
+            return_exceptions=True,
+        )
+    return [(path, params, result) for (path, params, _, _), result in zip(requests_list, results)]
+
+
+def prefetch_initial_data(api_client: APIClient, include_admins: bool = False,
+                          skip: Iterable[Tuple[str, Dict]] = ()) -> int:
+    """Descarga en paralelo los datos iniciales de todas las ventanas y los precarga en `api_client`.
+
+    `skip` son pares (ruta, parámetros) que no hace falta pedir (p. ej. los que la
+    ventana visible ya está cargando). Las peticiones que fallen se ignoran: la
+    ventana correspondiente las repetirá de forma normal. Devuelve cuántas
+    respuestas se precargaron.
+    """
+    if not HTTPX_AVAILABLE or not api_client.token:
+        return 0
+    requests_list = INITIAL_REQUESTS + (ADMIN_REQUESTS if include_admins else [])
+    skip = list(skip)
+    requests_list = [r for r in requests_list if (r[0], r[1]) not in skip]
+    if not requests_list:
+        # Todo se pide por otro camino: ni siquiera se abre el cliente httpx
+        return 0
+
+    try:
+        results = asyncio.run(_fetch_initial_data(api_client, requests_list))
+    except Exception:
+        return 0
+
+    primed = 0
+    for path, params, result in results:
+        if isinstance(result, BaseException):
+            continue
+        api_client.prime(path, result, params=params or None)
+        primed += 1
+    return primed
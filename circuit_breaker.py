@@ -0,0 +1,109 @@
+# frontend/circuit_breaker.py
+import threading
+import time
+from typing import Dict
+import requests
+
+# Fallos consecutivos que abren el circuito de un endpoint
+FAILURE_THRESHOLD = 5
+# Segundos que el circuito permanece abierto antes de permitir una petición de prueba
+COOLDOWN = 30.0
+
+CLOSED = 'cerrado'
+OPEN = 'abierto'
+HALF_OPEN = 'semiabierto'
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """El endpoint falló repetidamente y se rechaza la petición sin contactar al servidor.
+
+    Hereda de ConnectionError para que el resto del cliente (diario de
+    escrituras, mensajes de la interfaz) la trate como una falta de conexión.
+    """
+
+    def __init__(self, endpoint: str, retry_in: float):
+        super().__init__(f"Error de conexión: el servidor no responde ({endpoint}); "
+                         f"se reintentará en {retry_in:.0f} s")
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+
+class _Circuit:
+    __slots__ = ('state', 'failures', 'opened_at', 'probing')
+
+    def __init__(self):
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+
+
+class CircuitBreaker:
+    """Circuito por endpoint: tras `failure_threshold` fallos seguidos falla de inmediato.
+
+    Pasado `cooldown` se deja pasar una sola petición de prueba (semiabierto):
+    si responde, el circuito se cierra; si falla, vuelve a abrirse.
+    """
+
+    def __init__(self, failure_threshold: int = FAILURE_THRESHOLD, cooldown: float = COOLDOWN):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._circuits: Dict[str, _Circuit] = {}
+
+    def before_call(self, endpoint: str):
+        """Lanza CircuitOpenError si el endpoint no debe recibir peticiones por ahora."""
+        with self._lock:
+            circuit = self._circuits.get(endpoint)
+            if circuit is None or circuit.state == CLOSED:
+                return
+            remaining = circuit.opened_at + self.cooldown - time.monotonic()
+            if circuit.state == OPEN and remaining <= 0:
+                circuit.state = HALF_OPEN
+            if circuit.state == HALF_OPEN and not circuit.probing:
+                circuit.probing = True
+                return
+        raise CircuitOpenError(endpoint, max(remaining, 0.0))
+
+    def record_success(self, endpoint: str):
+        with self._lock:
+            circuit = self._circuits.get(endpoint)
+            if circuit is not None:
+                circuit.state = CLOSED
+                circuit.failures = 0
+                circuit.probing = False
+
+    def record_failure(self, endpoint: str):
+        with self._lock:
+            circuit = self._circuits.setdefault(endpoint, _Circuit())
+            circuit.failures += 1
+            if circuit.state == HALF_OPEN or circuit.failures >= self.failure_threshold:
+                circuit.state = OPEN
+                circuit.opened_at = time.monotonic()
+            circuit.probing = False
+
+    def record_retry(self, endpoint: str):
+        """Una petición falló y se reintentará: solo cuenta como fallo si era la de prueba.
+
+        Los reintentos de una misma petición no suman fallos seguidos; la de prueba
+        del semiabierto, en cambio, vuelve a abrir el circuito.
+        """
+        with self._lock:
+            circuit = self._circuits.get(endpoint)
+            probing = circuit is not None and circuit.probing
+        if probing:
+            self.record_failure(endpoint)
+
+    def is_open(self, endpoint: str) -> bool:
+        with self._lock:
+            circuit = self._circuits.get(endpoint)
+            return circuit is not None and circuit.state != CLOSED
+
+    def states(self) -> Dict[str, str]:
+        """Estado de cada endpoint que ha fallado alguna vez."""
+        with self._lock:
+            return {endpoint: circuit.state for endpoint, circuit in self._circuits.items()}
+
+    def reset(self):
+        with self._lock:
+            self._circuits.clear()
@@ -0,0 +1,79 @@
+# frontend/json_stream.py
+import json
+from typing import Iterable, Iterator
+
+_WHITESPACE = ' \t\r\n'
+
+
+def iter_json_array(chunks: Iterable[bytes], encoding: str = 'utf-8') -> Iterator:
+    """Decodifica de forma incremental un arreglo JSON recibido por partes.
+
+    Devuelve cada elemento del arreglo en cuanto está completo, sin cargar
+    el documento entero en memoria: solo se mantiene el fragmento pendiente
+    de decodificar. Si los datos terminan antes del `]` final (p. ej. se cortó
+    la conexión) lanza `json.JSONDecodeError`, para no tomar una lista parcial
+    como completa.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    pending = b''
+    started = False
+    closed = False
+
+    for chunk in chunks:
+        if not chunk:
+            continue
+        # Un carácter multibyte puede quedar partido entre dos fragmentos
+        data = pending + chunk
+        try:
+            text = data.decode(encoding)
+            pending = b''
+        except UnicodeDecodeError as e:
+            text = data[:e.start].decode(encoding)
+            pending = data[e.start:]
+        buffer += text
+
+        pos = 0
+        if not started:
+            pos = _skip(buffer, pos)
+            if pos == len(buffer):
+                buffer = ''
+                continue
+            if buffer[pos] != '[':
+                raise ValueError("Se esperaba un arreglo JSON")
+            started = True
+            pos += 1
+
+        while True:
+            pos = _skip(buffer, pos, ',')
+            if pos == len(buffer):
+                break
+            if buffer[pos] == ']':
+                closed = True
+                break
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Elemento incompleto: esperar el siguiente fragmento
+                break
+            if isinstance(item, (int, float)):
+                # Un número solo está completo si le sigue un separador ("2." o "2e" continúan)
+                following = _skip(buffer, end)
+                if following == len(buffer) or buffer[following] not in ',]':
+                    break
+            yield item
+            pos = end
+        buffer = buffer[pos:]
+
+    if not started:
+        raise ValueError("Respuesta vacía: se esperaba un arreglo JSON")
+    if not closed:
+        raise json.JSONDecodeError("Respuesta incompleta: el arreglo JSON no se cerró", buffer, len(buffer))
+
+
+def _skip(text: str, pos: int, extra: str = '') -> int:
+    """Avanza `pos` sobre espacios en blanco (y los separadores indicados)."""
+    chars = _WHITESPACE + extra
+    while pos < len(text) and text[pos] in chars:
+        pos += 1
+    return pos
@@ -0,0 +1,130 @@
+# frontend/local_cache.py
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Dict, Iterable, NamedTuple
+
+# Ubicación por defecto de la caché en disco (junto a Recibos_Generados, Reportes_Generados)
+DEFAULT_CACHE_PATH = os.path.join(os.getcwd(), 'Cache_Local', 'api_cache.sqlite3')
+
+# Segundos que una respuesta guardada se sirve sin consultar al servidor
+DEFAULT_TTLS = {
+    'users': 300,
+    'payments': 120,
+    'payment': 3600,
+    'admins': 600,
+}
+
+# Tamaño máximo de la caché; al superarlo se eliminan las entradas usadas hace más tiempo
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class CacheEntry(NamedTuple):
+    body: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fresh: bool
+
+
+class LocalCache:
+    """Caché persistente (SQLite) de respuestas GET de la API.
+
+    Cada entrada pertenece a un recurso ('users', 'payments', ...) con su
+    propio TTL, de modo que una mutación puede invalidar todas las entradas
+    del recurso afectado.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH,
+                 ttls: Optional[Dict[str, float]] = None,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                resource TEXT NOT NULL,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_resource ON responses(resource)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_access ON responses(last_access)")
+
+    def get(self, key: str, resource: str) -> Optional[CacheEntry]:
+        """Devuelve la entrada guardada para `key` (vigente o no) o None."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+
+        body, etag, last_modified, stored_at = row
+        fresh = now - stored_at < self.ttls.get(resource, 0)
+        return CacheEntry(bytes(body), etag, last_modified, fresh)
+
+    def put(self, key: str, resource: str, body: bytes,
+            etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """Guarda (o reemplaza) una respuesta y aplica el límite de tamaño."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, resource, body, etag, last_modified, stored_at, last_access, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, resource, sqlite3.Binary(body), etag, last_modified, now, now, len(body)),
+            )
+            self._evict()
+
+    def touch(self, key: str):
+        """Marca una entrada como vigente de nuevo (p. ej. tras un 304 del servidor)."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET stored_at = ?, last_access = ? WHERE key = ?", (now, now, key)
+            )
+
+    def invalidate(self, resources: Iterable[str]):
+        """Elimina todas las entradas de los recursos indicados."""
+        resources = list(resources)
+        if not resources:
+            return
+        placeholders = ','.join('?' for _ in resources)
+        with self._lock:
+            self._conn.execute(f"DELETE FROM responses WHERE resource IN ({placeholders})", resources)
+
+    def clear(self):
+        """Vacía la caché."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _evict(self):
+        """Elimina las entradas menos usadas hasta quedar bajo `max_bytes`. Requiere `_lock`."""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT key, size FROM responses ORDER BY last_access").fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
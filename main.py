@@ -1,14 +1,19 @@
 # frontend/main.py
 import customtkinter as ctk
 import sys
-from ui_main import App
 
 # Configuración recomendada para un aspecto moderno y profesional.
 ctk.set_appearance_mode("Light") 
 ctk.set_default_color_theme("blue")
 
 if __name__ == '__main__':
+    if '--profile-startup' in sys.argv[1:]:
+        # Informe de tiempos de importación del arranque (ver tools/startup_profile.py)
+        from tools.startup_profile import main as profile_startup
+        sys.exit(profile_startup([arg for arg in sys.argv[1:] if arg != '--profile-startup']))
+    
     try:
+        from ui_main import App
         app = App()
         app.mainloop()
     except Exception as e:
@@ -0,0 +1,277 @@
+# frontend/metrics.py
+import json
+import re
+import threading
+import time
+from collections import Counter, deque
+from typing import Optional, Dict, List, Iterable, Iterator
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from requests.adapters import HTTPAdapter
+
+# Muestras que se conservan por endpoint y fase (las más antiguas se descartan)
+HISTOGRAM_SIZE = 2048
+# Solicitudes individuales que se conservan para `dump_jsonl`
+EVENT_LOG_SIZE = 10000
+# Fases registradas en segundos, además del tamaño de respuesta en bytes
+PHASES = ('connect', 'ttfb', 'transfer', 'decode', 'total')
+PERCENTILES = (50, 95, 99)
+
+_ID_SEGMENT = re.compile(r'/\d+(?=/|$)')
+
+# Tiempo de conexión (DNS + TCP + TLS) acumulado por el hilo en la petición actual
+_connect_times = threading.local()
+
+
+def endpoint_name(method: str, path: str) -> str:
+    """Nombre agregado de un endpoint: los ids numéricos se reemplazan por `{id}`."""
+    return f"{method.upper()} {_ID_SEGMENT.sub('/{id}', path)}"
+
+
+def _add_connect_time(seconds: float):
+    _connect_times.value = getattr(_connect_times, 'value', 0.0) + seconds
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _add_connect_time(time.perf_counter() - start)
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _add_connect_time(time.perf_counter() - start)
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter que mide el tiempo de establecer cada conexión nueva.
+
+    Una conexión reutilizada del pool (keep-alive) registra 0 como tiempo de conexión.
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _TimedHTTPConnectionPool,
+            'https': _TimedHTTPSConnectionPool,
+        }
+
+
+class RequestSample:
+    """Mediciones de una petición: se completa durante `_request` / `_get_json`."""
+    __slots__ = ('endpoint', 'started', 'timestamp', 'status', 'connect', 'ttfb',
+                 'transfer', 'decode', 'total', 'size', 'cache', 'error', '_clock', '_streamed')
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.timestamp = time.time()
+        self.started = time.perf_counter()
+        self.status: Optional[int] = None
+        self.connect = self.ttfb = self.transfer = self.decode = self.total = None
+        self.size: Optional[int] = None
+        # 'red', 'memoria', 'disco', '304', 'precargado', 'compartido' u 'obsoleto'
+        self.cache = 'red'
+        self.error: Optional[str] = None
+        self._clock = self.started
+        self._streamed = False
+        _connect_times.value = 0.0
+
+    def response_received(self, response, streamed: bool = False):
+        """Registra estado, conexión, primer byte y (si no es streaming) transferencia."""
+        now = time.perf_counter()
+        self.status = response.status_code
+        self.connect = getattr(_connect_times, 'value', 0.0)
+        # `elapsed` de requests: desde el envío hasta tener las cabeceras
+        self.ttfb = max(response.elapsed.total_seconds() - self.connect, 0.0)
+        self._streamed = streamed
+        if streamed:
+            self._clock = self.started + self.connect + self.ttfb
+            self.transfer = 0.0
+            self.size = 0
+        else:
+            self.transfer = max(now - self.started - self.connect - self.ttfb, 0.0)
+            self.size = len(response.content)
+            self._clock = now
+
+    def count_chunks(self, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """Envuelve `iter_content` para medir bytes y tiempo de red de una respuesta en streaming."""
+        iterator = iter(chunks)
+        while True:
+            start = time.perf_counter()
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                self.transfer += time.perf_counter() - start
+                return
+            self.transfer += time.perf_counter() - start
+            self.size += len(chunk)
+            yield chunk
+
+    def mark_decoded(self):
+        """Marca el fin de la decodificación: el tiempo desde la última fase cuenta como `decode`."""
+        now = time.perf_counter()
+        self.decode = (self.decode or 0.0) + now - self._clock
+        self._clock = now
+
+    def finish(self, error: Optional[BaseException] = None):
+        self.total = time.perf_counter() - self.started
+        if error is not None:
+            self.error = type(error).__name__
+            status = getattr(getattr(error, 'response', None), 'status_code', None)
+            if status is not None:
+                self.status = status
+        if self._streamed and self.decode is None:
+            # En streaming la decodificación se intercala con la transferencia: es el tiempo restante
+            self.decode = max(self.total - self.connect - self.ttfb - self.transfer, 0.0)
+
+    def to_dict(self) -> Dict:
+        return {field: getattr(self, field) for field in self.__slots__
+                if field != 'started' and not field.startswith('_')}
+
+
+class Histogram:
+    """Ventana de las últimas mediciones con percentiles por rango."""
+
+    def __init__(self, size: int = HISTOGRAM_SIZE):
+        self._values = deque(maxlen=size)
+        self.count = 0
+
+    def add(self, value: float):
+        self._values.append(value)
+        self.count += 1
+
+    def summary(self) -> Dict[str, float]:
+        values = sorted(self._values)
+        if not values:
+            return {'count': 0}
+        result = {'count': self.count, 'max': values[-1]}
+        for p in PERCENTILES:
+            # Percentil por rango más cercano
+            rank = max(int(-(-p * len(values) // 100)) - 1, 0)
+            result[f'p{p}'] = values[rank]
+        return result
+
+
+class MetricsRecorder:
+    """Histogramas por endpoint de latencia (por fase), tamaño, estado y aciertos de caché.
+
+    También admite fases de la interfaz (p. ej. insertar filas en el Treeview)
+    mediante `timer`, para comparar su costo con el de la red y la decodificación.
+    """
+
+    def __init__(self, histogram_size: int = HISTOGRAM_SIZE, event_log_size: int = EVENT_LOG_SIZE):
+        self._lock = threading.Lock()
+        self._histogram_size = histogram_size
+        self._histograms: Dict[str, Dict[str, Histogram]] = {}
+        self._statuses: Dict[str, Counter] = {}
+        self._cache: Dict[str, Counter] = {}
+        self._errors: Counter = Counter()
+        self._events = deque(maxlen=event_log_size)
+
+    def start(self, method: str, path: str) -> RequestSample:
+        return RequestSample(endpoint_name(method, path))
+
+    def record(self, sample: RequestSample):
+        """Agrega una petición terminada a los histogramas y al registro de eventos."""
+        if sample.total is None:
+            sample.finish()
+        with self._lock:
+            histograms = self._histograms_for(sample.endpoint)
+            for phase in PHASES:
+                value = getattr(sample, phase)
+                if value is not None:
+                    histograms[phase].add(value)
+            if sample.size is not None:
+                histograms['size'].add(sample.size)
+            if sample.status is not None:
+                self._statuses.setdefault(sample.endpoint, Counter())[sample.status] += 1
+            self._cache.setdefault(sample.endpoint, Counter())[sample.cache] += 1
+            if sample.error:
+                self._errors[sample.endpoint] += 1
+            self._events.append(sample.to_dict())
+
+    def observe(self, name: str, phase: str, seconds: float):
+        """Registra una duración arbitraria (p. ej. `observe('tabla pagos', 'render', 0.4)`)."""
+        with self._lock:
+            histograms = self._histograms_for(name)
+            histograms.setdefault(phase, Histogram(self._histogram_size)).add(seconds)
+            self._events.append({'endpoint': name, 'timestamp': time.time(), phase: seconds})
+
+    def timer(self, name: str, phase: str) -> "_Timer":
+        """Context manager que mide un bloque y lo registra con `observe`."""
+        return _Timer(self, name, phase)
+
+    def summary(self) -> Dict[str, Dict]:
+        """Resumen por endpoint: conteos, estados, caché y p50/p95/p99/max de cada fase."""
+        with self._lock:
+            result = {}
+            for endpoint, histograms in self._histograms.items():
+                result[endpoint] = {
+                    'requests': sum(self._cache.get(endpoint, {}).values()),
+                    'errors': self._errors.get(endpoint, 0),
+                    'status': dict(self._statuses.get(endpoint, {})),
+                    'cache': dict(self._cache.get(endpoint, {})),
+                    **{phase: histogram.summary() for phase, histogram in histograms.items() if histogram.count},
+                }
+            return result
+
+    def events(self) -> List[Dict]:
+        with self._lock:
+            return list(self._events)
+
+    def dump_jsonl(self, path: str, clear: bool = False) -> int:
+        """Agrega las peticiones registradas a un archivo JSON-lines y devuelve cuántas se escribieron."""
+        with self._lock:
+            events = list(self._events)
+            if clear:
+                self._events.clear()
+        with open(path, 'a', encoding='utf-8') as f:
+            for event in events:
+                f.write(json.dumps(event, ensure_ascii=False) + '\n')
+        return len(events)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._statuses.clear()
+            self._cache.clear()
+            self._errors.clear()
+            self._events.clear()
+
+    def _histograms_for(self, endpoint: str) -> Dict[str, Histogram]:
+        """Histogramas de un endpoint (se crean al primer uso). Requiere `_lock`."""
+        histograms = self._histograms.get(endpoint)
+        if histograms is None:
+            histograms = self._histograms[endpoint] = {
+                phase: Histogram(self._histogram_size) for phase in PHASES + ('size',)
+            }
+        return histograms
+
+
+class _Timer:
+    def __init__(self, recorder: MetricsRecorder, name: str, phase: str):
+        self.recorder = recorder
+        self.name = name
+        self.phase = phase
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.recorder.observe(self.name, self.phase, time.perf_counter() - self.start)
@@ -2,6 +2,9 @@
 import customtkinter as ctk
 from tkinter import ttk, messagebox
 from api_client import APIClient
+from modules.background import runner_for
+from modules.data_store import store_for
+from modules.table_populator import TablePopulator
 
 class AdminsWindow(ctk.CTkFrame):
     def __init__(self, master, current_user, api_client: APIClient):
@@ -9,8 +12,16 @@ class AdminsWindow(ctk.CTkFrame):
         self.current_user = current_user
         self.api_client = api_client
         self.roles_list = ['Presidente', 'Secretario', 'Tesorero', 'Vocal']
+        # Las llamadas a la API corren en segundo plano para no congelar la ventana
+        self.runner = runner_for(self)
+        # Los administradores viven en el almacén compartido; la ventana solo los muestra
+        self.store = store_for(self, api_client)
+        self.populator = TablePopulator(self)
         self.configure_treeview_style()
         self.build_ui()
+        self.store.subscribe('admins', self.on_admins_changed)
+        if self.store.records('admins'):
+            self.show_admins(self.store.records('admins'))
         self.load_admins()
 
     def configure_treeview_style(self):
@@ -76,8 +87,9 @@ class AdminsWindow(ctk.CTkFrame):
         btn_frame = ctk.CTkFrame(self)
         btn_frame.grid(row=1, column=0, sticky='e', padx=15, pady=(0, 10))
         
-        ctk.CTkButton(btn_frame, text="💾 Guardar", command=self.save_admin,
-                     fg_color="#00C853", hover_color="#00A040", width=120).pack(side='left', padx=5)
+        self.btn_save = ctk.CTkButton(btn_frame, text="💾 Guardar", command=self.save_admin,
+                                      fg_color="#00C853", hover_color="#00A040", width=120)
+        self.btn_save.pack(side='left', padx=5)
         
         self.btn_change_pwd = ctk.CTkButton(btn_frame, text="🔑 Cambiar Contraseña", 
                                             command=self.change_password,
@@ -85,8 +97,9 @@ class AdminsWindow(ctk.CTkFrame):
                                             width=160, state="disabled")
         self.btn_change_pwd.pack(side='left', padx=5)
         
-        ctk.CTkButton(btn_frame, text="🗑️ Eliminar", command=self.delete_admin,
-                     fg_color="#F44336", hover_color="#D32F2F", width=120).pack(side='left', padx=5)
+        self.btn_delete = ctk.CTkButton(btn_frame, text="🗑️ Eliminar", command=self.delete_admin,
+                                        fg_color="#F44336", hover_color="#D32F2F", width=120)
+        self.btn_delete.pack(side='left', padx=5)
         
         ctk.CTkButton(btn_frame, text="🔄 Limpiar", command=self.clear_form,
                      fg_color="#607D8B", hover_color="#455A64", width=120).pack(side='left', padx=5)
@@ -124,28 +137,42 @@ class AdminsWindow(ctk.CTkFrame):
         self.tree.bind('<<TreeviewSelect>>', self.item_selected)
     
     def load_admins(self):
-        """Carga todos los administradores desde la API."""
+        """Pide al almacén compartido que descargue los administradores."""
+        self.store.load('admins', on_error=self.show_load_error)
+
+    def on_admins_changed(self, change):
+        # La lista es corta: cualquier cambio vuelve a llenar la tabla
+        self.show_admins(self.store.records('admins'))
+
+    def show_admins(self, admins):
+        """Reemplaza el contenido de la tabla con los administradores descargados."""
+        self.populator.cancel()
         for i in self.tree.get_children():
             self.tree.delete(i)
         
-        try:
-            admins = self.api_client.get_admins()
-            
-            for admin in admins:
-                estado_text = "Activo" if admin['estado'] else "Inactivo"
-                self.tree.insert('', 'end', values=(
-                    admin['id_admin'], 
-                    admin['usuario'], 
-                    admin['nombre'], 
-                    admin['rol'], 
-                    estado_text
-                ))
-        except Exception as e:
-            error_msg = str(e)
-            if "connection" in error_msg.lower() or "conexión" in error_msg.lower():
-                messagebox.showerror("Error de Conexión", f"No se pudo conectar con el servidor: {error_msg}")
-            else:
-                messagebox.showerror("Error DB", f"Error al cargar administradores: {error_msg}")
+        self.populator.start(admins, self.admin_values, self.insert_rows)
+
+    @staticmethod
+    def admin_values(admin):
+        estado_text = "Activo" if admin.estado else "Inactivo"
+        return (
+            admin.id_admin, 
+            admin.usuario, 
+            admin.nombre, 
+            admin.rol, 
+            estado_text
+        )
+
+    def insert_rows(self, rows):
+        for values in rows:
+            self.tree.insert('', 'end', values=values)
+
+    def show_load_error(self, e):
+        error_msg = str(e)
+        if "connection" in error_msg.lower() or "conexión" in error_msg.lower():
+            messagebox.showerror("Error de Conexión", f"No se pudo conectar con el servidor: {error_msg}")
+        else:
+            messagebox.showerror("Error DB", f"Error al cargar administradores: {error_msg}")
 
     def clear_form(self):
         """Limpia todos los campos del formulario."""
@@ -210,48 +237,56 @@ class AdminsWindow(ctk.CTkFrame):
             messagebox.showwarning('Campos Incompletos', 'Usuario, Nombre y Rol son obligatorios')
             return
 
-        try:
-            admin_id = self.id_var.get()
-            
-            if admin_id:
-                # Actualizar administrador existente
-                admin_data = {
-                    "usuario": usuario,
-                    "nombre": nombre,
-                    "rol": rol,
-                    "estado": bool(estado)
-                }
-                self.api_client.update_admin(int(admin_id), admin_data)
-                messagebox.showinfo('Éxito', 'Administrador actualizado correctamente')
-            else:
-                # Crear nuevo administrador
-                password = self.pwd_entry.get().strip()
-                if not password:
-                    messagebox.showwarning('Contraseña Requerida', 
-                                         'La contraseña es obligatoria para un nuevo administrador')
-                    return
-                
-                admin_data = {
-                    "usuario": usuario,
-                    "nombre": nombre,
-                    "rol": rol,
-                    "clave": password,
-                    "estado": bool(estado)
-                }
-                self.api_client.create_admin(admin_data)
-                messagebox.showinfo('Éxito', 'Administrador agregado correctamente')
-            
-            self.load_admins()
-            self.clear_form()
+        admin_id = self.id_var.get()
+        
+        if admin_id:
+            # Actualizar administrador existente
+            admin_data = {
+                "usuario": usuario,
+                "nombre": nombre,
+                "rol": rol,
+                "estado": bool(estado)
+            }
+            call, args = self.api_client.update_admin, (int(admin_id), admin_data)
+            success_msg = 'Administrador actualizado correctamente'
+        else:
+            # Crear nuevo administrador
+            password = self.pwd_entry.get().strip()
+            if not password:
+                messagebox.showwarning('Contraseña Requerida', 
+                                     'La contraseña es obligatoria para un nuevo administrador')
+                return
             
-        except Exception as e:
-            error_msg = str(e)
-            if "ya existe" in error_msg.lower() or "usuario" in error_msg.lower():
-                messagebox.showerror('Error', f'El nombre de usuario ya existe')
-            elif "connection" in error_msg.lower() or "conexión" in error_msg.lower():
-                messagebox.showerror('Error de Conexión', f'No se pudo conectar con el servidor: {error_msg}')
-            else:
-                messagebox.showerror('Error', f'Error al guardar el administrador: {error_msg}')
+            admin_data = {
+                "usuario": usuario,
+                "nombre": nombre,
+                "rol": rol,
+                "clave": password,
+                "estado": bool(estado)
+            }
+            call, args = self.api_client.create_admin, (admin_data,)
+            success_msg = 'Administrador agregado correctamente'
+
+        # La escritura corre en segundo plano; el botón queda deshabilitado para no enviarla dos veces
+        self.btn_save.configure(state="disabled")
+        self.runner.submit('guardar-admin', call, *args,
+                           on_success=lambda result: self.finish_save_admin(result, success_msg),
+                           on_error=self.show_save_error,
+                           on_done=lambda: self.btn_save.configure(state="normal"))
+
+    def finish_save_admin(self, result, success_msg):
+        messagebox.showinfo('Éxito', success_msg)
+        self.store.saved('admins', result)
+        self.clear_form()
+
+    def show_save_error(self, e):
+        error_msg = str(e)
+        if "ya existe" in error_msg.lower() or "usuario" in error_msg.lower():
+            messagebox.showerror('Error', f'El nombre de usuario ya existe')
+        elif "connection" in error_msg.lower() or "conexión" in error_msg.lower():
+            messagebox.showerror('Error de Conexión', f'No se pudo conectar con el servidor: {error_msg}')
+        else:
+            messagebox.showerror('Error', f'Error al guardar el administrador: {error_msg}')
 
     def change_password(self):
         """Cambia la contraseña de un administrador existente usando la API."""
@@ -293,23 +328,36 @@ class AdminsWindow(ctk.CTkFrame):
                 messagebox.showerror('Error', 'Las contraseñas no coinciden', parent=dialog)
                 return
             
-            try:
-                self.api_client.change_admin_password(admin_id, new_pwd)
-                messagebox.showinfo('Éxito', 'Contraseña cambiada correctamente', parent=dialog)
+            save_btn.configure(state="disabled")
+            self.runner.submit('clave-admin', self.api_client.change_admin_password, admin_id, new_pwd,
+                               on_success=lambda result: password_changed(),
+                               on_error=password_error)
+
+        # El diálogo puede haberse cerrado mientras el cambio viajaba al servidor
+        def dialog_parent():
+            return dialog if dialog.winfo_exists() else self
+
+        def password_changed():
+            messagebox.showinfo('Éxito', 'Contraseña cambiada correctamente', parent=dialog_parent())
+            if dialog.winfo_exists():
                 dialog.destroy()
-            except Exception as e:
-                error_msg = str(e)
-                if "connection" in error_msg.lower() or "conexión" in error_msg.lower():
-                    messagebox.showerror('Error de Conexión', f'No se pudo conectar con el servidor: {error_msg}', parent=dialog)
-                else:
-                    messagebox.showerror('Error', f'Error al cambiar contraseña: {error_msg}', parent=dialog)
+
+        def password_error(e):
+            if dialog.winfo_exists():
+                save_btn.configure(state="normal")
+            error_msg = str(e)
+            if "connection" in error_msg.lower() or "conexión" in error_msg.lower():
+                messagebox.showerror('Error de Conexión', f'No se pudo conectar con el servidor: {error_msg}', parent=dialog_parent())
+            else:
+                messagebox.showerror('Error', f'Error al cambiar contraseña: {error_msg}', parent=dialog_parent())
         
         # Botones
         btn_frame = ctk.CTkFrame(dialog)
         btn_frame.pack(pady=20)
         
-        ctk.CTkButton(btn_frame, text="💾 Guardar", command=save_new_password,
-                     fg_color="#00C853", hover_color="#00A040").pack(side='left', padx=10)
+        save_btn = ctk.CTkButton(btn_frame, text="💾 Guardar", command=save_new_password,
+                                 fg_color="#00C853", hover_color="#00A040")
+        save_btn.pack(side='left', padx=10)
         ctk.CTkButton(btn_frame, text="❌ Cancelar", command=dialog.destroy,
                      fg_color="#F44336", hover_color="#D32F2F").pack(side='left', padx=10)
 
@@ -330,15 +378,21 @@ class AdminsWindow(ctk.CTkFrame):
                                    f'¿Está seguro de eliminar al administrador "{self.nombre_var.get()}"?'):
             return
         
-        try:
-            self.api_client.delete_admin(admin_id)
-            messagebox.showinfo('Éxito', 'Administrador eliminado correctamente')
-            self.load_admins()
-            self.clear_form()
-        except Exception as e:
-            error_msg = str(e)
-            if "connection" in error_msg.lower() or "conexión" in error_msg.lower():
-                messagebox.showerror('Error de Conexión', f'No se pudo conectar con el servidor: {error_msg}')
-            else:
-                messagebox.showerror('Error', f'Error al eliminar el administrador: {error_msg}')
+        self.btn_delete.configure(state="disabled")
+        self.runner.submit('eliminar-admin', self.api_client.delete_admin, admin_id,
+                           on_success=lambda result: self.finish_delete_admin(admin_id),
+                           on_error=self.show_delete_error,
+                           on_done=lambda: self.btn_delete.configure(state="normal"))
+
+    def finish_delete_admin(self, admin_id):
+        messagebox.showinfo('Éxito', 'Administrador eliminado correctamente')
+        self.store.remove('admins', admin_id)
+        self.clear_form()
+
+    def show_delete_error(self, e):
+        error_msg = str(e)
+        if "connection" in error_msg.lower() or "conexión" in error_msg.lower():
+            messagebox.showerror('Error de Conexión', f'No se pudo conectar con el servidor: {error_msg}')
+        else:
+            messagebox.showerror('Error', f'Error al eliminar el administrador: {error_msg}')
 
@@ -0,0 +1,175 @@
+# frontend/modules/background.py
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Optional
+
+# Hilos compartidos por todas las ventanas para las llamadas a la API
+DEFAULT_WORKERS = 4
+# Cada cuánto (ms) revisa el hilo de Tk si hay resultados listos
+POLL_MS = 30
+
+
+class Task:
+    """Una llamada en segundo plano. Si se cancela su resultado se descarta."""
+
+    def __init__(self, key: str, on_success: Optional[Callable], on_error: Optional[Callable],
+                 on_item: Optional[Callable], on_done: Optional[Callable]):
+        self.key = key
+        self.on_success = on_success
+        self.on_error = on_error
+        self.on_item = on_item
+        self.on_done = on_done
+        self.cancelled = False
+        self.future = None
+
+    def cancel(self):
+        self.cancelled = True
+        if self.future is not None:
+            self.future.cancel()
+
+
+class BackgroundRunner:
+    """Ejecuta llamadas a la API fuera del hilo de Tk y entrega los resultados con `after()`.
+
+    Los hilos del pool nunca tocan widgets: dejan el resultado en una cola que el
+    hilo de Tk revisa periódicamente. Cada tarea tiene una clave (p. ej.
+    'suscriptores'); al enviar otra con la misma clave la anterior se cancela y su
+    resultado ya no se entrega.
+    """
+
+    def __init__(self, widget, max_workers: int = DEFAULT_WORKERS):
+        self.widget = widget
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ui-api')
+        self._results = queue.Queue()
+        self._tasks: Dict[str, Task] = {}
+        self._polling = False
+        self._closed = False
+
+    def submit(self, key: str, func: Callable, *args,
+               on_success: Optional[Callable] = None, on_error: Optional[Callable] = None,
+               on_done: Optional[Callable] = None, **kwargs) -> Task:
+        """Ejecuta `func(*args, **kwargs)` en el pool; `on_success(resultado)` o `on_error(exc)` corren en Tk."""
+        task = self._register(key, on_success, on_error, None, on_done)
+        task.future = self._executor.submit(self._run, task, func, args, kwargs)
+        return task
+
+    def stream(self, key: str, make_iter: Callable[[], Iterable], on_item: Callable,
+               on_success: Optional[Callable] = None, on_error: Optional[Callable] = None,
+               on_done: Optional[Callable] = None) -> Task:
+        """Recorre `make_iter()` en el pool y entrega cada elemento a `on_item` en Tk (p. ej. páginas)."""
+        task = self._register(key, on_success, on_error, on_item, on_done)
+        task.future = self._executor.submit(self._run_stream, task, make_iter)
+        return task
+
+    def cancel(self, key: str):
+        """Cancela la tarea activa con esa clave, si existe."""
+        task = self._tasks.pop(key, None)
+        if task is not None:
+            task.cancel()
+
+    def cancel_all(self):
+        """Cancela todas las tareas activas (p. ej. al cerrar sesión)."""
+        for key in list(self._tasks):
+            self.cancel(key)
+
+    def is_running(self, key: str) -> bool:
+        return key in self._tasks
+
+    def shutdown(self):
+        """Cancela todo y libera los hilos (al cerrar la aplicación)."""
+        self._closed = True
+        self.cancel_all()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    # ---------- Hilos del pool ----------
+
+    def _run(self, task: Task, func: Callable, args, kwargs):
+        if task.cancelled:
+            return
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self._results.put((task, 'error', e))
+        else:
+            self._results.put((task, 'success', result))
+
+    def _run_stream(self, task: Task, make_iter: Callable[[], Iterable]):
+        if task.cancelled:
+            return
+        iterator = None
+        try:
+            iterator = iter(make_iter())
+            for item in iterator:
+                if task.cancelled:
+                    return
+                self._results.put((task, 'item', item))
+        except Exception as e:
+            self._results.put((task, 'error', e))
+            return
+        finally:
+            # Cerrar el generador libera la conexión aunque se cancele a mitad
+            if iterator is not None and hasattr(iterator, 'close'):
+                iterator.close()
+        self._results.put((task, 'success', None))
+
+    # ---------- Hilo de Tk ----------
+
+    def _register(self, key, on_success, on_error, on_item, on_done) -> Task:
+        if self._closed:
+            raise RuntimeError("El ejecutor en segundo plano ya fue cerrado")
+        self.cancel(key)
+        task = Task(key, on_success, on_error, on_item, on_done)
+        self._tasks[key] = task
+        if not self._polling:
+            self._polling = True
+            self.widget.after(POLL_MS, self._poll)
+        return task
+
+    def _poll(self):
+        try:
+            if not self.widget.winfo_exists():
+                self._polling = False
+                return
+        except Exception:
+            self._polling = False
+            return
+        try:
+            while True:
+                try:
+                    task, kind, value = self._results.get_nowait()
+                except queue.Empty:
+                    break
+                if not task.cancelled:
+                    self._deliver(task, kind, value)
+        finally:
+            if self._tasks and not self._closed:
+                self.widget.after(POLL_MS, self._poll)
+            else:
+                self._polling = False
+
+    def _deliver(self, task: Task, kind: str, value):
+        if kind == 'item':
+            task.on_item(value)
+            return
+
+        if self._tasks.get(task.key) is task:
+            del self._tasks[task.key]
+        try:
+            if kind == 'error':
+                if task.on_error:
+                    task.on_error(value)
+            elif task.on_success:
+                task.on_success(value)
+        finally:
+            if task.on_done:
+                task.on_done()
+
+
+def runner_for(widget) -> BackgroundRunner:
+    """Devuelve el ejecutor compartido de la ventana principal que contiene a `widget`."""
+    root = widget.winfo_toplevel()
+    runner = getattr(root, '_background_runner', None)
+    if runner is None:
+        runner = BackgroundRunner(root)
+        root._background_runner = runner
+    return runner
@@ -0,0 +1,239 @@
+# frontend/modules/data_store.py
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+from records import Record, Subscriber, Payment, Admin
+from modules.background import runner_for
+
+# Recurso -> campo identificador de cada registro
+ID_FIELDS = {
+    'users': 'id_usuario',
+    'payments': 'id_pago',
+    'admins': 'id_admin',
+}
+RECORD_TYPES = {
+    'users': Subscriber,
+    'payments': Payment,
+    'admins': Admin,
+}
+# Clave de la descarga de cada recurso en el ejecutor en segundo plano
+RUNNER_KEYS = {
+    'users': 'suscriptores',
+    'payments': 'pagos',
+    'admins': 'administradores',
+}
+# Pagos por página al descargar la lista completa del servidor
+PAGE_SIZE = 500
+
+
+class StoreChange(NamedTuple):
+    resource: str
+    changed: List[Record]   # registros nuevos o modificados (con `reset`, la lista completa)
+    deleted: List[int]      # ids eliminados
+    reset: bool             # True si la lista se reemplazó por completo
+
+
+class DataStore:
+    """Copia única en memoria de suscriptores, pagos y administradores, compartida por las ventanas.
+
+    Las ventanas se suscriben a un recurso y reciben un `StoreChange` cada vez
+    que cambia: la lista completa la primera vez y después solo los registros
+    nuevos, modificados o eliminados. Una descarga pedida por varias ventanas a
+    la vez se hace una sola vez; tras una escritura, el registro devuelto por el
+    servidor se publica sin volver a descargar la lista.
+
+    Todos los métodos se llaman desde el hilo de Tk; las descargas corren en el
+    ejecutor en segundo plano de la ventana principal.
+    """
+
+    def __init__(self, api_client, runner):
+        self.api_client = api_client
+        self.runner = runner
+        self._records: Dict[str, Dict[int, Record]] = {resource: {} for resource in ID_FIELDS}
+        self._loaded = set()
+        self._listeners: Dict[str, List[Callable[[StoreChange], None]]] = {resource: [] for resource in ID_FIELDS}
+        # Callbacks (on_error, on_done) de quienes esperan la descarga en curso de cada recurso
+        self._waiting: Dict[str, List[tuple]] = {resource: [] for resource in ID_FIELDS}
+        self._seen_payments = set()
+
+    # ---------- Lectura ----------
+
+    def records(self, resource: str) -> List[Record]:
+        return list(self._records[resource].values())
+
+    def get(self, resource: str, record_id) -> Optional[Record]:
+        return self._records[resource].get(record_id)
+
+    def is_loaded(self, resource: str) -> bool:
+        """True si ya se descargó la lista completa del recurso."""
+        return resource in self._loaded
+
+    def is_loading(self, resource: str) -> bool:
+        return self.runner.is_running(RUNNER_KEYS[resource])
+
+    # ---------- Suscripciones ----------
+
+    def subscribe(self, resource: str, callback: Callable[[StoreChange], None]):
+        self._listeners[resource].append(callback)
+
+    def unsubscribe(self, resource: str, callback: Callable[[StoreChange], None]):
+        if callback in self._listeners[resource]:
+            self._listeners[resource].remove(callback)
+
+    def _notify(self, resource: str, changed: List[Record], deleted: List[int], reset: bool = False):
+        if not (changed or deleted or reset):
+            return
+        change = StoreChange(resource, changed, deleted, reset)
+        for callback in list(self._listeners[resource]):
+            callback(change)
+
+    # ---------- Descargas ----------
+
+    def ensure(self, resource: str, on_error: Optional[Callable] = None, on_done: Optional[Callable] = None):
+        """Descarga el recurso solo si todavía no está en memoria (o espera la descarga en curso)."""
+        if self.is_loaded(resource) and not self.is_loading(resource):
+            if on_done:
+                on_done()
+            return
+        self.load(resource, on_error, on_done)
+
+    def load(self, resource: str, on_error: Optional[Callable] = None, on_done: Optional[Callable] = None):
+        """Descarga o sincroniza el recurso; si ya hay una descarga en curso se espera esa misma."""
+        self._waiting[resource].append((on_error, on_done))
+        if self.is_loading(resource):
+            return
+
+        key = RUNNER_KEYS[resource]
+        fail = lambda e: self._finish(resource, e)
+        sync = self.api_client.sync if resource in ('users', 'payments') else None
+        if sync is not None:
+            if not self.is_loaded(resource):
+                # Primero lo guardado en la réplica local; luego solo los cambios
+                self.runner.submit(key, sync.records, resource,
+                                   on_success=lambda records: self._show_replica(resource, records),
+                                   on_error=fail)
+            else:
+                self._sync(resource)
+        elif resource == 'payments':
+            # Por páginas: cada una se publica al llegar, sin esperar al resto
+            self._seen_payments = set()
+            self.runner.stream(key, lambda: self.api_client.iter_payments(page_size=PAGE_SIZE),
+                               on_item=self._merge_page,
+                               on_success=self._finish_payments_stream,
+                               on_error=fail)
+        else:
+            fetch = self.api_client.get_users if resource == 'users' else self.api_client.get_admins
+            self.runner.submit(key, fetch,
+                               on_success=lambda records: self._replace(resource, records, finish=True),
+                               on_error=fail)
+
+    def _show_replica(self, resource: str, records: List[Record]):
+        # La sincronización se pide antes de avisar: las ventanas ven que la carga sigue en curso
+        self._sync(resource)
+        self._replace(resource, records)
+
+    def _sync(self, resource: str):
+        sync = self.api_client.sync
+        fetch = sync.sync_users if resource == 'users' else sync.sync_payments
+        self.runner.submit(RUNNER_KEYS[resource], fetch,
+                           on_success=lambda result: self._apply_sync(resource, result),
+                           on_error=lambda e: self._finish(resource, e))
+
+    def _replace(self, resource: str, records: List[Record], finish: bool = False):
+        """Reemplaza la lista completa; si ya había una, publica solo las diferencias."""
+        id_field = ID_FIELDS[resource]
+        previous = self._records[resource]
+        current = {getattr(record, id_field): record for record in records}
+        self._records[resource] = current
+        if resource not in self._loaded:
+            self._loaded.add(resource)
+            self._notify(resource, list(current.values()), [], reset=True)
+        else:
+            changed = [record for record_id, record in current.items() if previous.get(record_id) != record]
+            deleted = [record_id for record_id in previous if record_id not in current]
+            self._notify(resource, changed, deleted)
+        if finish:
+            self._finish(resource)
+
+    def _apply_sync(self, resource: str, result):
+        self._upsert(resource, result.changed, result.deleted)
+        self._finish(resource)
+
+    def _merge_page(self, page: List[Payment]):
+        self._seen_payments.update(payment.id_pago for payment in page)
+        self._upsert('payments', page, [])
+
+    def _finish_payments_stream(self, _=None):
+        # Los que ya no vinieron se eliminaron en el servidor
+        deleted = [id_pago for id_pago in self._records['payments'] if id_pago not in self._seen_payments]
+        self._seen_payments = set()
+        self._loaded.add('payments')
+        self._upsert('payments', [], deleted)
+        self._finish('payments')
+
+    def _upsert(self, resource: str, changed: Iterable[Record], deleted: Iterable[int]):
+        id_field = ID_FIELDS[resource]
+        records = self._records[resource]
+        really_changed = []
+        for record in changed:
+            record_id = getattr(record, id_field)
+            if records.get(record_id) != record:
+                records[record_id] = record
+                really_changed.append(record)
+        really_deleted = [record_id for record_id in deleted if records.pop(record_id, None) is not None]
+        self._notify(resource, really_changed, really_deleted)
+
+    def _finish(self, resource: str, error: Optional[Exception] = None):
+        waiting, self._waiting[resource] = self._waiting[resource], []
+        for on_error, on_done in waiting:
+            if error is not None and on_error:
+                on_error(error)
+            if on_done:
+                on_done()
+
+    # ---------- Escrituras ----------
+
+    def saved(self, resource: str, result: Dict, affects: Iterable[str] = ()):
+        """Publica el registro devuelto por una escritura exitosa sin volver a descargar la lista.
+
+        Si la respuesta no trae el registro completo se sincroniza el recurso (una
+        sola descarga para todas las ventanas). Las escrituras pendientes de envío
+        no cambian nada hasta que el servidor las acepte. `affects` son otros
+        recursos cuyos registros incluyen datos de este (p. ej. los pagos llevan el
+        nombre del suscriptor) y se sincronizan si ya estaban cargados.
+        """
+        if result.get('estado_envio') == 'pendiente':
+            return
+        record_type = RECORD_TYPES[resource]
+        if all(field in result for field in record_type.FIELDS if field != 'updated_at'):
+            self._upsert(resource, [record_type.from_dict(result)], [])
+        elif self.is_loaded(resource):
+            self.load(resource)
+        for other in affects:
+            if self.is_loaded(other):
+                self.load(other)
+
+    def put(self, resource: str, record: Record):
+        """Agrega o actualiza un registro ya descargado (p. ej. el detalle de un pago recién creado)."""
+        self._upsert(resource, [record], [])
+
+    def remove(self, resource: str, record_id):
+        self._upsert(resource, [], [record_id])
+
+    def clear(self):
+        """Olvida los datos y las suscripciones (al cerrar sesión)."""
+        for resource in ID_FIELDS:
+            self.runner.cancel(RUNNER_KEYS[resource])
+            self._records[resource] = {}
+            self._listeners[resource] = []
+            self._waiting[resource] = []
+        self._loaded.clear()
+        self._seen_payments = set()
+
+
+def store_for(widget, api_client) -> DataStore:
+    """Devuelve el almacén compartido de la ventana principal que contiene a `widget`."""
+    root = widget.winfo_toplevel()
+    store = getattr(root, '_data_store', None)
+    if store is None or store.api_client is not api_client:
+        store = DataStore(api_client, runner_for(root))
+        root._data_store = store
+    return store
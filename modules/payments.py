@@ -2,19 +2,97 @@
 import customtkinter as ctk
 from tkinter import ttk, messagebox
 from api_client import APIClient
+from records import Payment
 import datetime
 from modules.pdf_generator import generate_receipt
+from modules.background import runner_for
+from modules.data_store import store_for
+from modules.virtual_table import VirtualTable
+from modules.table_populator import TablePopulator
+from modules.subscriber_picker import SubscriberPicker, subscriber_label
+from search_index import SearchIndex
 import calendar
 
+# Intervalo (ms) para refrescar la tabla cuando se envían pagos que estaban pendientes
+PENDING_CHECK_MS = 10000
+# Pagos por página al cargar la tabla
+PAGE_SIZE = 500
+# Espera (ms) tras la última tecla antes de filtrar la tabla
+SEARCH_DEBOUNCE_MS = 150
+# Datos del suscriptor que imprime el recibo
+RECEIPT_SUBSCRIBER_FIELDS = ('nombre', 'apellido', 'numero_paja', 'direccion')
+
+def has_receipt_data(payment) -> bool:
+    """Indica si el pago trae todos los datos del suscriptor que lleva el recibo."""
+    return all(payment.get(field) not in (None, '') for field in RECEIPT_SUBSCRIBER_FIELDS)
+
+def format_payment_row(payment):
+    """Convierte un pago (`records.Payment`) en los valores de una fila de la tabla y su tag."""
+    id_pago = payment.id_pago
+    nombre_completo = f"{payment.nombre} {payment.apellido}"
+    paja = str(payment.numero_paja)
+    
+    # Formatear fecha
+    fecha_pago = payment.fecha_pago
+    if isinstance(fecha_pago, str):
+        try:
+            fecha_dt = datetime.datetime.fromisoformat(fecha_pago.replace('Z', '+00:00'))
+            fecha_str = fecha_dt.strftime('%Y-%m-%d')
+        except:
+            fecha_str = fecha_pago[:10] if len(fecha_pago) >= 10 else fecha_pago
+    else:
+        fecha_str = str(fecha_pago)[:10]
+    
+    monto_str = f"Q {payment.monto:.2f}"
+    mes = payment.mes_pagado
+    metodo = payment.metodo_pago or ''
+    observacion_str = payment.observacion or ""
+    
+    tag = 'efectivo' if metodo.lower() == 'efectivo' else 'credito'
+    return (id_pago, nombre_completo, paja, fecha_str, monto_str, mes, metodo, observacion_str), tag
+
+def payment_row(payment):
+    """Fila (clave, valores, tags) de un pago para la tabla virtual."""
+    values, tag = format_payment_row(payment)
+    return str(payment.id_pago), values, (tag,)
+
+def payment_search_fields(payment):
+    """Textos por los que se puede buscar un pago."""
+    return (payment.id_pago, payment.nombre, payment.apellido, payment.numero_paja,
+            payment.mes_pagado, payment.metodo_pago, payment.direccion)
+
 class PaymentsWindow(ctk.CTkFrame): 
     def __init__(self, master, api_client: APIClient):
         super().__init__(master)
         self.api_client = api_client
+        # Búsqueda que muestra la tabla cuando se consultó al servidor (None: los pagos del almacén)
+        self.current_search = None
+        # Índice de búsqueda de los pagos del almacén; solo filtra cuando ya están todos
+        self.search_index = None
+        self.pending_index_changes = []
+        self._search_job = None
+        # Las llamadas a la API corren en segundo plano para no congelar la ventana
+        self.runner = runner_for(self)
+        # Suscriptores y pagos viven en el almacén compartido; la ventana solo los muestra
+        self.store = store_for(self, api_client)
+        # Los pagos (pueden ser cientos de miles) se pasan a la tabla por tramos
+        self.populator = TablePopulator(self)
+        # Cambios recibidos mientras se llenaba la tabla (se aplican al terminar)
+        self.pending_changes = []
         
         self.configure_treeview_style() 
         self.build_ui()
+        self.store.subscribe('users', self.on_users_changed)
+        self.store.subscribe('payments', self.on_payments_changed)
         self.load_users()
-        self.load_payments()
+        self.show_payments()
+        self.set_loading(True)
+        # Si otra ventana (o la precarga) ya descargó los pagos no se vuelven a pedir
+        self.store.ensure('payments', on_error=self.show_load_error, on_done=self.finish_loading)
+        
+        # Revisar periódicamente si se enviaron pagos pendientes (sin conexión)
+        self.pending_count = len(self.api_client.pending_writes('/payments/'))
+        self.after(PENDING_CHECK_MS, self.check_pending_payments)
 
     def configure_treeview_style(self):
         """Configura el estilo visual de la tabla (Treeview) de Tkinter."""
@@ -53,10 +131,7 @@ class PaymentsWindow(ctk.CTkFrame):
         form_container.grid_columnconfigure(5, weight=0)
 
         # Variables de formulario
-        self.users_dict = {}
         self.selected_user_id = None
-        self.user_names = ['Cargando Usuarios...']
-        self.selected_user_var = ctk.StringVar(value=self.user_names[0])
         
         self.fecha_var = ctk.StringVar(value=datetime.date.today().strftime("%Y-%m-%d"))
         self.monto_var = ctk.StringVar()
@@ -70,12 +145,9 @@ class PaymentsWindow(ctk.CTkFrame):
         
         # Fila 0: Usuario y Monto
         ctk.CTkLabel(form_container, text="Suscriptor:", font=('Segoe UI', 12)).grid(row=0, column=0, padx=(10, 5), pady=10, sticky="w")
-        self.user_dropdown = ctk.CTkOptionMenu(form_container, 
-                                               values=self.user_names, 
-                                               variable=self.selected_user_var,
-                                               command=self.on_user_select,
-                                               height=35)
-        self.user_dropdown.grid(row=0, column=1, padx=(0, 15), pady=10, sticky="ew")
+        # Se busca escribiendo: una lista desplegable con miles de suscriptores no se puede recorrer
+        self.user_picker = SubscriberPicker(form_container, on_select=self.on_user_select, height=35)
+        self.user_picker.grid(row=0, column=1, padx=(0, 15), pady=10, sticky="ew")
 
         ctk.CTkLabel(form_container, text="Monto (Q):", font=('Segoe UI', 12)).grid(row=0, column=2, padx=(10, 5), pady=10, sticky="w")
         ctk.CTkEntry(form_container, textvariable=self.monto_var, height=35).grid(row=0, column=3, padx=(0, 15), pady=10, sticky="ew")
@@ -110,6 +182,7 @@ class PaymentsWindow(ctk.CTkFrame):
                                           height=105, 
                                           font=('Segoe UI', 14, 'bold'))
         self.register_btn.grid(row=0, column=5, rowspan=3, padx=(15, 10), pady=10, sticky="nsew")
+        self.register_btn.configure(state="disabled")
 
         # --- Contenedor de la Tabla ---
         table_container = ctk.CTkFrame(self)
@@ -123,35 +196,38 @@ class PaymentsWindow(ctk.CTkFrame):
         search_frame.grid_columnconfigure(0, weight=1)
         
         self.search_var = ctk.StringVar()
+        self.search_var.trace_add('write', lambda *args: self.schedule_search())
         self.search_entry = ctk.CTkEntry(search_frame, 
                                          textvariable=self.search_var, 
-                                         placeholder_text="Buscar Pago (ID o Mes)...",
+                                         placeholder_text="Buscar Pago (ID, nombre, paja o mes)...",
                                          height=35,
                                          font=('Segoe UI', 12))
         self.search_entry.grid(row=0, column=0, sticky='ew', padx=(0, 8))
         
         ctk.CTkButton(search_frame, 
                       text="🔍 Buscar", 
-                      command=lambda: self.load_payments(self.search_var.get()), 
+                      command=self.search_payments, 
                       width=100,
                       height=35,
                       fg_color="#3F51B5").grid(row=0, column=1, padx=8) 
         
-        ctk.CTkButton(search_frame, 
-                      text="🔄", 
-                      command=lambda: self.load_payments(clear_search=True), 
-                      width=40,
-                      height=35,
-                      fg_color="#FF9800").grid(row=0, column=2, padx=8) 
+        self.refresh_btn = ctk.CTkButton(search_frame, 
+                                         text="🔄", 
+                                         command=lambda: self.load_payments(clear_search=True), 
+                                         width=40,
+                                         height=35,
+                                         fg_color="#FF9800")
+        self.refresh_btn.grid(row=0, column=2, padx=8) 
 
         # Tabla (Treeview)
         self.tree = ttk.Treeview(table_container, columns=('IdPago', 'Nombre', 'Paja', 'Fecha', 'Monto', 'Mes', 'Metodo', 'Observacion'), show='headings')
         self.tree.grid(row=1, column=0, sticky='nsew', padx=10, pady=10)
         
         # Scrollbar
-        vsb = ttk.Scrollbar(table_container, orient="vertical", command=self.tree.yview)
+        vsb = ttk.Scrollbar(table_container, orient="vertical")
         vsb.grid(row=1, column=1, sticky='ns')
-        self.tree.configure(yscrollcommand=vsb.set)
+        # Solo se crean en Tk las filas visibles; los pagos quedan en `self.table`
+        self.table = VirtualTable(self.tree, vsb)
 
         # Definir encabezados
         self.tree.heading('IdPago', text='ID Pago')
@@ -173,6 +249,12 @@ class PaymentsWindow(ctk.CTkFrame):
         self.tree.column('Metodo', width=90, anchor='center')
         self.tree.column('Observacion', width=180)
         
+        # Colores por tipo de fila
+        self.tree.tag_configure('efectivo', foreground='#FFFFFF')
+        self.tree.tag_configure('credito', foreground='#FF5722')
+        self.tree.tag_configure('pendiente', foreground='#FFC107')
+        self.tree.tag_configure('empty', foreground='gray')
+        
         # Binding para regenerar recibo
         self.tree.bind('<Double-1>', self.re_generate_receipt)
 
@@ -213,37 +295,32 @@ class PaymentsWindow(ctk.CTkFrame):
         return month_str
 
     def load_users(self):
-        """Carga los usuarios activos para el OptionMenu de registro usando la API."""
-        try:
-            users = self.api_client.get_users(active_only=True)
-            
-            self.users_dict = {}
-            self.user_names = []
-            
-            for user in users:
-                user_id = user['id_usuario']
-                full_name = f"{user['nombre']} {user['apellido']} (Paja: {user['numero_paja']})"
-                self.users_dict[full_name] = user_id
-                self.user_names.append(full_name)
-
-            if self.user_names:
-                self.selected_user_var.set(self.user_names[0])
-                self.user_dropdown.configure(values=self.user_names)
-                self.on_user_select(self.user_names[0])
-            else:
-                self.user_names = ['No hay usuarios activos']
-                self.selected_user_var.set('No hay usuarios activos')
-                self.user_dropdown.configure(values=['No hay usuarios activos'])
-                self.register_btn.configure(state="disabled")
+        """Carga el buscador de suscriptores desde el almacén compartido (los descarga si nadie lo hizo aún)."""
+        if self.store.records('users'):
+            self.show_users()
+        self.store.ensure('users', on_error=self.show_users_error)
+
+    def on_users_changed(self, change):
+        # Un alta, baja o cambio de estado (en esta o en otra ventana) actualiza el buscador al momento
+        if change.reset:
+            self.show_users()
+            return
+        self.user_picker.update_subscribers(
+            changed=[user for user in change.changed if user.estado],
+            removed=[user.id_usuario for user in change.changed if not user.estado] + list(change.deleted))
 
-        except Exception as e:
-            error_msg = str(e)
-            messagebox.showerror("Error", f"Error al cargar usuarios para pago: {error_msg}")
+    def show_users(self):
+        """Pasa al buscador los usuarios activos (se conserva el elegido si sigue activo)."""
+        self.user_picker.set_subscribers(user for user in self.store.records('users') if user.estado)
 
-    def on_user_select(self, user_name):
+    def show_users_error(self, e):
+        error_msg = str(e)
+        messagebox.showerror("Error", f"Error al cargar usuarios para pago: {error_msg}")
+
+    def on_user_select(self, user_id):
         """Actualiza el ID del usuario seleccionado."""
-        self.selected_user_id = self.users_dict.get(user_name)
-        if self.selected_user_id:
+        self.selected_user_id = user_id
+        if self.selected_user_id is not None:
             self.register_btn.configure(state="normal")
         else:
             self.register_btn.configure(state="disabled")
@@ -260,60 +337,215 @@ class PaymentsWindow(ctk.CTkFrame):
             self.mes_var.set(current_month)
 
     def load_payments(self, search_term=None, clear_search=False):
-        """Carga los pagos desde la API y actualiza el Treeview."""
+        """Actualiza la tabla: sincroniza los pagos del almacén o, con `search_term`, consulta al servidor."""
         if clear_search:
             self.search_var.set('')
             search_term = None
-            
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        
+        if search_term:
+            self.load_payments_from_server(search_term)
+        else:
+            self.show_store_view()
+            self.sync_payments()
+
+    def sync_payments(self):
+        """Pide al almacén compartido los pagos nuevos (una sola descarga para todas las ventanas)."""
+        self.set_loading(True)
+        self.store.load('payments', on_error=self.show_load_error, on_done=self.finish_loading)
+
+    def schedule_search(self):
+        """Filtra la tabla poco después de la última tecla (no en cada una)."""
+        if self._search_job is not None:
+            self.after_cancel(self._search_job)
+        self._search_job = self.after(SEARCH_DEBOUNCE_MS, self.filter_payments)
+
+    def search_payments(self):
+        """Botón Buscar: filtra en memoria si ya están todos los pagos; si no, pregunta al servidor."""
+        term = self.search_var.get().strip()
+        if self.store.is_loaded('payments'):
+            if self.current_search is not None:
+                # El filtro se aplica al terminar de llenar la tabla
+                self.show_store_view()
+            else:
+                self.filter_payments()
+        elif term:
+            self.load_payments(term)
+        elif self.current_search is not None:
+            self.load_payments()
 
-        try:
-            payments = self.api_client.get_payments(search=search_term)
-            
-            if not payments:
-                self.tree.insert('', 'end', values=("", "No hay pagos", "o coincidencias", "", "", "", "", ""), tags=('empty',))
-                self.tree.tag_configure('empty', foreground='gray')
-                return
-
-            for payment in payments:
-                id_pago = payment['id_pago']
-                nombre_completo = f"{payment['nombre']} {payment['apellido']}"
-                paja = str(payment['numero_paja'])
-                
-                # Formatear fecha
-                fecha_pago = payment['fecha_pago']
-                if isinstance(fecha_pago, str):
-                    try:
-                        fecha_dt = datetime.datetime.fromisoformat(fecha_pago.replace('Z', '+00:00'))
-                        fecha_str = fecha_dt.strftime('%Y-%m-%d')
-                    except:
-                        fecha_str = fecha_pago[:10] if len(fecha_pago) >= 10 else fecha_pago
-                else:
-                    fecha_str = str(fecha_pago)[:10]
-                
-                monto_str = f"Q {payment['monto']:.2f}"
-                mes = payment['mes_pagado']
-                metodo = payment['metodo_pago']
-                observacion_str = payment.get('observacion', '') or ""
-                
-                tag = 'efectivo' if metodo.lower() == 'efectivo' else 'credito'
-                
-                self.tree.insert('', 'end', 
-                                 values=(id_pago, nombre_completo, paja, fecha_str, monto_str, mes, metodo, observacion_str),
-                                 tags=(tag,),
-                                 iid=str(id_pago)) 
-                
-                self.tree.tag_configure('efectivo', foreground='#FFFFFF')
-                self.tree.tag_configure('credito', foreground='#FF5722')
-
-        except Exception as e:
-            error_msg = str(e)
-            if "connection" in error_msg.lower() or "conexión" in error_msg.lower():
-                messagebox.showerror("Error de Conexión", f"No se pudo conectar con el servidor: {error_msg}")
+    def filter_payments(self):
+        """Muestra solo los pagos que coinciden con el texto de búsqueda (sin llamar a la API)."""
+        self._search_job = None
+        if (self.current_search is not None or not self.store.is_loaded('payments')
+                or self.search_index is None or self.populator.is_running()):
+            # Se aplica al terminar de cargar la tabla o el índice
+            return
+        self.table.set_filter(self.search_index.search(self.search_var.get()))
+
+    def show_store_view(self):
+        """Vuelve a mostrar los pagos del almacén si la tabla tenía una búsqueda del servidor."""
+        if self.current_search is None:
+            return
+        self.current_search = None
+        self.runner.cancel('busqueda-pagos')
+        self.show_payments()
+
+    def show_payments(self):
+        """Llena la tabla con los pagos del almacén (por tramos) y arma su índice en segundo plano."""
+        payments = self.store.records('payments')
+        self.pending_changes = []
+        self.pending_index_changes = []
+        self.search_index = None
+        self.table.clear()
+        self.runner.submit('indice-pagos', SearchIndex.build, payments,
+                           lambda payment: str(payment.id_pago), payment_search_fields,
+                           on_success=self.set_index)
+        self.populator.start(payments, payment_row, self.table.append,
+                             on_progress=self.show_progress, on_done=self.finish_populating)
+
+    def finish_populating(self):
+        # Cambios que llegaron mientras se llenaba la tabla
+        for change in self.pending_changes:
+            self.apply_changes(change)
+        self.pending_changes = []
+        self.finish_loading()
+
+    def on_payments_changed(self, change):
+        """Recibe los cambios del almacén: páginas descargadas, sincronizaciones y pagos registrados."""
+        if change.reset:
+            if self.current_search is None:
+                self.show_payments()
             else:
-                messagebox.showerror("Error de Base de Datos", f"Error al cargar pagos: {error_msg}")
+                # Se vuelve a construir al regresar de la búsqueda
+                self.runner.cancel('indice-pagos')
+                self.search_index = None
+            return
+        
+        self.update_index(change)
+        if self.current_search is not None:
+            # La tabla muestra una búsqueda del servidor
+            return
+        if self.populator.is_running():
+            self.pending_changes.append(change)
+        else:
+            self.apply_changes(change)
+
+    def apply_changes(self, change):
+        """Aplica a la tabla solo los pagos nuevos, modificados y eliminados."""
+        # Tiempo de insertar filas, para compararlo con el de red y decodificación
+        with self.api_client.metrics.timer('tabla pagos', 'render'):
+            self.table.append(payment_row(payment) for payment in change.changed)
+        self.table.delete(*(str(id_pago) for id_pago in change.deleted))
+        if change.changed and self.table.exists('empty'):
+            self.table.delete('empty')
+
+    def load_payments_from_server(self, search_term):
+        """Consulta al servidor los pagos que coinciden con `search_term` (mientras el almacén no los tiene todos)."""
+        self.current_search = search_term
+        self.populator.cancel()
+        self.table.clear()
+        self.loaded_total = 0
+        self.set_loading(True)
+        # Las páginas llegan en streaming: la primera se muestra antes de descargar el resto
+        self.runner.stream('busqueda-pagos',
+                           lambda: self.api_client.iter_payments(page_size=PAGE_SIZE, search=search_term),
+                           on_item=self.insert_payment_page,
+                           on_success=self.finish_server_search,
+                           on_error=self.show_load_error,
+                           on_done=self.finish_loading)
+
+    def insert_payment_page(self, page):
+        # Tiempo de insertar filas, para compararlo con el de red y decodificación
+        with self.api_client.metrics.timer('tabla pagos', 'render'):
+            self.table.append(payment_row(payment) for payment in page)
+        self.loaded_total += len(page)
+
+    def finish_server_search(self, _=None):
+        if not self.loaded_total:
+            self.insert_empty_row()
+
+    def set_index(self, index):
+        self.search_index = index
+        # Cambios recibidos mientras se construía el índice
+        for change in self.pending_index_changes:
+            self.update_index(change)
+        self.pending_index_changes = []
+        self.filter_payments()
+
+    def update_index(self, change):
+        if self.search_index is None:
+            if self.runner.is_running('indice-pagos'):
+                self.pending_index_changes.append(change)
+            return
+        for payment in change.changed:
+            self.search_index.add(str(payment.id_pago), payment_search_fields(payment))
+        for id_pago in change.deleted:
+            self.search_index.remove(str(id_pago))
+
+    def show_progress(self, done, total):
+        if total:
+            self.refresh_btn.configure(text=f"{done * 100 // total}%")
+
+    def remove_status_rows(self):
+        # Las filas de estado (pendientes / sin resultados) se regeneran en cada carga
+        self.table.delete(*(key for key in self.table.keys()
+                            if key.startswith('pendiente-') or key == 'empty'))
+
+    def refresh_status_rows(self):
+        """Vuelve a poner arriba los pagos pendientes de envío y, si no hay ninguno, la fila vacía."""
+        self.remove_status_rows()
+        self.insert_pending_payments()
+        if not len(self.table):
+            self.insert_empty_row()
+
+    def set_loading(self, loading):
+        self.refresh_btn.configure(text="⏳" if loading else "🔄")
+
+    def finish_loading(self):
+        if (self.store.is_loading('payments') or self.runner.is_running('busqueda-pagos')
+                or self.populator.is_running()):
+            return
+        self.set_loading(False)
+        if self.current_search is None:
+            self.refresh_status_rows()
+        self.filter_payments()
+
+    def insert_empty_row(self):
+        self.table.insert('empty', ("", "No hay pagos", "o coincidencias", "", "", "", "", ""), ('empty',))
+
+    def show_load_error(self, e):
+        error_msg = str(e)
+        if "connection" in error_msg.lower() or "conexión" in error_msg.lower():
+            messagebox.showerror("Error de Conexión", f"No se pudo conectar con el servidor: {error_msg}")
+        else:
+            messagebox.showerror("Error de Base de Datos", f"Error al cargar pagos: {error_msg}")
             
+    def insert_pending_payments(self):
+        """Muestra al inicio de la tabla los pagos guardados localmente que aún no llegan al servidor."""
+        pending = self.api_client.pending_writes('/payments/')
+        
+        for index, entry in enumerate(pending):
+            payment = entry['payload']
+            user = self.store.get('users', payment['id_usuario'])
+            nombre = subscriber_label(user) if user is not None else f"Usuario {payment['id_usuario']}"
+            self.table.insert(f"pendiente-{entry['idempotency_key']}",
+                              ('pendiente', nombre, '', payment['fecha_pago'],
+                               f"Q {payment['monto']:.2f}", payment['mes_pagado'],
+                               payment['metodo_pago'], payment.get('observacion') or ''),
+                              ('pendiente',), index=index)
+        return len(pending)
+
+    def check_pending_payments(self):
+        """Recarga la tabla cuando cambia el número de pagos pendientes de envío."""
+        if not self.winfo_exists():
+            return
+        count = len(self.api_client.pending_writes('/payments/'))
+        if count != self.pending_count:
+            self.pending_count = count
+            # Un pago pendiente llegó al servidor: se sincroniza el almacén y se rehacen las filas pendientes
+            self.sync_payments()
+        self.after(PENDING_CHECK_MS, self.check_pending_payments)
+
     def add_payment(self):
         """Guarda el nuevo pago usando la API y genera el recibo."""
         
@@ -344,97 +576,127 @@ class PaymentsWindow(ctk.CTkFrame):
             messagebox.showerror("Error", "El formato de fecha debe ser YYYY-MM-DD.")
             return
 
-        try:
-            # Crear pago usando la API
-            payment_data = {
-                "id_usuario": self.selected_user_id,
-                "fecha_pago": fecha_pago.isoformat(),
-                "monto": monto,
-                "mes_pagado": mes_pagado,
-                "metodo_pago": metodo_pago,
-                "observacion": observacion if observacion else None
-            }
-            
-            new_payment = self.api_client.create_payment(payment_data)
-            
-            messagebox.showinfo('Éxito', 'Pago registrado correctamente.')
-            self.load_payments()
+        payment_data = {
+            "id_usuario": self.selected_user_id,
+            "fecha_pago": fecha_pago.isoformat(),
+            "monto": monto,
+            "mes_pagado": mes_pagado,
+            "metodo_pago": metodo_pago,
+            "observacion": observacion if observacion else None
+        }
 
-            # Generar Recibo usando los datos del pago creado
-            payment_detail = self.api_client.get_payment(new_payment['id_pago'])
-            
-            if payment_detail:
-                pago_info = {
-                    'IdPago': payment_detail['id_pago'],
-                    'Monto': payment_detail['monto'],
-                    'MesPagado': payment_detail['mes_pagado'],
-                    'FechaPago': payment_detail['fecha_pago'],
-                    'MetodoPago': payment_detail['metodo_pago'],
-                    'Observacion': payment_detail.get('observacion')
-                }
-                user_info = {
-                    'Nombre': payment_detail['nombre'],
-                    'Apellido': payment_detail['apellido'],
-                    'Direccion': payment_detail.get('direccion', ''),
-                    'NumeroPaja': str(payment_detail['numero_paja'])
-                }
-                generate_receipt(pago_info, user_info)
-            
+        # Crear pago usando la API en segundo plano; el botón evita enviarlo dos veces
+        self.register_btn.configure(state="disabled")
+        self.runner.submit('registrar-pago', self.api_client.create_payment, payment_data,
+                           on_success=self.finish_add_payment,
+                           on_error=lambda e: self.show_add_payment_error(e, mes_pagado),
+                           on_done=lambda: self.on_user_select(self.selected_user_id))
+
+    def finish_add_payment(self, new_payment):
+        if new_payment.get('estado_envio') == 'pendiente':
+            # Sin conexión: el pago quedó en el diario local y se enviará automáticamente
+            messagebox.showinfo('Pago Pendiente',
+                                'No hay conexión con el servidor.\n'
+                                'El pago quedó guardado en este equipo y se enviará automáticamente '
+                                'al recuperar la conexión. El recibo podrá generarse después.')
+            self.pending_count += 1
+            if self.current_search is None:
+                self.refresh_status_rows()
             self.clear_form()
+            return
+        
+        messagebox.showinfo('Éxito', 'Pago registrado correctamente.')
+        self.clear_form()
 
-        except Exception as e:
-            error_msg = str(e)
-            if "Ya existe" in error_msg or "duplicado" in error_msg.lower():
-                messagebox.showerror('Error de Duplicidad', 
-                                   f"Ya existe un pago registrado para este usuario en {mes_pagado}.\n\n"
-                                   "No se pueden registrar dos pagos para el mismo mes.")
-            elif "connection" in error_msg.lower() or "conexión" in error_msg.lower():
-                messagebox.showerror('Error de Conexión', f'No se pudo conectar con el servidor: {error_msg}')
-            else:
-                messagebox.showerror('Error', f'Error al guardar el pago: {error_msg}')
+        # El recibo y el almacén usan el pago devuelto si el almacén tiene al suscriptor
+        payment_detail = self.payment_from_response(new_payment)
+        if has_receipt_data(payment_detail):
+            self.show_new_receipt(payment_detail)
+            return
+        # Si no (p. ej. la ventana viene de una búsqueda en el servidor) se pide el detalle completo
+        self.runner.submit('recibo', self.api_client.get_payment, new_payment['id_pago'],
+                           on_success=self.show_new_receipt,
+                           on_error=self.show_receipt_error)
+
+    def show_new_receipt(self, payment_detail):
+        if not payment_detail:
+            messagebox.showwarning("Advertencia", "No se encontraron detalles para este pago.")
+            return
+        # El pago completo se agrega al almacén: las vistas se actualizan sin descargar la lista
+        self.store.put('payments', payment_detail)
+        self.print_receipt(payment_detail)
+
+    def payment_from_response(self, new_payment):
+        """Pago creado como registro, completando con el almacén los datos del suscriptor que falten."""
+        user = self.store.get('users', new_payment.get('id_usuario'))
+        subscriber = {'nombre': user.nombre, 'apellido': user.apellido, 'numero_paja': user.numero_paja,
+                      'direccion': user.direccion} if user is not None else {}
+        return Payment.from_dict({**subscriber, **{key: value for key, value in new_payment.items()
+                                                   if value is not None and key != 'estado_envio'}})
+
+    def show_add_payment_error(self, e, mes_pagado):
+        error_msg = str(e)
+        if "Ya existe" in error_msg or "duplicado" in error_msg.lower():
+            messagebox.showerror('Error de Duplicidad', 
+                               f"Ya existe un pago registrado para este usuario en {mes_pagado}.\n\n"
+                               "No se pueden registrar dos pagos para el mismo mes.")
+        elif "connection" in error_msg.lower() or "conexión" in error_msg.lower():
+            messagebox.showerror('Error de Conexión', f'No se pudo conectar con el servidor: {error_msg}')
+        else:
+            messagebox.showerror('Error', f'Error al guardar el pago: {error_msg}')
+
+    def print_receipt(self, payment_detail, is_regenerated=False):
+        pago_info = {
+            'IdPago': payment_detail.id_pago,
+            'Monto': payment_detail.monto,
+            'MesPagado': payment_detail.mes_pagado,
+            'FechaPago': payment_detail.fecha_pago,
+            'MetodoPago': payment_detail.metodo_pago,
+            'Observacion': payment_detail.observacion
+        }
+        user_info = {
+            'Nombre': payment_detail.nombre,
+            'Apellido': payment_detail.apellido,
+            'Direccion': payment_detail.direccion or '',
+            'NumeroPaja': str(payment_detail.numero_paja)
+        }
+        generate_receipt(pago_info, user_info, is_regenerated=is_regenerated)
 
     def re_generate_receipt(self, event):
         """Regenera el recibo de un pago al hacer doble clic en la tabla."""
-        selected_item = self.tree.focus()
-        if not selected_item or self.tree.item(selected_item, 'tags') == ('empty',):
+        selected_item = self.table.focus()
+        if not selected_item:
             return
-
-        id_pago_str = self.tree.item(selected_item, 'values')[0]
         
+        # La clave de la fila es el id_pago (las filas pendientes y vacía no tienen uno numérico)
         try:
-            id_pago = int(id_pago_str)
-        except (ValueError, IndexError):
+            id_pago = int(selected_item)
+        except ValueError:
             return
         
         if not messagebox.askyesno("Confirmar Regeneración", f"¿Desea generar nuevamente el recibo para el Pago ID {id_pago}?"):
             return
             
-        try:
-            payment_detail = self.api_client.get_payment(id_pago)
-            
-            if payment_detail:
-                pago_info = {
-                    'IdPago': payment_detail['id_pago'],
-                    'Monto': payment_detail['monto'],
-                    'MesPagado': payment_detail['mes_pagado'],
-                    'FechaPago': payment_detail['fecha_pago'],
-                    'MetodoPago': payment_detail['metodo_pago'],
-                    'Observacion': payment_detail.get('observacion')
-                }
-                user_info = {
-                    'Nombre': payment_detail['nombre'],
-                    'Apellido': payment_detail['apellido'],
-                    'Direccion': payment_detail.get('direccion', ''),
-                    'NumeroPaja': str(payment_detail['numero_paja'])
-                }
-                generate_receipt(pago_info, user_info, is_regenerated=True)
-            else:
-                messagebox.showwarning("Advertencia", "No se encontraron detalles para este pago.")
+        # El almacén ya tiene el pago (salvo en una búsqueda del servidor); los registros de la
+        # lista pueden venir sin dirección, y entonces se pide el detalle
+        payment_detail = self.store.get('payments', id_pago)
+        if payment_detail is not None and has_receipt_data(payment_detail):
+            self.show_regenerated_receipt(payment_detail)
+            return
+        self.runner.submit('recibo', self.api_client.get_payment, id_pago,
+                           on_success=self.show_regenerated_receipt,
+                           on_error=self.show_receipt_error)
 
-        except Exception as e:
-            error_msg = str(e)
-            if "connection" in error_msg.lower() or "conexión" in error_msg.lower():
-                messagebox.showerror('Error de Conexión', f'No se pudo conectar con el servidor: {error_msg}')
-            else:
-                messagebox.showerror('Error', f'Error al regenerar recibo: {error_msg}')
+    def show_regenerated_receipt(self, payment_detail):
+        if payment_detail:
+            self.print_receipt(payment_detail, is_regenerated=True)
+        else:
+            messagebox.showwarning("Advertencia", "No se encontraron detalles para este pago.")
+
+    def show_receipt_error(self, e):
+        error_msg = str(e)
+        if "connection" in error_msg.lower() or "conexión" in error_msg.lower():
+            messagebox.showerror('Error de Conexión', f'No se pudo conectar con el servidor: {error_msg}')
+        else:
+            messagebox.showerror('Error', f'Error al generar el recibo: {error_msg}')
 
@@ -1,12 +1,10 @@
 # frontend/modules/pdf_generator.py
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-from reportlab.lib.units import inch
+# reportlab y fpdf se importan dentro de cada función: tardan en cargar y solo
+# hacen falta al imprimir, no al abrir la aplicación.
 from tkinter import messagebox
 import os
 import datetime
 import platform
-from fpdf import FPDF
 
 def generate_report_pdf(title, headers, data):
     """Genera un reporte general a partir de los datos de un Treeview."""
@@ -20,6 +18,7 @@ def generate_report_pdf(title, headers, data):
     filepath = os.path.join(folder, filename)
 
     try:
+        from fpdf import FPDF
         pdf = FPDF(orientation='L', unit='mm', format='A4')
         pdf.add_page()
         pdf.set_font('Arial', 'B', 16)
@@ -80,6 +79,9 @@ def generate_receipt(pago_info, user_info, is_regenerated=False):
         file_path = os.path.join(receipt_dir, f"{receipt_number}.pdf")
         
         # 2. Configurar el lienzo (Canvas)
+        from reportlab.lib.pagesizes import A4
+        from reportlab.pdfgen import canvas
+        from reportlab.lib.units import inch
         c = canvas.Canvas(file_path, pagesize=A4)
         width, height = A4
         
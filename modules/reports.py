@@ -4,13 +4,26 @@ from tkinter import ttk, messagebox, filedialog
 from api_client import APIClient
 import datetime
 from modules.pdf_generator import generate_report_pdf 
-import openpyxl
+from modules.background import runner_for
+from modules.data_store import store_for
+from modules.virtual_table import VirtualTable
+from modules.table_populator import TablePopulator
+from report_engine import NUMPY_AVAILABLE, GROUP_FIELDS, ReportEngine, ReportFilter
 import os
 
+METODOS = ('Todos', 'Efectivo', 'Crédito', 'Transferencia')
+
 class ReportsWindow(ctk.CTkFrame): 
     def __init__(self, master, api_client: APIClient):
         super().__init__(master)
         self.api_client = api_client
+        # Las llamadas a la API corren en segundo plano para no congelar la ventana
+        self.runner = runner_for(self)
+        # Los reportes grandes se pasan a la tabla por tramos
+        self.populator = TablePopulator(self)
+        # Con NumPy los reportes se calculan aquí sobre los datos del almacén (None mientras se arma)
+        self.engine = None
+        self.pending_engine_changes = []
         
         # Variables para capturar los datos y encabezados de la última consulta
         self.current_report_data = []
@@ -21,6 +34,14 @@ class ReportsWindow(ctk.CTkFrame):
         self.build_ui()
         self.show_welcome_message()
 
+        if NUMPY_AVAILABLE:
+            self.store = store_for(self, api_client)
+            self.store.subscribe('users', self.on_store_changed)
+            self.store.subscribe('payments', self.on_store_changed)
+            # Sin errores a la vista: si no se pueden cargar, los reportes se piden al servidor
+            self.store.ensure('users', on_done=self.build_engine)
+            self.store.ensure('payments', on_done=self.build_engine)
+
     def configure_treeview_style(self):
         """Configura el estilo visual de la tabla (Treeview) de Tkinter."""
         style = ttk.Style()
@@ -85,6 +106,9 @@ class ReportsWindow(ctk.CTkFrame):
                                             state="disabled")
         self.btn_export_excel.pack(side='left', padx=6)
 
+        if NUMPY_AVAILABLE:
+            self.build_filters(control_frame)
+
         # --- Fila 2: Contenedor de Tabla y Mensaje de Bienvenida ---
         self.content_container = ctk.CTkFrame(self)
         self.content_container.grid(row=2, column=0, sticky='nsew', padx=15, pady=(0, 15))
@@ -122,13 +146,45 @@ class ReportsWindow(ctk.CTkFrame):
         self.tree.pack(fill='both', expand=True, padx=10, pady=10)
         
         # Scrollbar
-        vsb = ttk.Scrollbar(self.table_frame, orient="vertical", command=self.tree.yview)
+        vsb = ttk.Scrollbar(self.table_frame, orient="vertical")
         vsb.place(relx=1.0, rely=0, relheight=1.0, width=20, anchor='ne')
-        self.tree.configure(yscrollcommand=vsb.set)
+        # Solo se crean en Tk las filas visibles; los datos quedan en `self.table`
+        self.table = VirtualTable(self.tree, vsb)
         
         # Mostrar mensaje de bienvenida al iniciar
         self.show_welcome_message()
         
+    def build_filters(self, control_frame):
+        """Filtros y agrupación de los reportes calculados en este equipo."""
+        filter_frame = ctk.CTkFrame(control_frame, fg_color="transparent")
+        filter_frame.grid(row=1, column=0, columnspan=2, sticky='w', padx=10, pady=(0, 5))
+
+        self.desde_var = ctk.StringVar()
+        self.hasta_var = ctk.StringVar()
+        self.metodo_var = ctk.StringVar(value=METODOS[0])
+        self.group_labels = {label: field for field, label in GROUP_FIELDS.items()}
+        self.group_var = ctk.StringVar(value=GROUP_FIELDS['mes_pagado'])
+
+        ctk.CTkLabel(filter_frame, text="Filtros:", font=('Segoe UI', 12, 'bold')).pack(side='left', padx=(0, 10))
+        ctk.CTkLabel(filter_frame, text="Desde").pack(side='left', padx=(0, 4))
+        ctk.CTkEntry(filter_frame, textvariable=self.desde_var, placeholder_text="YYYY-MM-DD",
+                     width=110).pack(side='left', padx=(0, 8))
+        ctk.CTkLabel(filter_frame, text="Hasta").pack(side='left', padx=(0, 4))
+        ctk.CTkEntry(filter_frame, textvariable=self.hasta_var, placeholder_text="YYYY-MM-DD",
+                     width=110).pack(side='left', padx=(0, 8))
+        ctk.CTkLabel(filter_frame, text="Método").pack(side='left', padx=(0, 4))
+        ctk.CTkOptionMenu(filter_frame, values=list(METODOS), variable=self.metodo_var,
+                          width=130).pack(side='left', padx=(0, 16))
+
+        ctk.CTkLabel(filter_frame, text="Agrupar por:", font=('Segoe UI', 12, 'bold')).pack(side='left', padx=(0, 10))
+        ctk.CTkOptionMenu(filter_frame, values=list(self.group_labels), variable=self.group_var,
+                          width=140).pack(side='left', padx=(0, 8))
+        ctk.CTkButton(filter_frame, text='Agrupar', command=self.report_agrupado, width=90,
+                      fg_color="#3F51B5").pack(side='left', padx=6)
+
+        self.engine_label = ctk.CTkLabel(filter_frame, text="Cargando pagos...", text_color="#888888")
+        self.engine_label.pack(side='left', padx=(16, 0))
+
     def show_welcome_message(self):
         """Muestra el mensaje de bienvenida y oculta la tabla."""
         # Limpiar cualquier dato anterior
@@ -137,8 +193,8 @@ class ReportsWindow(ctk.CTkFrame):
         self.current_report_headers = []
         
         # Limpiar la tabla completamente
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        self.populator.cancel()
+        self.table.clear()
         
         # Ocultar tabla y mostrar mensaje
         self.table_frame.pack_forget()
@@ -159,8 +215,8 @@ class ReportsWindow(ctk.CTkFrame):
         self.show_table()
         
         # Limpiar tabla
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        self.populator.cancel()
+        self.table.clear()
             
         # Configurar columnas y encabezados
         self.tree['columns'] = headers
@@ -193,77 +249,202 @@ class ReportsWindow(ctk.CTkFrame):
         
         # Insertar filas
         if not rows:
-            self.tree.insert('', 'end', values=("No hay datos para este reporte.",), tags=('empty',))
+            self.table.insert('empty', ("No hay datos para este reporte.",), ('empty',))
             self.tree.tag_configure('empty', foreground='gray')
             self.btn_export_pdf.configure(state="disabled")
             self.btn_export_excel.configure(state="disabled")
         else:
-            for row in rows:
-                tag = tag_logic(row) if tag_logic else ''
-                self.tree.insert('', 'end', values=row, tags=(tag,))
+            # La clave de cada fila es su posición: los reportes no tienen un id propio
+            convert = lambda index: (index, rows[index], (tag_logic(rows[index]),) if tag_logic else ())
+            self.populator.start(range(len(rows)), convert, self.table.append,
+                                 on_progress=lambda done, total: self.show_progress(title, done, total))
                 
             self.btn_export_pdf.configure(state="normal")
             self.btn_export_excel.configure(state="normal")
 
         # Actualizar Título en la UI
-        self.title_label.configure(text=f"Reporte Actual: {title}")
+        if not self.populator.is_running():
+            self.title_label.configure(text=f"Reporte Actual: {title}")
+
+    def show_progress(self, title, done, total):
+        if done < total:
+            self.title_label.configure(text=f"Reporte Actual: {title} (cargando {done * 100 // total}%)")
+        else:
+            self.title_label.configure(text=f"Reporte Actual: {title}")
+
+    # --- Motor de Reportes Local ---
+
+    def build_engine(self):
+        """Copia suscriptores y pagos del almacén a columnas en segundo plano (cuando ambos terminaron de cargar)."""
+        if self.engine is not None or self.runner.is_running('motor-reportes'):
+            return
+        for resource in ('users', 'payments'):
+            if not self.store.is_loaded(resource) or self.store.is_loading(resource):
+                return
+        self.pending_engine_changes = []
+        self.runner.submit('motor-reportes', ReportEngine.from_records,
+                           self.store.records('users'), self.store.records('payments'),
+                           on_success=self.set_engine)
+
+    def set_engine(self, engine):
+        self.engine = engine
+        # Cambios recibidos mientras se armaban las columnas
+        for change in self.pending_engine_changes:
+            self.apply_engine_change(change)
+        self.pending_engine_changes = []
+        self.show_engine_status()
+
+    def show_engine_status(self):
+        self.engine_label.configure(text=f"Calculado en este equipo ({len(self.engine.payments)} pagos)")
+
+    def on_store_changed(self, change):
+        if change.reset:
+            # Otra lista completa: se vuelve a armar al terminar la carga
+            self.engine = None
+            self.runner.cancel('motor-reportes')
+            self.engine_label.configure(text="Cargando pagos...")
+            self.store.ensure(change.resource, on_done=self.build_engine)
+            return
+        if self.engine is not None:
+            self.apply_engine_change(change)
+        elif self.runner.is_running('motor-reportes'):
+            self.pending_engine_changes.append(change)
+
+    def apply_engine_change(self, change):
+        if change.resource == 'users':
+            self.engine.update_subscribers(change.changed, change.deleted)
+        else:
+            self.engine.update_payments(change.changed, change.deleted)
+            self.show_engine_status()
+
+    def read_filters(self):
+        """Filtros elegidos en la barra (ReportFilter vacío si no hay); None si una fecha no es válida."""
+        if not NUMPY_AVAILABLE:
+            return ReportFilter()
+        dates = []
+        for var in (self.desde_var, self.hasta_var):
+            text = var.get().strip()
+            try:
+                dates.append(datetime.date.fromisoformat(text) if text else None)
+            except ValueError:
+                messagebox.showerror("Error", "El formato de fecha debe ser YYYY-MM-DD.")
+                return None
+        metodo = self.metodo_var.get()
+        return ReportFilter(start=dates[0], end=dates[1], metodo=None if metodo == METODOS[0] else metodo)
+
+    def filtered_title(self, title, filters):
+        parts = []
+        if filters.start or filters.end:
+            parts.append(f"{filters.start or '...'} a {filters.end or '...'}")
+        if filters.metodo:
+            parts.append(filters.metodo)
+        return f"{title} ({', '.join(parts)})" if parts else title
+
+    def local_report(self, compute):
+        """Calcula un reporte con el motor local midiendo su tiempo en las métricas."""
+        with self.api_client.metrics.timer('reportes locales', 'compute'):
+            return compute(self.engine)
+
+    def engine_not_ready(self):
+        messagebox.showinfo("Reportes",
+                            "Los pagos todavía se están cargando en este equipo.\n"
+                            "Los filtros y agrupaciones estarán disponibles en unos segundos.")
 
     # --- Reportes Específicos ---
 
+    def request_report(self, title, fetch, show):
+        """Pide un reporte en segundo plano; uno nuevo reemplaza al que aún esté cargando."""
+        self.title_label.configure(text=f"Cargando: {title}...")
+        self.runner.submit('reporte', fetch, on_success=show, on_error=self.show_report_error)
+
+    def show_report_error(self, e):
+        self.title_label.configure(text=f"Reporte Actual: {self.current_report_title}" if self.current_report_title else "")
+        error_msg = str(e)
+        if "connection" in error_msg.lower() or "conexión" in error_msg.lower():
+            messagebox.showerror("Error de Conexión", f"No se pudo conectar con el servidor: {error_msg}")
+        else:
+            messagebox.showerror("Error de Base de Datos", f"Error al generar reporte: {error_msg}")
+
     def report_morosos(self):
-        """Genera el reporte de usuarios morosos (más de 35 días sin pagar) usando la API."""
-        try:
-            report_data = self.api_client.get_morosos_report()
-            headers = report_data['encabezados']
-            data = report_data['datos']
-            
-            # Configurar estilo especial para morosos (rojo)
-            self.tree.tag_configure('debtor', foreground='#FF5722')
-            tag_logic = lambda row: 'debtor'
-            
-            self.display_report("Morosos (Más de 35 días)", headers, data, tag_logic)
-        except Exception as e:
-            error_msg = str(e)
-            if "connection" in error_msg.lower() or "conexión" in error_msg.lower():
-                messagebox.showerror("Error de Conexión", f"No se pudo conectar con el servidor: {error_msg}")
-            else:
-                messagebox.showerror("Error de Base de Datos", f"Error al generar reporte: {error_msg}")
+        """Genera el reporte de usuarios morosos (más de 35 días sin pagar), localmente o usando la API."""
+        if self.engine is not None:
+            self.runner.cancel('reporte')
+            self.show_morosos(self.local_report(lambda engine: engine.morosos()))
+            return
+        self.request_report("Morosos (Más de 35 días)", self.api_client.get_morosos_report, self.show_morosos)
+
+    def show_morosos(self, report_data):
+        headers = report_data['encabezados']
+        data = report_data['datos']
+        
+        # Configurar estilo especial para morosos (rojo)
+        self.tree.tag_configure('debtor', foreground='#FF5722')
+        tag_logic = lambda row: 'debtor'
+        
+        self.display_report("Morosos (Más de 35 días)", headers, data, tag_logic)
 
     def report_ingresos(self):
-        """Genera el reporte de ingresos agrupados por mes de pago usando la API."""
-        try:
-            report_data = self.api_client.get_ingresos_report()
-            headers = report_data['encabezados']
-            data = report_data['datos']
-            
-            self.display_report("Ingresos por Mes", headers, data)
-        except Exception as e:
-            error_msg = str(e)
-            if "connection" in error_msg.lower() or "conexión" in error_msg.lower():
-                messagebox.showerror("Error de Conexión", f"No se pudo conectar con el servidor: {error_msg}")
-            else:
-                messagebox.showerror("Error de Base de Datos", f"Error al generar reporte: {error_msg}")
+        """Genera el reporte de ingresos agrupados por mes de pago, localmente (con filtros) o usando la API."""
+        filters = self.read_filters()
+        if filters is None:
+            return
+        if self.engine is not None:
+            self.runner.cancel('reporte')
+            self.show_ingresos(self.local_report(lambda engine: engine.ingresos(filters)),
+                               self.filtered_title("Ingresos por Mes", filters))
+            return
+        if filters != ReportFilter():
+            self.engine_not_ready()
+            return
+        self.request_report("Ingresos por Mes", self.api_client.get_ingresos_report, self.show_ingresos)
+
+    def show_ingresos(self, report_data, title="Ingresos por Mes"):
+        headers = report_data['encabezados']
+        data = report_data['datos']
+        
+        self.display_report(title, headers, data)
 
     def report_pagos_usuario(self):
-        """Genera el reporte de todos los pagos realizados, detallando por usuario usando la API."""
-        try:
-            report_data = self.api_client.get_pagos_usuario_report()
-            headers = report_data['encabezados']
-            data = report_data['datos']
-            
-            # Colores para el método de pago
-            self.tree.tag_configure('efectivo', foreground='#4CAF50')
-            self.tree.tag_configure('credito', foreground='#FF5722')
-            
-            tag_logic = lambda row: 'efectivo' if len(row) > 6 and row[6].lower() == 'efectivo' else 'credito'
-            
-            self.display_report("Detalle de Pagos por Usuario", headers, data, tag_logic)
-        except Exception as e:
-            error_msg = str(e)
-            if "connection" in error_msg.lower() or "conexión" in error_msg.lower():
-                messagebox.showerror("Error de Conexión", f"No se pudo conectar con el servidor: {error_msg}")
-            else:
-                messagebox.showerror("Error de Base de Datos", f"Error al generar reporte: {error_msg}")
+        """Genera el reporte de todos los pagos realizados, detallando por usuario, localmente o usando la API."""
+        filters = self.read_filters()
+        if filters is None:
+            return
+        if self.engine is not None:
+            self.runner.cancel('reporte')
+            self.show_pagos_usuario(self.local_report(lambda engine: engine.pagos_usuario(filters)),
+                                    self.filtered_title("Detalle de Pagos por Usuario", filters))
+            return
+        if filters != ReportFilter():
+            self.engine_not_ready()
+            return
+        self.request_report("Detalle de Pagos por Usuario", self.api_client.get_pagos_usuario_report,
+                            self.show_pagos_usuario)
+
+    def report_agrupado(self):
+        """Cantidad y monto de los pagos agrupados por el campo elegido (solo con el motor local)."""
+        filters = self.read_filters()
+        if filters is None:
+            return
+        if self.engine is None:
+            self.engine_not_ready()
+            return
+        self.runner.cancel('reporte')
+        label = self.group_var.get()
+        report_data = self.local_report(lambda engine: engine.group_by(self.group_labels[label], filters))
+        self.display_report(self.filtered_title(f"Pagos por {label}", filters),
+                            report_data['encabezados'], report_data['datos'])
+
+    def show_pagos_usuario(self, report_data, title="Detalle de Pagos por Usuario"):
+        headers = report_data['encabezados']
+        data = report_data['datos']
+        
+        # Colores para el método de pago
+        self.tree.tag_configure('efectivo', foreground='#4CAF50')
+        self.tree.tag_configure('credito', foreground='#FF5722')
+        
+        tag_logic = lambda row: 'efectivo' if len(row) > 6 and (row[6] or '').lower() == 'efectivo' else 'credito'
+        
+        self.display_report(title, headers, data, tag_logic)
 
     # --- Funciones de Exportación ---
 
@@ -297,7 +478,8 @@ class ReportsWindow(ctk.CTkFrame):
             return
 
         try:
-            # 2. Crear el libro y la hoja de trabajo
+            # 2. Crear el libro y la hoja de trabajo (openpyxl se carga solo al exportar)
+            import openpyxl
             workbook = openpyxl.Workbook()
             sheet = workbook.active
             sheet.title = self.current_report_title[:31]  # Excel limita a 31 caracteres
@@ -331,5 +513,6 @@ class ReportsWindow(ctk.CTkFrame):
     
     def reset_view(self):
         """Resetea la vista al mensaje de bienvenida. Útil al cambiar de módulo."""
+        self.runner.cancel('reporte')
         self.show_welcome_message()
 
@@ -0,0 +1,232 @@
+# frontend/modules/subscriber_picker.py
+import tkinter as tk
+import customtkinter as ctk
+from typing import Callable, Dict, Iterable, List, Optional
+from modules.background import runner_for
+from search_index import SearchIndex
+
+# Sugerencias visibles a la vez (la lista nunca tiene más filas que esto)
+MAX_RESULTS = 8
+# Espera (ms) antes de cerrar la lista al perder el foco, para que un clic en ella alcance a elegir
+FOCUS_OUT_DELAY_MS = 150
+LOADING_TEXT = 'Cargando Usuarios...'
+EMPTY_TEXT = 'No hay usuarios activos'
+PLACEHOLDER_TEXT = 'Escriba nombre, apellido o N° de paja...'
+
+
+def subscriber_label(user) -> str:
+    return f"{user.nombre} {user.apellido} (Paja: {user.numero_paja})"
+
+
+def subscriber_search_fields(user):
+    # La paja también se encuentra con ceros a la izquierda ("007")
+    return (user.nombre, user.apellido, user.numero_paja, str(user.numero_paja).zfill(3))
+
+
+class SubscriberPicker(ctk.CTkFrame):
+    """Campo para elegir un suscriptor escribiendo parte de su nombre, apellido o paja.
+
+    Las sugerencias salen de `SearchIndex.ranked` (palabra exacta, inicio, parte
+    o con una letra de diferencia) y se muestran en una única lista de como
+    máximo `MAX_RESULTS` filas: con diez mil suscriptores hay los mismos widgets
+    que con diez. Flechas para moverse, Enter o Tab para elegir, Escape para
+    cerrar. `on_select(id_usuario)` recibe None cuando el texto deja de
+    corresponder a un suscriptor.
+    """
+
+    def __init__(self, master, on_select: Callable[[Optional[int]], None], height: int = 35, **kwargs):
+        super().__init__(master, fg_color='transparent', **kwargs)
+        self.on_select = on_select
+        self.runner = runner_for(self)
+        self.labels: Dict[int, str] = {}
+        self.search_index: Optional[SearchIndex] = None
+        self.pending_changes = []
+        self.selected_id: Optional[int] = None
+        self.results: List[int] = []
+        self._highlight = 0
+        self._setting_text = False
+        self._popup = None
+        self._listbox = None
+        self._hide_job = None
+
+        self.grid_columnconfigure(0, weight=1)
+        self.text_var = ctk.StringVar()
+        self.entry = ctk.CTkEntry(self, textvariable=self.text_var, placeholder_text=LOADING_TEXT,
+                                  height=height)
+        self.entry.grid(row=0, column=0, sticky='ew')
+        self.text_var.trace_add('write', lambda *args: self.on_text_changed())
+
+        self.entry.bind('<Down>', lambda event: self.move(1))
+        self.entry.bind('<Up>', lambda event: self.move(-1))
+        self.entry.bind('<Return>', self.choose_highlighted)
+        self.entry.bind('<Tab>', self.choose_highlighted)
+        self.entry.bind('<Escape>', lambda event: self.hide_results())
+        self.entry.bind('<FocusOut>', lambda event: self.schedule_hide())
+
+    # ---------- Datos ----------
+
+    def set_subscribers(self, users: Iterable):
+        """Reemplaza los suscriptores que se pueden elegir y arma su índice en segundo plano."""
+        users = sorted(users, key=lambda user: (user.nombre.lower(), user.apellido.lower()))
+        self.labels = {user.id_usuario: subscriber_label(user) for user in users}
+        self.search_index = None
+        self.pending_changes = []
+        self.runner.submit('indice-selector-suscriptores', SearchIndex.build, users,
+                           lambda user: user.id_usuario, subscriber_search_fields,
+                           on_success=self.set_index)
+        self.entry.configure(placeholder_text=PLACEHOLDER_TEXT if users else EMPTY_TEXT)
+        if self.selected_id is not None:
+            if self.selected_id in self.labels:
+                self._set_text(self.labels[self.selected_id])
+            else:
+                self.clear()
+
+    def update_subscribers(self, changed: Iterable = (), removed: Iterable[int] = ()):
+        """Agrega o actualiza los suscriptores de `changed` y quita los id de `removed`."""
+        changed = list(changed)
+        removed = list(removed)
+        for user in changed:
+            self.labels[user.id_usuario] = subscriber_label(user)
+        for user_id in removed:
+            self.labels.pop(user_id, None)
+        if self.search_index is None:
+            if self.runner.is_running('indice-selector-suscriptores'):
+                self.pending_changes.append((changed, removed))
+        else:
+            self._update_index(changed, removed)
+        self.entry.configure(placeholder_text=PLACEHOLDER_TEXT if self.labels else EMPTY_TEXT)
+
+        if self.selected_id in removed:
+            self.clear()
+        elif any(user.id_usuario == self.selected_id for user in changed):
+            # El suscriptor elegido cambió de nombre o de paja
+            self._set_text(self.labels[self.selected_id])
+
+    def set_index(self, index: SearchIndex):
+        self.search_index = index
+        # Cambios recibidos mientras se construía el índice
+        for changed, removed in self.pending_changes:
+            self._update_index(changed, removed)
+        self.pending_changes = []
+        if self._editing():
+            self.show_results()
+
+    def _update_index(self, changed, removed):
+        for user in changed:
+            self.search_index.add(user.id_usuario, subscriber_search_fields(user))
+        for user_id in removed:
+            self.search_index.remove(user_id)
+
+    # ---------- Selección ----------
+
+    def select(self, user_id: Optional[int]):
+        """Elige el suscriptor `user_id` (None: ninguno) y avisa a `on_select`."""
+        if user_id is not None and user_id not in self.labels:
+            user_id = None
+        self.hide_results()
+        self.selected_id = user_id
+        self._set_text(self.labels[user_id] if user_id is not None else '')
+        self.on_select(user_id)
+
+    def clear(self):
+        self.select(None)
+
+    def on_text_changed(self):
+        if self._setting_text:
+            return
+        if self.selected_id is not None:
+            # Al editar el texto deja de haber un suscriptor elegido
+            self.selected_id = None
+            self.on_select(None)
+        self.show_results()
+
+    def choose_highlighted(self, event=None):
+        if not self.results or not self._popup_visible():
+            # Tab sin sugerencias sigue al siguiente campo
+            return None
+        self.select(self.results[self._highlight])
+        return 'break'
+
+    def _editing(self) -> bool:
+        return self.selected_id is None and bool(self.text_var.get().strip())
+
+    def _set_text(self, text: str):
+        self._setting_text = True
+        try:
+            self.text_var.set(text)
+        finally:
+            self._setting_text = False
+
+    # ---------- Lista de sugerencias ----------
+
+    def show_results(self):
+        query = self.text_var.get()
+        ranked = self.search_index.ranked(query, MAX_RESULTS) if self.search_index is not None else None
+        self.results = [user_id for user_id in ranked or () if user_id in self.labels]
+        if not self.results:
+            self.hide_results()
+            return
+        listbox = self._ensure_popup()
+        listbox.delete(0, 'end')
+        listbox.insert('end', *(self.labels[user_id] for user_id in self.results))
+        listbox.configure(height=len(self.results))
+        self._highlight = 0
+        self._show_highlight()
+        self._place_popup()
+
+    def move(self, step: int):
+        if not self._popup_visible():
+            self.show_results()
+            return 'break'
+        self._highlight = max(0, min(len(self.results) - 1, self._highlight + step))
+        self._show_highlight()
+        return 'break'
+
+    def hide_results(self):
+        if self._popup is not None:
+            self._popup.withdraw()
+
+    def schedule_hide(self):
+        if self._hide_job is not None:
+            self.after_cancel(self._hide_job)
+        self._hide_job = self.after(FOCUS_OUT_DELAY_MS, self._hide_after_focus_out)
+
+    def _hide_after_focus_out(self):
+        self._hide_job = None
+        if self.winfo_exists():
+            self.hide_results()
+
+    def _ensure_popup(self) -> tk.Listbox:
+        """Crea la ventana de sugerencias la primera vez; después solo se muestra u oculta."""
+        if self._popup is None:
+            self._popup = tk.Toplevel(self)
+            self._popup.withdraw()
+            self._popup.overrideredirect(True)
+            self._listbox = tk.Listbox(self._popup, activestyle='none', exportselection=False,
+                                       font=('Segoe UI', 11), background='#2A2D2E', foreground='#DCE4EE',
+                                       selectbackground='#1F6AA5', selectforeground='white',
+                                       borderwidth=1, highlightthickness=0)
+            self._listbox.pack(fill='both', expand=True)
+            self._listbox.bind('<ButtonRelease-1>', self._on_click)
+        return self._listbox
+
+    def _place_popup(self):
+        x = self.entry.winfo_rootx()
+        y = self.entry.winfo_rooty() + self.entry.winfo_height()
+        self._popup.geometry(f"{max(self.entry.winfo_width(), 200)}x{self._listbox.winfo_reqheight()}+{x}+{y}")
+        self._popup.deiconify()
+        self._popup.lift()
+
+    def _popup_visible(self) -> bool:
+        return self._popup is not None and self._popup.winfo_viewable()
+
+    def _show_highlight(self):
+        self._listbox.selection_clear(0, 'end')
+        self._listbox.selection_set(self._highlight)
+        self._listbox.see(self._highlight)
+
+    def _on_click(self, event):
+        index = self._listbox.nearest(event.y)
+        if 0 <= index < len(self.results):
+            self.select(self.results[index])
+            self.entry.focus_set()
@@ -0,0 +1,83 @@
+# frontend/modules/table_populator.py
+import time
+from itertools import islice
+from typing import Callable, Iterable, List, Optional
+
+# Tiempo máximo (segundos) de trabajo por tramo, para que Tk siga redibujando a ~60 fps
+FRAME_BUDGET = 0.012
+# Filas que se muestran de inmediato, antes de ceder el control a Tk
+FIRST_SCREEN_ROWS = 60
+# Cada cuántas filas se revisa el reloj dentro de un tramo
+CLOCK_EVERY = 128
+
+
+class TablePopulator:
+    """Llena una tabla por tramos con `after()` para no bloquear la ventana.
+
+    La primera pantalla se pinta de inmediato; el resto se convierte y entrega a
+    `sink` en tramos de como máximo `budget` segundos. `on_progress(hechas, total)`
+    permite mostrar el avance. Iniciar otro llenado cancela el anterior.
+    """
+
+    def __init__(self, widget, budget: float = FRAME_BUDGET, first_rows: int = FIRST_SCREEN_ROWS):
+        self.widget = widget
+        self.budget = budget
+        self.first_rows = first_rows
+        self._job = None
+        self._run = 0
+
+    def start(self, items: Iterable, convert: Callable, sink: Callable[[List], None],
+              on_progress: Optional[Callable[[int, Optional[int]], None]] = None,
+              on_done: Optional[Callable[[], None]] = None):
+        """Convierte cada elemento con `convert` y entrega las filas a `sink` en tramos."""
+        self.cancel()
+        self._run += 1
+        total = len(items) if hasattr(items, '__len__') else None
+        iterator = iter(items)
+
+        first = [convert(item) for item in islice(iterator, self.first_rows)]
+        sink(first)
+        finished = len(first) < self.first_rows
+        if on_progress:
+            on_progress(len(first), total)
+        if finished:
+            if on_done:
+                on_done()
+            return
+        self.widget.update_idletasks()
+        self._job = self.widget.after(1, self._step, self._run, iterator, convert, sink,
+                                      len(first), total, on_progress, on_done)
+
+    def cancel(self):
+        if self._job is not None:
+            try:
+                self.widget.after_cancel(self._job)
+            except Exception:
+                pass
+            self._job = None
+
+    def is_running(self) -> bool:
+        return self._job is not None
+
+    def _step(self, run, iterator, convert, sink, done, total, on_progress, on_done):
+        if run != self._run:
+            return
+        self._job = None
+        deadline = time.perf_counter() + self.budget
+        chunk = []
+        finished = True
+        for item in iterator:
+            chunk.append(convert(item))
+            if len(chunk) % CLOCK_EVERY == 0 and time.perf_counter() >= deadline:
+                finished = False
+                break
+        sink(chunk)
+        done += len(chunk)
+        if on_progress:
+            on_progress(done, total)
+        if finished:
+            if on_done:
+                on_done()
+            return
+        self._job = self.widget.after(1, self._step, run, iterator, convert, sink,
+                                      done, total, on_progress, on_done)
@@ -2,15 +2,41 @@
 import customtkinter as ctk
 from tkinter import ttk, messagebox
 from api_client import APIClient
+from modules.background import runner_for
+from modules.data_store import store_for
+from modules.virtual_table import VirtualTable
+from modules.table_populator import TablePopulator
+from search_index import SearchIndex
 import re
 
+# Espera (ms) tras la última tecla antes de filtrar la tabla
+SEARCH_DEBOUNCE_MS = 150
+
+PENDING_MSG = ('No hay conexión con el servidor.\n'
+               'El cambio quedó guardado en este equipo y se enviará automáticamente al recuperar la conexión.')
+
 class UsersWindow(ctk.CTkFrame):
     def __init__(self, master, api_client: APIClient):
         super().__init__(master)
         self.api_client = api_client
         self.selected_user_id = None
+        # Índice de búsqueda de los usuarios (se construye en segundo plano al cargar)
+        self.search_index = None
+        self._search_job = None
+        # Las llamadas a la API corren en segundo plano para no congelar la ventana
+        self.runner = runner_for(self)
+        # Los usuarios viven en el almacén compartido; la ventana solo los muestra
+        self.store = store_for(self, api_client)
+        # Las listas grandes se pasan a la tabla por tramos
+        self.populator = TablePopulator(self)
+        # Cambios recibidos mientras se llenaba la tabla (se aplican al terminar)
+        self.pending_changes = []
         self.build_ui()
         self.configure_treeview_style()
+        
+        self.store.subscribe('users', self.on_users_changed)
+        if self.store.records('users'):
+            self.show_users(self.store.records('users'))
         self.load_users()
 
     def configure_treeview_style(self):
@@ -135,6 +161,15 @@ class UsersWindow(ctk.CTkFrame):
         buttons_frame = ctk.CTkFrame(header_frame, fg_color='transparent')
         buttons_frame.grid(row=0, column=1, sticky='e', padx=(10, 0))
         
+        # Búsqueda mientras se escribe (filtra los usuarios ya cargados)
+        self.search_var = ctk.StringVar()
+        self.search_var.trace_add('write', lambda *args: self.schedule_search())
+        ctk.CTkEntry(buttons_frame,
+                     textvariable=self.search_var,
+                     placeholder_text='Buscar (nombre, paja, teléfono...)',
+                     width=260,
+                     height=30).grid(row=0, column=0, padx=5)
+        
         self.reload_btn = ctk.CTkButton(buttons_frame, 
                                         text='🔄 Recargar', 
                                         command=self.load_users,
@@ -142,7 +177,7 @@ class UsersWindow(ctk.CTkFrame):
                                         hover_color='#2F6593',
                                         width=120,
                                         height=30)
-        self.reload_btn.grid(row=0, column=0, padx=5)
+        self.reload_btn.grid(row=0, column=1, padx=5)
         
         tree_frame = ctk.CTkFrame(list_frame)
         tree_frame.grid(row=1, column=0, sticky='nsew', padx=15, pady=(0, 15))
@@ -152,8 +187,7 @@ class UsersWindow(ctk.CTkFrame):
         scrollbar = ctk.CTkScrollbar(tree_frame)
         scrollbar.grid(row=0, column=1, sticky='ns')
 
-        self.tree = ttk.Treeview(tree_frame, columns=('ID', 'Nombre', 'Apellido', 'Direccion', 'Telefono', 'NumPaja', 'Estado'), show='headings', yscrollcommand=scrollbar.set)
-        scrollbar.configure(command=self.tree.yview)
+        self.tree = ttk.Treeview(tree_frame, columns=('ID', 'Nombre', 'Apellido', 'Direccion', 'Telefono', 'NumPaja', 'Estado'), show='headings')
 
         self.tree.heading('ID', text='ID', anchor='center')
         self.tree.heading('Nombre', text='Nombre', anchor='center')
@@ -171,7 +205,9 @@ class UsersWindow(ctk.CTkFrame):
         self.tree.column('NumPaja', width=80, anchor='center')
         self.tree.column('Estado', width=80, anchor='center')
 
-        self.tree.bind('<<TreeviewSelect>>', self.select_user)
+        # Solo se crean en Tk las filas visibles; los datos quedan en `self.table`
+        self.table = VirtualTable(self.tree, scrollbar)
+        self.tree.bind('<<TableSelect>>', self.select_user)
         self.tree.grid(row=0, column=0, sticky='nsew')
         
     def validate_input(self):
@@ -208,102 +244,177 @@ class UsersWindow(ctk.CTkFrame):
         num_paja_str = self.vars['NumeroPaja'].get().strip()
         estado = self.estado_var.get() == 'Activo'
 
-        try:
-            user_data = {
-                "nombre": nombre,
-                "apellido": apellido,
-                "direccion": direccion,
-                "telefono": telefono,
-                "numero_paja": num_paja_str,
-                "estado": estado
-            }
-
-            if self.selected_user_id is None:
-                # Crear nuevo usuario
-                self.api_client.create_user(user_data)
-                messagebox.showinfo('Éxito', 'Suscriptor guardado correctamente.')
-            else:
-                # Actualizar usuario existente
-                self.api_client.update_user(self.selected_user_id, user_data)
-                messagebox.showinfo('Éxito', 'Suscriptor actualizado correctamente.')
-                self.selected_user_id = None
-                
-            self.load_users()
-            self.reset_selection()
+        user_data = {
+            "nombre": nombre,
+            "apellido": apellido,
+            "direccion": direccion,
+            "telefono": telefono,
+            "numero_paja": num_paja_str,
+            "estado": estado
+        }
+
+        if self.selected_user_id is None:
+            # Crear nuevo usuario
+            call, args = self.api_client.create_user, (user_data,)
+            success_msg = 'Suscriptor guardado correctamente.'
+        else:
+            # Actualizar usuario existente
+            call, args = self.api_client.update_user, (self.selected_user_id, user_data)
+            success_msg = 'Suscriptor actualizado correctamente.'
+
+        # La escritura corre en segundo plano; el botón queda deshabilitado para no enviarla dos veces
+        self.save_btn.configure(state=ctk.DISABLED)
+        self.runner.submit('guardar-suscriptor', call, *args,
+                           on_success=lambda result: self.finish_save_user(result, success_msg),
+                           on_error=self.show_save_error,
+                           on_done=lambda: self.save_btn.configure(state=ctk.NORMAL))
+
+    def finish_save_user(self, result, success_msg):
+        if result.get('estado_envio') == 'pendiente':
+            messagebox.showinfo('Cambio Pendiente', PENDING_MSG)
+        else:
+            messagebox.showinfo('Éxito', success_msg)
             
-        except Exception as e:
-            error_msg = str(e)
-            if "connection" in error_msg.lower() or "conexión" in error_msg.lower():
-                messagebox.showerror('Error de Conexión', f'No se pudo conectar con el servidor: {error_msg}')
-            else:
-                messagebox.showerror('Error', f'Error al guardar/actualizar suscriptor: {error_msg}')
+        # Todas las ventanas se actualizan con el registro devuelto (los pagos llevan el nombre)
+        self.store.saved('users', result, affects=('payments',))
+        self.reset_selection()
+
+    def show_save_error(self, e):
+        error_msg = str(e)
+        if "connection" in error_msg.lower() or "conexión" in error_msg.lower():
+            messagebox.showerror('Error de Conexión', f'No se pudo conectar con el servidor: {error_msg}')
+        else:
+            messagebox.showerror('Error', f'Error al guardar/actualizar suscriptor: {error_msg}')
 
     def load_users(self):
-        """Carga todos los usuarios desde la API."""
+        """Pide al almacén compartido que descargue o sincronice los usuarios."""
         # Deshabilitar botón de recarga mientras carga
         if hasattr(self, 'reload_btn'):
             self.reload_btn.configure(state=ctk.DISABLED, text='🔄 Cargando...')
-        self.update()
-        
-        for i in self.tree.get_children():
-            self.tree.delete(i)
-            
-        try:
-            users = self.api_client.get_users()
-
-            for user in users:
-                id_user = user['id_usuario']
-                nombre = user['nombre']
-                apellido = user['apellido']
-                direccion = user['direccion']
-                telefono = user['telefono'] or ''
-                num_paja = str(user['numero_paja'])
-                estado_int = user['estado']
-                
-                estado_text = 'Activo' if estado_int else 'Inactivo'
-                num_paja_formatted = num_paja.zfill(3)
-                
-                tag = estado_text 
-                self.tree.insert('', ctk.END, values=(id_user, nombre, apellido, direccion, telefono, num_paja_formatted, estado_text), tags=(tag,))
+        self.store.load('users', on_error=self.show_load_error, on_done=self.finish_loading)
+
+    def on_users_changed(self, change):
+        """Recibe los cambios del almacén (de esta ventana o de cualquier otra)."""
+        if change.reset:
+            self.show_users(change.changed)
+        elif self.populator.is_running():
+            self.pending_changes.append(change)
+        else:
+            self.apply_changes(change)
+
+    def show_users(self, users):
+        """Llena la tabla con la lista completa (por tramos)."""
+        self.pending_changes = []
+        self.rebuild_index()
+        self.table.clear()
+        self.populator.start(users, self.user_row, self.table.append,
+                             on_progress=self.show_progress, on_done=self.finish_populating)
+
+    def finish_populating(self):
+        for change in self.pending_changes:
+            self.apply_changes(change)
+        self.pending_changes = []
+        self.finish_loading()
+
+    def apply_changes(self, change):
+        """Aplica a la tabla solo los usuarios nuevos, modificados y eliminados."""
+        self.rebuild_index()
+        # Se conservan la posición y la selección
+        self.table.append(self.user_row(user) for user in change.changed)
+        self.table.delete(*(str(id_user) for id_user in change.deleted))
+
+    def show_progress(self, done, total):
+        if total:
+            self.reload_btn.configure(text=f'🔄 Cargando... {done * 100 // total}%')
+
+    def finish_loading(self):
+        # Rehabilitar botón de recarga (también en caso de error)
+        if (hasattr(self, 'reload_btn') and not self.store.is_loading('users')
+                and not self.populator.is_running()):
+            self.reload_btn.configure(state=ctk.NORMAL, text='🔄 Recargar')
+        self.apply_search()
+
+    @staticmethod
+    def user_search_fields(user):
+        """Textos por los que se puede buscar a un usuario."""
+        return (user.id_usuario, user.nombre, user.apellido, user.numero_paja,
+                str(user.numero_paja).zfill(3), user.telefono, user.direccion)
+
+    def rebuild_index(self):
+        """Construye en segundo plano el índice de búsqueda de los usuarios cargados."""
+        self.runner.submit('indice-suscriptores', SearchIndex.build, self.store.records('users'),
+                           lambda user: str(user.id_usuario), self.user_search_fields,
+                           on_success=self.set_index)
+
+    def set_index(self, index):
+        self.search_index = index
+        self.apply_search()
+
+    def schedule_search(self):
+        """Filtra la tabla poco después de la última tecla (no en cada una)."""
+        if self._search_job is not None:
+            self.after_cancel(self._search_job)
+        self._search_job = self.after(SEARCH_DEBOUNCE_MS, self.apply_search)
+
+    def apply_search(self):
+        """Muestra solo los usuarios que coinciden con el texto de búsqueda."""
+        self._search_job = None
+        if self.search_index is None or self.populator.is_running():
+            # Se aplica al terminar de cargar la tabla o el índice
+            return
+        self.table.set_filter(self.search_index.search(self.search_var.get()))
+
+    def show_load_error(self, e):
+        error_msg = str(e)
+        if "connection" in error_msg.lower() or "conexión" in error_msg.lower():
+            messagebox.showerror('Error de Conexión', f'No se pudo conectar con el servidor: {error_msg}')
+        else:
+            messagebox.showerror('Error', f'Error al cargar suscriptores: {error_msg}')
             
-            # Rehabilitar botón de recarga
-            if hasattr(self, 'reload_btn'):
-                self.reload_btn.configure(state=ctk.NORMAL, text='🔄 Recargar')
-                
-        except Exception as e:
-            error_msg = str(e)
-            # Rehabilitar botón de recarga en caso de error
-            if hasattr(self, 'reload_btn'):
-                self.reload_btn.configure(state=ctk.NORMAL, text='🔄 Recargar')
-            if "connection" in error_msg.lower() or "conexión" in error_msg.lower():
-                messagebox.showerror('Error de Conexión', f'No se pudo conectar con el servidor: {error_msg}')
-            else:
-                messagebox.showerror('Error', f'Error al cargar suscriptores: {error_msg}')
+    @staticmethod
+    def user_row(user):
+        """Convierte un usuario (`records.Subscriber`) en la fila (clave, valores, tags) de la tabla."""
+        id_user = user.id_usuario
+        nombre = user.nombre
+        apellido = user.apellido
+        direccion = user.direccion
+        telefono = user.telefono or ''
+        num_paja = str(user.numero_paja)
+        estado_int = user.estado
+        
+        estado_text = 'Activo' if estado_int else 'Inactivo'
+        num_paja_formatted = num_paja.zfill(3)
+        
+        tag = estado_text 
+        values = (id_user, nombre, apellido, direccion, telefono, num_paja_formatted, estado_text)
+        return str(id_user), values, (tag,)
             
     def select_user(self, event):
         """Carga los datos del usuario seleccionado en el formulario."""
-        selected_item_id = self.tree.selection()
+        selected_item_id = self.table.selection()
         if not selected_item_id:
             return
 
         self.reset_selection(keep_form_clear=True)
         
-        item = self.tree.item(selected_item_id[0])
-        values = item['values']
+        # Los datos salen del registro, no de los textos mostrados en la tabla
+        user = self.store.get('users', int(selected_item_id[0]))
+        if user is None:
+            return
         
-        self.selected_user_id = values[0]
+        self.selected_user_id = user.id_usuario
+        current_status = 'Activo' if user.estado else 'Inactivo'
         
-        self.vars['Nombre'].set(values[1])
-        self.vars['Apellido'].set(values[2])
-        self.vars['Dirección'].set(values[3])
-        self.vars['Teléfono'].set(values[4])
-        self.vars['NumeroPaja'].set(values[5])
-        self.estado_var.set(values[6])
+        self.vars['Nombre'].set(user.nombre)
+        self.vars['Apellido'].set(user.apellido)
+        self.vars['Dirección'].set(user.direccion or '')
+        self.vars['Teléfono'].set(user.telefono or '')
+        self.vars['NumeroPaja'].set(str(user.numero_paja).zfill(3))
+        self.estado_var.set(current_status)
         
         self.save_btn.configure(text='Actualizar', fg_color='#3A7CB1', hover_color='#2F6593', text_color='white')
         self.deactivate_btn.configure(state=ctk.NORMAL)
         
-        current_status = values[6]
         if current_status == 'Activo':
             self.deactivate_btn.configure(text='Desactivar')
         else:
@@ -317,7 +428,9 @@ class UsersWindow(ctk.CTkFrame):
             self.estado_var.set('Activo')
         
         self.selected_user_id = None
-        self.tree.selection_remove(self.tree.selection())
+        if not keep_form_clear:
+            # Al elegir otra fila (keep_form_clear) la selección de la tabla se conserva
+            self.table.selection_clear()
         
         self.save_btn.configure(text='Guardar', fg_color='#FFD43B', hover_color='#E0B810', text_color='black')
         self.deactivate_btn.configure(state=ctk.DISABLED, text='Activar/Desactivar')
@@ -340,16 +453,25 @@ class UsersWindow(ctk.CTkFrame):
         if not confirm:
             return
 
-        try:
-            self.api_client.toggle_user_status(self.selected_user_id)
-            messagebox.showinfo('Éxito', f'Usuario {action_text.lower()}do correctamente.')
-            self.load_users()
-            self.reset_selection()
+        self.deactivate_btn.configure(state=ctk.DISABLED)
+        self.runner.submit('estado-suscriptor', self.api_client.toggle_user_status, self.selected_user_id,
+                           on_success=lambda result: self.finish_toggle_user(result, action_text),
+                           on_error=self.show_toggle_error)
 
-        except Exception as e:
-            error_msg = str(e)
-            if "connection" in error_msg.lower() or "conexión" in error_msg.lower():
-                messagebox.showerror('Error de Conexión', f'No se pudo conectar con el servidor: {error_msg}')
-            else:
-                messagebox.showerror('Error', f'Error al cambiar estado: {error_msg}')
+    def finish_toggle_user(self, result, action_text):
+        # El cambio de estado no queda pendiente sin conexión (ver APIClient.toggle_user_status)
+        messagebox.showinfo('Éxito', f'Usuario {action_text.lower()}do correctamente.')
+        # La lista de pagos (usuarios activos) también se entera del cambio
+        self.store.saved('users', result)
+        self.reset_selection()
+
+    def show_toggle_error(self, e):
+        # El usuario sigue seleccionado: se puede reintentar
+        if self.selected_user_id is not None:
+            self.deactivate_btn.configure(state=ctk.NORMAL)
+        error_msg = str(e)
+        if "connection" in error_msg.lower() or "conexión" in error_msg.lower():
+            messagebox.showerror('Error de Conexión', f'No se pudo conectar con el servidor: {error_msg}')
+        else:
+            messagebox.showerror('Error', f'Error al cambiar estado: {error_msg}')
 
@@ -0,0 +1,419 @@
+# frontend/modules/virtual_table.py
+import sys
+from tkinter import ttk
+from typing import Dict, Hashable, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+# Filas extra creadas debajo de las visibles (cubren cambios de tamaño y filas parciales)
+BUFFER_ROWS = 10
+# Alto de fila si el estilo del Treeview no define uno
+DEFAULT_ROW_HEIGHT = 25
+# Filas que avanza cada paso de la rueda del ratón
+WHEEL_ROWS = 3
+
+# (clave, valores, tags) de una fila
+Row = Tuple[Hashable, Sequence, Tuple[str, ...]]
+
+
+class TableDiff(NamedTuple):
+    """Filas agregadas, modificadas y eliminadas por `VirtualTable.reconcile`."""
+    inserted: int
+    updated: int
+    deleted: int
+
+
+class VirtualTable:
+    """Tabla virtual sobre un `ttk.Treeview` ya creado.
+
+    Las filas viven en Python y el Treeview solo tiene los ítems de la ventana
+    visible (más `buffer_rows`), que se reutilizan al desplazarse: insertar o
+    recorrer un millón de filas cuesta lo mismo en Tk que mostrar cuarenta.
+
+    Cada fila se identifica por una clave (p. ej. `str(id_pago)`). `selection()`
+    y `focus()` devuelven claves, no ítems del Treeview. Cuando el usuario cambia
+    la selección se genera `<<TableSelect>>` sobre el Treeview.
+    """
+
+    def __init__(self, tree: ttk.Treeview, scrollbar=None, buffer_rows: int = BUFFER_ROWS):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.buffer_rows = buffer_rows
+
+        # Todas las claves y las que se muestran (son la misma lista si no hay filtro)
+        self._all_keys: List[Hashable] = []
+        self._keys = self._all_keys
+        self._filtered = False
+        self._rows: Dict[Hashable, Tuple[Sequence, Tuple[str, ...]]] = {}
+        # clave mostrada -> posición; se recalcula solo cuando cambia el orden
+        self._positions: Optional[Dict[Hashable, int]] = {}
+
+        self._offset = 0
+        self._visible = 1
+        self._heading_height = None
+        self._slots: List[str] = []
+        self._slot_rows: Dict[str, Tuple[Hashable, tuple]] = {}
+        self._slot_counter = 0
+        self._selected: List[Hashable] = []
+        self._focus: Optional[Hashable] = None
+        self._expected_selection: Tuple[str, ...] = ()
+        self._render_pending = False
+
+        tree.configure(selectmode='browse', yscrollcommand='')
+        if scrollbar is not None:
+            scrollbar.configure(command=self._on_scrollbar)
+        tree.bind('<Configure>', self._on_configure, add='+')
+        tree.bind('<<TreeviewSelect>>', self._on_tree_select, add='+')
+        for sequence in ('<MouseWheel>', '<Button-4>', '<Button-5>'):
+            tree.bind(sequence, self._on_wheel)
+        for sequence, step in (('<Up>', -1), ('<Down>', 1), ('<Prior>', 'page-'), ('<Next>', 'page+'),
+                               ('<Home>', 'home'), ('<End>', 'end')):
+            tree.bind(sequence, lambda event, step=step: self._on_key(step))
+
+    # ---------- Modelo ----------
+
+    def __len__(self) -> int:
+        return len(self._all_keys)
+
+    def keys(self) -> List[Hashable]:
+        """Todas las claves del modelo, incluidas las ocultas por el filtro."""
+        return list(self._all_keys)
+
+    def shown(self) -> int:
+        """Cantidad de filas que deja ver el filtro actual."""
+        return len(self._keys)
+
+    def exists(self, key: Hashable) -> bool:
+        return key in self._rows
+
+    def values(self, key: Hashable) -> Sequence:
+        return self._rows[key][0]
+
+    def tags(self, key: Hashable) -> Tuple[str, ...]:
+        return self._rows[key][1]
+
+    def index(self, key: Hashable) -> int:
+        """Posición de la fila entre las que se muestran."""
+        return self._positions_or_build()[key]
+
+    def set_rows(self, rows: Iterable[Row]):
+        """Reemplaza todas las filas (vuelve al inicio, limpia la selección y quita el filtro)."""
+        self._all_keys = self._keys = []
+        self._filtered = False
+        self._rows = {}
+        self._positions = {}
+        self._offset = 0
+        self._selected = []
+        self._focus = None
+        self.append(rows)
+
+    def append(self, rows: Iterable[Row]):
+        """Agrega filas al final; si una clave ya existe se actualiza en su lugar.
+
+        Con un filtro activo las filas nuevas quedan ocultas hasta el próximo `set_filter`.
+        """
+        keys, data = self._all_keys, self._rows
+        positions = None if self._filtered else self._positions
+        for key, values, tags in rows:
+            row = (tuple(values), tuple(tags))
+            previous = data.get(key)
+            if previous is None:
+                if positions is not None:
+                    positions[key] = len(keys)
+                keys.append(key)
+            elif previous == row:
+                # Misma fila: se conserva el objeto para que `_render` no toque Tk
+                continue
+            data[key] = row
+        self._schedule_render()
+
+    def reconcile(self, rows: Iterable[Row]) -> TableDiff:
+        """Reemplaza el contenido por `rows` aplicando solo las diferencias por clave.
+
+        A diferencia de `set_rows`, conserva la selección, el foco y la posición de
+        desplazamiento (anclada a la primera fila visible), y los ítems del Treeview
+        cuyas filas no cambiaron no se vuelven a escribir.
+        """
+        anchor = self._anchor()
+        old = self._rows
+        new_keys: List[Hashable] = []
+        new_rows: Dict[Hashable, Tuple[Sequence, Tuple[str, ...]]] = {}
+        inserted = updated = 0
+        for key, values, tags in rows:
+            row = (tuple(values), tuple(tags))
+            previous = old.get(key)
+            if previous is None:
+                inserted += 1
+            elif previous == row:
+                row = previous
+            else:
+                updated += 1
+            if key not in new_rows:
+                new_keys.append(key)
+            new_rows[key] = row
+        deleted = sum(1 for key in old if key not in new_rows)
+
+        self._all_keys, self._rows, self._positions = new_keys, new_rows, None
+        self._keys = [key for key in self._keys if key in new_rows] if self._filtered else new_keys
+        self._selected = [key for key in self._selected if key in new_rows]
+        if self._focus not in new_rows:
+            self._focus = None
+        self._restore_anchor(anchor)
+        self._schedule_render()
+        return TableDiff(inserted, updated, deleted)
+
+    def insert(self, key: Hashable, values: Sequence, tags: Sequence[str] = (), index: Optional[int] = None):
+        """Inserta una fila (al final o en `index`); si la clave ya existe la actualiza."""
+        if key in self._rows or index is None:
+            self.append([(key, values, tags)])
+            return
+        anchor = self._anchor()
+        self._all_keys.insert(index, key)
+        self._rows[key] = (tuple(values), tuple(tags))
+        self._positions = None
+        self._restore_anchor(anchor)
+        self._schedule_render()
+
+    def update(self, key: Hashable, values: Sequence, tags: Sequence[str] = ()):
+        if key not in self._rows:
+            raise KeyError(key)
+        self._rows[key] = (tuple(values), tuple(tags))
+        self._schedule_render()
+
+    def delete(self, *keys: Hashable):
+        """Elimina las filas con esas claves (las que no existan se ignoran)."""
+        doomed = {key for key in keys if key in self._rows}
+        if not doomed:
+            return
+        anchor = self._anchor()
+        self._all_keys = [key for key in self._all_keys if key not in doomed]
+        self._keys = [key for key in self._keys if key not in doomed] if self._filtered else self._all_keys
+        for key in doomed:
+            del self._rows[key]
+        self._positions = None
+        self._selected = [key for key in self._selected if key not in doomed]
+        if self._focus in doomed:
+            self._focus = None
+        self._restore_anchor(anchor)
+        self._schedule_render()
+
+    def clear(self):
+        self.set_rows([])
+
+    def set_filter(self, keys: Optional[Iterable[Hashable]]):
+        """Muestra solo las filas con esas claves, en ese orden; `None` vuelve a mostrar todas.
+
+        El modelo completo se conserva: quitar el filtro no vuelve a cargar nada.
+        """
+        if keys is None:
+            if not self._filtered:
+                return
+            self._keys = self._all_keys
+            self._filtered = False
+        else:
+            rows = self._rows
+            shown = [key for key in keys if key in rows]
+            if self._filtered and shown == self._keys:
+                # Mismo resultado (p. ej. tras una recarga): se conserva la posición
+                return
+            self._keys = shown
+            self._filtered = True
+        self._positions = None
+        self._offset = 0
+        if self._selected and self._selected[0] in self._positions_or_build():
+            self.see(self._selected[0])
+        self._schedule_render()
+
+    def _positions_or_build(self) -> Dict[Hashable, int]:
+        if self._positions is None:
+            self._positions = {k: i for i, k in enumerate(self._keys)}
+        return self._positions
+
+    def _anchor(self) -> Optional[Hashable]:
+        """Clave de la primera fila visible, para conservar la posición tras un cambio.
+
+        Al inicio de la tabla no hay ancla: la vista sigue mostrando las primeras
+        filas (p. ej. los pagos pendientes que se insertan arriba).
+        """
+        return self._keys[self._offset] if 0 < self._offset < len(self._keys) else None
+
+    def _restore_anchor(self, anchor: Optional[Hashable]):
+        if anchor is not None and anchor in self._positions_or_build():
+            self._offset = self._positions[anchor]
+
+    # ---------- Selección ----------
+
+    def selection(self) -> Tuple[Hashable, ...]:
+        return tuple(self._selected)
+
+    def selection_set(self, *keys: Hashable):
+        self._selected = [key for key in keys if key in self._rows]
+        if self._selected:
+            self._focus = self._selected[0]
+        self._schedule_render()
+
+    def selection_clear(self):
+        self._selected = []
+        self._schedule_render()
+
+    def focus(self) -> Hashable:
+        """Clave de la fila con el foco ('' si no hay), igual que `Treeview.focus()`."""
+        return self._focus if self._focus in self._rows else ''
+
+    def see(self, key: Hashable):
+        """Desplaza la tabla para que la fila `key` quede visible."""
+        position = self.index(key)
+        if position < self._offset:
+            self._offset = position
+        elif position >= self._offset + self._visible:
+            self._offset = position - self._visible + 1
+        self._schedule_render()
+
+    # ---------- Dibujo ----------
+
+    def _schedule_render(self):
+        if not self._render_pending:
+            self._render_pending = True
+            self.tree.after_idle(self._render)
+
+    def _render(self):
+        self._render_pending = False
+        if not self.tree.winfo_exists():
+            return
+        total = len(self._keys)
+        self._offset = max(0, min(self._offset, total - self._visible))
+        needed = max(0, min(total - self._offset, self._visible + self.buffer_rows))
+
+        while len(self._slots) < needed:
+            self._slot_counter += 1
+            self._slots.append(self.tree.insert('', 'end', iid=f'__fila_{self._slot_counter}'))
+        while len(self._slots) > needed:
+            slot = self._slots.pop()
+            self._slot_rows.pop(slot, None)
+            self.tree.delete(slot)
+
+        selected = set(self._selected)
+        selected_slots = []
+        focus_slot = ''
+        for i, slot in enumerate(self._slots):
+            key = self._keys[self._offset + i]
+            row = self._rows[key]
+            current = self._slot_rows.get(slot)
+            # Solo se toca Tk si la fila que muestra el ítem cambió
+            if current is None or current[0] != key or current[1] is not row:
+                self.tree.item(slot, values=row[0], tags=row[1])
+                self._slot_rows[slot] = (key, row)
+            if key in selected:
+                selected_slots.append(slot)
+            if key == self._focus:
+                focus_slot = slot
+
+        self._expected_selection = tuple(selected_slots)
+        if tuple(self.tree.selection()) != self._expected_selection:
+            self.tree.selection_set(selected_slots)
+        if focus_slot:
+            self.tree.focus(focus_slot)
+        self.tree.yview_moveto(0)
+        self._update_scrollbar()
+        self._measure()
+
+    def _update_scrollbar(self):
+        if self.scrollbar is None:
+            return
+        total = len(self._keys)
+        if total <= self._visible:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self._offset / total, min(1.0, (self._offset + self._visible) / total))
+
+    def _row_height(self) -> int:
+        style = self.tree.cget('style') or 'Treeview'
+        try:
+            return int(ttk.Style(self.tree).lookup(style, 'rowheight') or DEFAULT_ROW_HEIGHT)
+        except (ValueError, TypeError):
+            return DEFAULT_ROW_HEIGHT
+
+    def _measure(self, height: Optional[int] = None):
+        """Calcula cuántas filas caben a la vista (por defecto, un poco menos que más)."""
+        if self._slots and self._heading_height is None:
+            bbox = self.tree.bbox(self._slots[0])
+            if bbox:
+                self._heading_height = bbox[1]
+        row_height = self._row_height()
+        heading = self._heading_height if self._heading_height is not None else row_height + 8
+        height = height if height is not None else self.tree.winfo_height()
+        visible = max(1, (height - heading) // row_height)
+        if visible != self._visible:
+            self._visible = visible
+            self._schedule_render()
+
+    # ---------- Eventos ----------
+
+    def _on_configure(self, event):
+        self._measure(event.height)
+
+    def _scroll_to(self, offset: int):
+        offset = max(0, min(offset, len(self._keys) - self._visible))
+        if offset != self._offset:
+            self._offset = offset
+            self._schedule_render()
+
+    def _on_scrollbar(self, *args):
+        if not args:
+            return
+        if args[0] == 'moveto':
+            self._scroll_to(int(float(args[1]) * len(self._keys)))
+        elif args[0] == 'scroll':
+            amount = int(args[1])
+            step = self._visible if len(args) > 2 and args[2] == 'pages' else 1
+            self._scroll_to(self._offset + amount * step)
+
+    def _on_wheel(self, event):
+        if event.num == 4:
+            rows = -WHEEL_ROWS
+        elif event.num == 5:
+            rows = WHEEL_ROWS
+        elif sys.platform == 'darwin':
+            rows = -event.delta
+        else:
+            rows = -int(event.delta / 120 * WHEEL_ROWS)
+        self._scroll_to(self._offset + rows)
+        return 'break'
+
+    def _on_key(self, step):
+        if not self._keys:
+            return 'break'
+        # El foco puede seguir en `_rows` pero oculto por el filtro
+        current = self._positions_or_build().get(self._focus)
+        if step == 'home':
+            target = 0
+        elif step == 'end':
+            target = len(self._keys) - 1
+        elif current is None:
+            # Sin foco visible: se empieza por la primera fila visible
+            target = self._offset
+        elif step == 'page-':
+            target = current - self._visible
+        elif step == 'page+':
+            target = current + self._visible
+        else:
+            target = current + step
+        target = max(0, min(target, len(self._keys) - 1))
+        key = self._keys[target]
+        self._selected = [key]
+        self._focus = key
+        self.see(key)
+        self.tree.event_generate('<<TableSelect>>')
+        return 'break'
+
+    def _on_tree_select(self, event):
+        slots = tuple(self.tree.selection())
+        if slots == self._expected_selection:
+            # Selección puesta por `_render`, no por el usuario
+            return
+        self._expected_selection = slots
+        self._selected = [self._slot_rows[slot][0] for slot in slots if slot in self._slot_rows]
+        focus_slot = self.tree.focus()
+        if focus_slot in self._slot_rows:
+            self._focus = self._slot_rows[focus_slot][0]
+        elif self._selected:
+            self._focus = self._selected[0]
+        self.tree.event_generate('<<TableSelect>>')
@@ -0,0 +1,224 @@
+# frontend/offline_queue.py
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Optional, Dict, List, Callable, Tuple
+
+DEFAULT_QUEUE_PATH = os.path.join(os.getcwd(), 'Cache_Local', 'offline_queue.sqlite3')
+
+# Espera entre reintentos: BACKOFF_BASE * 2^intentos (con variación aleatoria), hasta BACKOFF_MAX
+BACKOFF_BASE = 2
+BACKOFF_MAX = 300
+# Segundos que `QueueReplayer.stop` espera a que termine el envío en curso
+STOP_TIMEOUT = 5.0
+
+STATUS_PENDING = 'pendiente'
+STATUS_SENT = 'enviado'
+STATUS_REJECTED = 'rechazado'
+
+
+class OfflineQueue:
+    """Diario persistente (SQLite) de operaciones de escritura pendientes de enviar.
+
+    Cada entrada tiene una clave de idempotencia que se envía al servidor en
+    el header `Idempotency-Key`, y opcionalmente una clave de duplicado
+    (p. ej. usuario + mes pagado) que impide encolar dos veces la misma operación.
+    """
+
+    def __init__(self, path: str = DEFAULT_QUEUE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # FULL: la entrada debe estar en disco antes de confirmar la operación al usuario
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS journal (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                idempotency_key TEXT UNIQUE NOT NULL,
+                method TEXT NOT NULL,
+                path TEXT NOT NULL,
+                payload TEXT,
+                resources TEXT NOT NULL,
+                dedup_key TEXT,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt REAL NOT NULL,
+                last_error TEXT,
+                result TEXT,
+                created_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_journal_dedup ON journal(dedup_key) "
+            "WHERE status = 'pendiente' AND dedup_key IS NOT NULL"
+        )
+
+    def enqueue(self, method: str, path: str, payload: Optional[Dict],
+                resources: Tuple[str, ...] = (), dedup_key: Optional[str] = None,
+                hold: float = 0) -> str:
+        """Registra una operación y devuelve su clave de idempotencia.
+
+        `hold` retrasa el primer reenvío automático (mientras el llamador hace
+        el envío directo). Lanza una excepción si ya hay una operación
+        pendiente con la misma `dedup_key`.
+        """
+        key = str(uuid.uuid4())
+        now = time.time()
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT INTO journal (idempotency_key, method, path, payload, resources, dedup_key, "
+                    "status, next_attempt, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, method, path, json.dumps(payload) if payload is not None else None,
+                     json.dumps(list(resources)), dedup_key, STATUS_PENDING, now + hold, now),
+                )
+        except sqlite3.IntegrityError:
+            raise Exception("Ya existe una operación pendiente de envío con los mismos datos (duplicado)")
+        return key
+
+    def mark_sent(self, key: str, result=None):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE journal SET status = ?, result = ?, last_error = NULL WHERE idempotency_key = ?",
+                (STATUS_SENT, json.dumps(result), key),
+            )
+
+    def mark_rejected(self, key: str, error: str):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE journal SET status = ?, last_error = ? WHERE idempotency_key = ?",
+                (STATUS_REJECTED, error, key),
+            )
+
+    def mark_retry(self, key: str, error: str) -> float:
+        """Registra un intento fallido y programa el siguiente con espera exponencial."""
+        with self._lock:
+            attempts = self._conn.execute(
+                "SELECT attempts FROM journal WHERE idempotency_key = ?", (key,)
+            ).fetchone()[0] + 1
+            delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempts) * random.uniform(0.5, 1.0)
+            self._conn.execute(
+                "UPDATE journal SET attempts = ?, next_attempt = ?, last_error = ? WHERE idempotency_key = ?",
+                (attempts, time.time() + delay, error, key),
+            )
+        return delay
+
+    def pending(self, path_prefix: Optional[str] = None) -> List[Dict]:
+        """Devuelve las operaciones pendientes en orden de registro."""
+        query = ("SELECT idempotency_key, method, path, payload, resources, attempts, next_attempt, last_error "
+                 "FROM journal WHERE status = ?")
+        args = [STATUS_PENDING]
+        if path_prefix:
+            query += " AND path LIKE ?"
+            args.append(path_prefix + '%')
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY seq", args).fetchall()
+        return [
+            {
+                'idempotency_key': key,
+                'method': method,
+                'path': path,
+                'payload': json.loads(payload) if payload else None,
+                'resources': tuple(json.loads(resources)),
+                'attempts': attempts,
+                'next_attempt': next_attempt,
+                'last_error': last_error,
+            }
+            for key, method, path, payload, resources, attempts, next_attempt, last_error in rows
+        ]
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM journal WHERE status = ?", (STATUS_PENDING,)
+            ).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class QueueReplayer(threading.Thread):
+    """Hilo en segundo plano que reenvía las operaciones pendientes del diario.
+
+    `send` recibe una entrada pendiente y devuelve el resultado del servidor;
+    `is_retryable(exc)` decide si un error es de conectividad (se reintenta)
+    o un rechazo definitivo del servidor, e `is_already_applied(entry, exc)`
+    reconoce los rechazos que indican que la operación ya estaba registrada.
+    """
+
+    def __init__(self, queue: OfflineQueue,
+                 send: Callable[[Dict], object],
+                 is_retryable: Callable[[Exception], bool],
+                 is_already_applied: Callable[[Dict, Exception], bool],
+                 on_sent: Optional[Callable[[Dict, object], None]] = None,
+                 can_send: Callable[[], bool] = lambda: True):
+        super().__init__(name="offline-queue-replayer", daemon=True)
+        self.queue = queue
+        self.send = send
+        self.is_retryable = is_retryable
+        self.is_already_applied = is_already_applied
+        self.on_sent = on_sent
+        self.can_send = can_send
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+
+    def wake(self):
+        """Solicita un intento inmediato (p. ej. al iniciar sesión)."""
+        self._wake.set()
+
+    def stop(self, timeout: Optional[float] = STOP_TIMEOUT) -> bool:
+        """Detiene el hilo y espera hasta `timeout` segundos a que termine la entrada en curso.
+
+        Devuelve False si el hilo sigue vivo: el diario todavía no se puede cerrar.
+        """
+        self._stop_event.set()
+        self._wake.set()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout)
+        return not self.is_alive()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            wait = self.replay_due()
+            self._wake.wait(timeout=wait)
+            self._wake.clear()
+
+    def replay_due(self) -> float:
+        """Envía las entradas cuyo reintento ya venció. Devuelve los segundos hasta el próximo."""
+        if not self.can_send():
+            return BACKOFF_MAX
+        now = time.time()
+        next_wait = BACKOFF_MAX
+        for entry in self.queue.pending():
+            if self._stop_event.is_set():
+                break
+            if entry['next_attempt'] > now:
+                next_wait = min(next_wait, entry['next_attempt'] - now)
+                continue
+            try:
+                result = self.send(entry)
+            except Exception as e:
+                if self.is_already_applied(entry, e):
+                    # El servidor ya tenía la operación (p. ej. respuesta perdida en el primer envío)
+                    self.queue.mark_sent(entry['idempotency_key'])
+                    result = None
+                elif self.is_retryable(e):
+                    # Sin conexión: no tiene sentido seguir con el resto en este ciclo
+                    return min(next_wait, self.queue.mark_retry(entry['idempotency_key'], str(e)))
+                else:
+                    self.queue.mark_rejected(entry['idempotency_key'], str(e))
+                    continue
+            else:
+                self.queue.mark_sent(entry['idempotency_key'], result)
+            if self.on_sent:
+                self.on_sent(entry, result)
+        return next_wait
@@ -0,0 +1,145 @@
+# frontend/records.py
+import json
+import sys
+from typing import Dict, List, Iterable, Union
+
+try:
+    import orjson  # decodificador JSON rápido (opcional)
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+
+def loads(data: Union[bytes, str]):
+    """Decodifica JSON usando orjson si está instalado."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj) -> bytes:
+    """Codifica JSON (UTF-8) usando orjson si está instalado."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, default=str)
+    return json.dumps(obj, default=str, ensure_ascii=False).encode('utf-8')
+
+
+class Record:
+    """Registro compacto con `__slots__` construido a partir de un dict de la API.
+
+    Los campos se leen como atributos (`pago.monto`). Para no romper el
+    código que aún usa la forma de dict también admite `registro['campo']`
+    y `registro.get('campo')`. Los campos desconocidos se conservan en `_extra`.
+    """
+    __slots__ = ('_extra',)
+    FIELDS: tuple = ()
+    # Campos con pocos valores distintos: se comparte una sola copia de cada cadena
+    INTERNED: tuple = ()
+
+    _FIELD_SET: frozenset = frozenset()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._FIELD_SET = frozenset(cls.FIELDS)
+        # Cada subclase recibe su propio `from_dict` generado (ver `_build_from_dict`),
+        # equivalente al genérico de abajo pero sin bucle por campo
+        cls.from_dict = staticmethod(_build_from_dict(cls))
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Record":
+        """Construye el registro a partir de un dict de la API.
+
+        Versión genérica; las subclases la reemplazan por la generada en
+        `__init_subclass__`.
+        """
+        record = object.__new__(cls)
+        for field in cls.FIELDS:
+            value = data.get(field)
+            if field in cls.INTERNED and value.__class__ is str:
+                value = sys.intern(value)
+            setattr(record, field, value)
+        unknown = data.keys() - cls._FIELD_SET
+        record._extra = {key: data[key] for key in unknown} if unknown else None
+        return record
+
+    @classmethod
+    def from_list(cls, items: Iterable[Dict]) -> List["Record"]:
+        from_dict = cls.from_dict
+        return [item if item.__class__ is cls else from_dict(item) for item in items]
+
+    def to_dict(self) -> Dict:
+        data = {field: getattr(self, field) for field in self.FIELDS}
+        if self._extra:
+            data.update(self._extra)
+        return data
+
+    def __getitem__(self, key):
+        if key in self.FIELDS:
+            return getattr(self, key)
+        if self._extra and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in self.FIELDS or bool(self._extra and key in self._extra)
+
+    def get(self, key, default=None):
+        try:
+            value = self[key]
+        except KeyError:
+            return default
+        return value
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    # Se comparan por contenido y sus campos se pueden modificar: no sirven como clave
+    __hash__ = None
+
+    def __repr__(self):
+        fields = ', '.join(f"{field}={getattr(self, field)!r}" for field in self.FIELDS[:3])
+        return f"{type(self).__name__}({fields}, ...)"
+
+
+def _build_from_dict(cls):
+    """Genera un constructor `from_dict` específico para `cls`.
+
+    Asignar cada slot con una línea propia (como hace `dataclasses`) es
+    bastante más rápido que recorrer los campos en un bucle genérico, lo que
+    importa al decodificar cientos de miles de pagos.
+    """
+    lines = ["def from_dict(data):", "    record = _new(cls)", "    get = data.get"]
+    for field in cls.FIELDS:
+        if field in cls.INTERNED:
+            lines.append(f"    value = get({field!r})")
+            lines.append(f"    record.{field} = _intern(value) if value.__class__ is str else value")
+        else:
+            lines.append(f"    record.{field} = get({field!r})")
+    lines.append("    unknown = data.keys() - field_set")
+    lines.append("    record._extra = {key: data[key] for key in unknown} if unknown else None")
+    lines.append("    return record")
+
+    namespace = {'cls': cls, '_new': object.__new__, '_intern': sys.intern, 'field_set': cls._FIELD_SET}
+    exec("\n".join(lines), namespace)
+    return namespace['from_dict']
+
+
+class Subscriber(Record):
+    """Suscriptor (usuario del servicio de agua)."""
+    FIELDS = ('id_usuario', 'nombre', 'apellido', 'direccion', 'telefono', 'numero_paja', 'estado', 'updated_at')
+    __slots__ = FIELDS
+
+
+class Payment(Record):
+    """Pago de un suscriptor, con los datos del suscriptor incluidos por la API."""
+    FIELDS = ('id_pago', 'id_usuario', 'nombre', 'apellido', 'numero_paja', 'direccion',
+              'fecha_pago', 'monto', 'mes_pagado', 'metodo_pago', 'observacion', 'updated_at')
+    INTERNED = ('nombre', 'apellido', 'mes_pagado', 'metodo_pago')
+    __slots__ = FIELDS
+
+
+class Admin(Record):
+    """Administrador del sistema."""
+    FIELDS = ('id_admin', 'usuario', 'nombre', 'rol', 'estado')
+    __slots__ = FIELDS
@@ -0,0 +1,447 @@
+# frontend/report_engine.py
+"""Reportes calculados en el cliente sobre columnas de NumPy.
+
+Los pagos del almacén compartido se copian una vez a arreglos por columna
+(id, suscriptor, fecha, monto, mes pagado y método, estos dos como códigos) y
+cada reporte es una máscara y un `bincount`: con millones de pagos tarda
+milisegundos y no consulta al servidor. Los cambios del almacén se aplican por
+lotes sin reconstruir nada. Sin NumPy (`NUMPY_AVAILABLE` en False) la ventana
+de reportes sigue pidiendo los reportes al servidor.
+"""
+import datetime
+from collections.abc import Sequence
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+try:
+    import numpy as np  # cálculo vectorizado (opcional)
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+# Días sin pagar a partir de los cuales un suscriptor activo es moroso
+MOROSOS_DAYS = 35
+MOROSOS_HEADERS = ['ID', 'Nombre', 'Apellido', 'Teléfono', 'N° Paja', 'Último Pago', 'Días Mora']
+INGRESOS_HEADERS = ['Mes', 'Total Pagos', 'Monto Total (Q)']
+PAGOS_USUARIO_HEADERS = ['ID Pago', 'Nombre', 'Apellido', 'N° Paja', 'Fecha Pago', 'Monto (Q)',
+                         'Método', 'Mes Pagado']
+# Campos por los que se puede agrupar -> encabezado de la columna
+GROUP_FIELDS = {
+    'mes_pagado': 'Mes Pagado',
+    'metodo_pago': 'Método',
+    'mes_fecha': 'Mes de Pago',
+    'anio': 'Año',
+    'fecha_pago': 'Fecha Pago',
+    'id_usuario': 'Suscriptor',
+}
+MESES = ('Enero', 'Febrero', 'Marzo', 'Abril', 'Mayo', 'Junio', 'Julio', 'Agosto',
+         'Septiembre', 'Octubre', 'Noviembre', 'Diciembre')
+# Filas reservadas al crear las columnas vacías (después crecen al doble)
+INITIAL_CAPACITY = 1024
+
+# Fecha de pago faltante o inválida (nunca entra en un rango de fechas)
+NO_DATE = -2 ** 31
+_EPOCH = datetime.date(1970, 1, 1)
+_EPOCH_ORDINAL = _EPOCH.toordinal()
+
+
+class ReportFilter(NamedTuple):
+    """Filtros de los reportes de pagos; None en un campo significa sin filtro."""
+    start: Optional[datetime.date] = None
+    end: Optional[datetime.date] = None
+    metodo: Optional[str] = None
+    id_usuario: Optional[int] = None
+
+
+def _day_number(text) -> int:
+    """'2024-03-05T10:00:00' -> días desde 1970-01-01 (NO_DATE si no es una fecha)."""
+    try:
+        return datetime.date.fromisoformat(str(text)[:10]).toordinal() - _EPOCH_ORDINAL
+    except ValueError:
+        return NO_DATE
+
+
+def _month_number(day: int) -> int:
+    if day == NO_DATE:
+        return NO_DATE
+    date = datetime.date.fromordinal(day + _EPOCH_ORDINAL)
+    return (date.year - 1970) * 12 + date.month - 1
+
+
+def _month_sort_key(label: str):
+    """'Marzo 2024' -> (2024, 3); los textos que no son un mes van al final."""
+    name, _, year = str(label).rpartition(' ')
+    if name in MESES and year.isdigit():
+        return (0, int(year), MESES.index(name) + 1, '')
+    return (1, 0, 0, str(label))
+
+
+class _Categories:
+    """Valores distintos de una columna de texto; cada fila guarda solo su código."""
+
+    def __init__(self):
+        self.values: List = []
+        self._codes: Dict = {}
+
+    def code(self, value) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def find(self, value) -> Optional[int]:
+        return self._codes.get(value)
+
+
+class PaymentColumns:
+    """Pagos guardados por columnas, ordenados por id de pago.
+
+    Los arreglos tienen capacidad extra para que agregar pagos no copie todo;
+    `column(nombre)` devuelve la vista con las filas en uso.
+    """
+
+    DTYPES = {
+        'id_pago': 'int64',
+        'id_usuario': 'int32',
+        'fecha': 'int32',
+        'mes_fecha': 'int32',
+        'monto': 'float64',
+        # intp: `bincount` lo usa sin convertir
+        'mes_pagado': 'intp',
+        'metodo_pago': 'int16',
+    }
+
+    def __init__(self):
+        self.size = 0
+        self.meses = _Categories()
+        self.metodos = _Categories()
+        self._data = {name: np.empty(INITIAL_CAPACITY, dtype) for name, dtype in self.DTYPES.items()}
+        self._days: Dict[str, int] = {}
+        self._months: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return self.size
+
+    def column(self, name: str):
+        return self._data[name][:self.size]
+
+    def update(self, payments: Iterable, deleted: Iterable[int] = ()):
+        """Agrega o reemplaza `payments` y quita los pagos con id en `deleted`."""
+        batch = self._encode(list(payments))
+        if len(batch['id_pago']):
+            self._upsert(batch)
+        deleted = np.fromiter(deleted, np.int64)
+        if len(deleted):
+            self._delete(deleted)
+
+    def _encode(self, payments: List) -> Dict:
+        """Convierte registros `Payment` en arreglos (una pasada por columna)."""
+        count = len(payments)
+        days = self._days
+        months = self._months
+        meses = self.meses.code
+        metodos = self.metodos.code
+
+        def day_of(text):
+            key = str(text)[:10]
+            day = days.get(key)
+            if day is None:
+                day = days[key] = _day_number(key)
+            return day
+
+        def month_of(day):
+            month = months.get(day)
+            if month is None:
+                month = months[day] = _month_number(day)
+            return month
+
+        fecha = np.fromiter((day_of(p.fecha_pago) for p in payments), np.int32, count)
+        return {
+            'id_pago': np.fromiter((p.id_pago for p in payments), np.int64, count),
+            'id_usuario': np.fromiter((p.id_usuario or 0 for p in payments), np.int32, count),
+            'fecha': fecha,
+            'mes_fecha': np.fromiter((month_of(day) for day in fecha.tolist()), np.int32, count),
+            'monto': np.fromiter((p.monto or 0.0 for p in payments), np.float64, count),
+            'mes_pagado': np.fromiter((meses(p.mes_pagado) for p in payments), np.intp, count),
+            # Un pago sin método queda con '' (los reportes comparan el texto en minúsculas)
+            'metodo_pago': np.fromiter((metodos(p.metodo_pago or '') for p in payments), np.int16, count),
+        }
+
+    def _positions(self, ids):
+        """Filas de los ids dados y cuáles de ellos existen."""
+        existing = self.column('id_pago')
+        positions = np.searchsorted(existing, ids)
+        found = positions < self.size
+        found[found] = existing[positions[found]] == ids[found]
+        return positions, found
+
+    def _upsert(self, batch: Dict):
+        positions, found = self._positions(batch['id_pago'])
+        if found.any():
+            rows = positions[found]
+            for name, values in batch.items():
+                self._data[name][rows] = values[found]
+        new = ~found
+        if not new.any():
+            return
+
+        added = int(new.sum())
+        self._reserve(self.size + added)
+        previous_max = self._data['id_pago'][self.size - 1] if self.size else None
+        start = self.size
+        for name, values in batch.items():
+            self._data[name][start:start + added] = values[new]
+        self.size += added
+        ids = self.column('id_pago')
+        if (previous_max is not None and ids[start:].min() <= previous_max) or \
+                (added > 1 and (np.diff(ids[start:]) <= 0).any()):
+            # Pagos fuera de orden (raro): se reordena todo por id
+            order = np.argsort(ids, kind='stable')
+            for name in self._data:
+                self._data[name][:self.size] = self.column(name)[order]
+
+    def _delete(self, ids):
+        positions, found = self._positions(ids)
+        if not found.any():
+            return
+        keep = np.ones(self.size, bool)
+        keep[positions[found]] = False
+        size = int(keep.sum())
+        # Arreglos nuevos: los reportes ya generados siguen viendo los anteriores
+        data = {}
+        for name, dtype in self.DTYPES.items():
+            array = np.empty(max(size, INITIAL_CAPACITY), dtype)
+            array[:size] = self.column(name)[keep]
+            data[name] = array
+        self._data = data
+        self.size = size
+
+    def _reserve(self, capacity: int):
+        current = len(self._data['id_pago'])
+        if capacity <= current:
+            return
+        capacity = max(capacity, current * 2)
+        for name, array in self._data.items():
+            grown = np.empty(capacity, array.dtype)
+            grown[:self.size] = array[:self.size]
+            self._data[name] = grown
+
+
+class PaymentRows(Sequence):
+    """Filas del detalle de pagos, armadas solo cuando se leen.
+
+    La tabla y la exportación piden las filas una a una, así que un reporte de
+    millones de pagos no crea millones de listas de golpe.
+    """
+
+    def __init__(self, engine: "ReportEngine", rows):
+        self._engine = engine
+        self._rows = rows
+        payments = engine.payments
+        self._columns = {name: payments.column(name) for name in
+                         ('id_pago', 'id_usuario', 'fecha', 'monto', 'mes_pagado', 'metodo_pago')}
+        self._meses = payments.meses.values
+        self._metodos = payments.metodos.values
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        row = self._rows[index]
+        columns = self._columns
+        id_usuario = int(columns['id_usuario'][row])
+        user = self._engine.subscribers.get(id_usuario)
+        return [int(columns['id_pago'][row]),
+                user.nombre if user is not None else '',
+                user.apellido if user is not None else '',
+                user.numero_paja if user is not None else '',
+                self._engine.date_text(int(columns['fecha'][row])),
+                float(columns['monto'][row]),
+                self._metodos[columns['metodo_pago'][row]],
+                self._meses[columns['mes_pagado'][row]]]
+
+
+class ReportEngine:
+    """Reportes de morosos, ingresos, detalle de pagos y agrupaciones, sin llamar a la API.
+
+    Los resultados tienen la misma forma que los reportes del servidor
+    (`{'encabezados': [...], 'datos': [...]}`) para mostrarlos y exportarlos
+    igual. Todos los métodos se llaman desde un solo hilo (el de Tk); solo
+    `from_records` se usa en segundo plano.
+    """
+
+    def __init__(self):
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("Los reportes locales necesitan NumPy (pip install numpy)")
+        self.payments = PaymentColumns()
+        self.subscribers: Dict[int, object] = {}
+        self._dates: Dict[int, str] = {}
+        self._last_payment = None
+        self._subscriber_labels: Optional[Dict[int, str]] = None
+
+    @classmethod
+    def from_records(cls, subscribers: Iterable, payments: Iterable) -> "ReportEngine":
+        """Crea el motor con los registros del almacén (`Subscriber` y `Payment`)."""
+        engine = cls()
+        engine.update_subscribers(subscribers)
+        engine.update_payments(payments)
+        return engine
+
+    # ---------- Datos ----------
+
+    def update_subscribers(self, changed: Iterable = (), deleted: Iterable[int] = ()):
+        for user in changed:
+            self.subscribers[user.id_usuario] = user
+        for user_id in deleted:
+            self.subscribers.pop(user_id, None)
+        self._subscriber_labels = None
+
+    def update_payments(self, changed: Iterable = (), deleted: Iterable[int] = ()):
+        self.payments.update(changed, deleted)
+        self._last_payment = None
+
+    def date_text(self, day: int) -> str:
+        text = self._dates.get(day)
+        if text is None:
+            text = '' if day == NO_DATE else (_EPOCH + datetime.timedelta(days=day)).isoformat()
+            self._dates[day] = text
+        return text
+
+    # ---------- Filtros ----------
+
+    def mask(self, filters: Optional[ReportFilter] = None):
+        """Máscara booleana de los pagos que cumplen `filters` (None: todos los pagos)."""
+        if filters is None or filters == ReportFilter():
+            return None
+        payments = self.payments
+        mask = np.ones(payments.size, bool)
+        if filters.start is not None or filters.end is not None:
+            fecha = payments.column('fecha')
+            mask &= fecha != NO_DATE
+            if filters.start is not None:
+                mask &= fecha >= filters.start.toordinal() - _EPOCH_ORDINAL
+            if filters.end is not None:
+                mask &= fecha <= filters.end.toordinal() - _EPOCH_ORDINAL
+        if filters.metodo is not None:
+            code = payments.metodos.find(filters.metodo)
+            if code is None:
+                return np.zeros(payments.size, bool)
+            mask &= payments.column('metodo_pago') == code
+        if filters.id_usuario is not None:
+            mask &= payments.column('id_usuario') == filters.id_usuario
+        return mask
+
+    # ---------- Reportes ----------
+
+    def morosos(self, today: Optional[datetime.date] = None, days: int = MOROSOS_DAYS) -> Dict:
+        """Suscriptores activos sin pagos o cuyo último pago tiene más de `days` días."""
+        today = today or datetime.date.today()
+        today_number = today.toordinal() - _EPOCH_ORDINAL
+        last = self._last_payments()
+        active = np.fromiter((user_id for user_id, user in sorted(self.subscribers.items()) if user.estado),
+                             np.int64)
+        known = active < len(last)
+        last_of_active = np.full(len(active), NO_DATE, np.int64)
+        last_of_active[known] = last[active[known]]
+        overdue = today_number - last_of_active
+        selected = (last_of_active == NO_DATE) | (overdue > days)
+
+        rows = []
+        for user_id, last_day, late in zip(active[selected].tolist(), last_of_active[selected].tolist(),
+                                           overdue[selected].tolist()):
+            user = self.subscribers[user_id]
+            paid = last_day != NO_DATE
+            rows.append([user_id, user.nombre, user.apellido, user.telefono or '', user.numero_paja,
+                         self.date_text(last_day) if paid else 'Sin pagos', late if paid else '-'])
+        return {'encabezados': list(MOROSOS_HEADERS), 'datos': rows}
+
+    def ingresos(self, filters: Optional[ReportFilter] = None) -> Dict:
+        """Cantidad y total recaudado por mes pagado, en orden cronológico."""
+        report = self.group_by('mes_pagado', filters)
+        report['encabezados'] = list(INGRESOS_HEADERS)
+        return report
+
+    def pagos_usuario(self, filters: Optional[ReportFilter] = None) -> Dict:
+        """Detalle de los pagos (en orden de id) con los datos de su suscriptor."""
+        mask = self.mask(filters)
+        rows = np.arange(self.payments.size) if mask is None else np.flatnonzero(mask)
+        return {'encabezados': list(PAGOS_USUARIO_HEADERS), 'datos': PaymentRows(self, rows)}
+
+    def group_by(self, field: str, filters: Optional[ReportFilter] = None) -> Dict:
+        """Cantidad de pagos y monto total por cada valor de `field` (ver GROUP_FIELDS)."""
+        if field not in GROUP_FIELDS:
+            raise ValueError(f"No se puede agrupar por {field}")
+        payments = self.payments
+        mask = self.mask(filters)
+        codes, offset = self._group_codes(field)
+        monto = payments.column('monto')
+        if field in ('mes_fecha', 'anio', 'fecha_pago'):
+            # Los pagos sin fecha no tienen grupo
+            with_date = payments.column('fecha') != NO_DATE
+            mask = with_date if mask is None else mask & with_date
+        if mask is not None:
+            codes = np.compress(mask, codes)
+            monto = np.compress(mask, monto)
+        if offset:
+            codes = codes - offset
+
+        counts = np.bincount(codes)
+        totals = np.bincount(codes, weights=monto, minlength=len(counts))
+        groups = np.flatnonzero(counts)
+        if field in ('metodo_pago', 'id_usuario'):
+            # Los que más pagaron primero
+            groups = groups[np.argsort(-totals[groups], kind='stable')]
+        labels = self._group_labels(field, (groups + offset).tolist())
+        rows = [[label, count, total] for label, count, total in
+                zip(labels, counts[groups].tolist(), np.round(totals[groups], 2).tolist())]
+        if field == 'mes_pagado':
+            rows.sort(key=lambda row: _month_sort_key(row[0]))
+        return {'encabezados': [GROUP_FIELDS[field], 'Total Pagos', 'Monto Total (Q)'], 'datos': rows}
+
+    def _group_codes(self, field: str):
+        """Códigos enteros no negativos (después de restar `offset`) del campo a agrupar."""
+        payments = self.payments
+        if field == 'anio':
+            months = payments.column('mes_fecha')
+            valid = months[months != NO_DATE]
+            offset = int(valid.min()) // 12 if len(valid) else 0
+            return months // 12, offset
+        column = payments.column({'fecha_pago': 'fecha'}.get(field, field))
+        if field in ('mes_fecha', 'fecha_pago'):
+            valid = column[column != NO_DATE]
+            return column, int(valid.min()) if len(valid) else 0
+        return column, 0
+
+    def _group_labels(self, field: str, values: List[int]) -> List[str]:
+        if field == 'mes_pagado':
+            return [self.payments.meses.values[value] for value in values]
+        if field == 'metodo_pago':
+            return [self.payments.metodos.values[value] for value in values]
+        if field == 'mes_fecha':
+            return [f"{MESES[value % 12]} {1970 + value // 12}" for value in values]
+        if field == 'anio':
+            return [str(1970 + value) for value in values]
+        if field == 'fecha_pago':
+            return [self.date_text(value) for value in values]
+        labels = self._user_labels()
+        return [labels.get(value) or f"Usuario {value}" for value in values]
+
+    def _user_labels(self) -> Dict[int, str]:
+        """'Nombre Apellido (Paja: N)' de cada suscriptor; se guarda hasta el próximo cambio."""
+        if self._subscriber_labels is None:
+            self._subscriber_labels = {user_id: f"{user.nombre} {user.apellido} (Paja: {user.numero_paja})"
+                                       for user_id, user in self.subscribers.items()}
+        return self._subscriber_labels
+
+    def _last_payments(self):
+        """Día del último pago de cada suscriptor (índice: id_usuario); se guarda hasta el próximo cambio."""
+        if self._last_payment is None:
+            payments = self.payments
+            user_ids = payments.column('id_usuario')
+            last = np.full(int(user_ids.max()) + 1 if payments.size else 0, NO_DATE, np.int32)
+            np.maximum.at(last, user_ids, payments.column('fecha'))
+            self._last_payment = last
+        return self._last_payment
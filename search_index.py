@@ -0,0 +1,253 @@
+# frontend/search_index.py
+import bisect
+import heapq
+import re
+from itertools import compress
+import unicodedata
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Set
+
+# Largo de los n-gramas para buscar texto en medio de una palabra ("rez" encuentra "Pérez")
+NGRAM = 3
+# Términos recientes cuyo resultado se guarda (al escribir, cada tecla reutiliza el anterior)
+TERM_CACHE_SIZE = 64
+# Puntaje de cada forma en que un término coincide con una palabra (ver `ranked`)
+EXACT_SCORE = 4
+PREFIX_SCORE = 3
+SUBSTRING_SCORE = 2
+FUZZY_SCORE = 1
+# Largo mínimo de un término para aceptar una letra de diferencia ("peres" -> "perez")
+FUZZY_MIN_LENGTH = 4
+RANKED_LIMIT = 20
+
+_SEPARATORS = re.compile(r'[^0-9a-z]+')
+
+
+def normalize(text) -> str:
+    """Minúsculas y sin tildes: 'Pérez Ñuñez' -> 'perez nunez'."""
+    text = unicodedata.normalize('NFKD', str(text).lower())
+    return ''.join(c for c in text if not unicodedata.combining(c))
+
+
+def tokenize(text) -> List[str]:
+    return [token for token in _SEPARATORS.split(normalize(text)) if token]
+
+
+class SearchIndex:
+    """Índice invertido en memoria para buscar mientras se escribe.
+
+    Cada documento (p. ej. un pago) se registra con su clave y los textos de sus
+    campos. Una búsqueda devuelve las claves, en el orden en que se agregaron, de
+    los documentos que contienen todos los términos: cada término coincide con el
+    inicio de una palabra o, si tiene al menos `ngram` letras, con cualquier parte
+    de ella. Volver a agregar una clave reemplaza su documento y `remove` lo
+    quita: los documentos viejos quedan marcados y se omiten en los resultados.
+    """
+
+    def __init__(self, ngram: int = NGRAM):
+        self.ngram = ngram
+        self._keys: List[Hashable] = []
+        self._doc_of: Dict[Hashable, int] = {}
+        self._removed: Set[int] = set()
+        # palabra -> documentos que la contienen (en orden creciente)
+        self._postings: Dict[str, List[int]] = {}
+        self._tokens_by_text: Dict[str, tuple] = {}
+        self._sorted_tokens: Optional[List[str]] = None
+        self._grams: Optional[Dict[str, Set[str]]] = None
+        self._term_cache: "OrderedDict[str, Set[int]]" = OrderedDict()
+
+    @classmethod
+    def build(cls, items: Iterable, key: Callable, fields: Callable, ngram: int = NGRAM) -> "SearchIndex":
+        """Crea un índice con `key(item)` como clave y los textos de `fields(item)`."""
+        index = cls(ngram)
+        for item in items:
+            index.add(key(item), fields(item))
+        index.prepare()
+        return index
+
+    def __len__(self) -> int:
+        return len(self._doc_of)
+
+    def add(self, key: Hashable, texts: Iterable):
+        """Agrega (o reemplaza) el documento `key` con los textos de sus campos."""
+        self.remove(key)
+        doc = len(self._keys)
+        self._keys.append(key)
+        self._doc_of[key] = doc
+        postings = self._postings
+        cache = self._tokens_by_text
+        seen = set()
+        for text in texts:
+            if text is None or text == '':
+                continue
+            text = str(text)
+            tokens = cache.get(text)
+            if tokens is None:
+                # Nombres y meses se repiten mucho: cada texto se separa una sola vez
+                tokens = cache[text] = tuple(tokenize(text))
+            for token in tokens:
+                if token in seen:
+                    continue
+                seen.add(token)
+                docs = postings.get(token)
+                if docs is None:
+                    postings[token] = [doc]
+                    self._sorted_tokens = None
+                    self._grams = None
+                else:
+                    docs.append(doc)
+        self._term_cache.clear()
+
+    def remove(self, key: Hashable):
+        doc = self._doc_of.pop(key, None)
+        if doc is not None:
+            self._removed.add(doc)
+            self._term_cache.clear()
+
+    def prepare(self):
+        """Ordena las palabras y arma los n-gramas (se hace solo si hace falta al buscar)."""
+        if self._sorted_tokens is None:
+            self._sorted_tokens = sorted(self._postings)
+        if self._grams is None:
+            n = self.ngram
+            grams: Dict[str, Set[str]] = {}
+            for token in self._postings:
+                for i in range(len(token) - n + 1):
+                    grams.setdefault(token[i:i + n], set()).add(token)
+            self._grams = grams
+
+    def search(self, query: str) -> Optional[List[Hashable]]:
+        """Claves de los documentos que coinciden con todos los términos de `query`.
+
+        Devuelve None si la consulta no tiene términos (sin filtro).
+        """
+        terms = tokenize(query)
+        if not terms:
+            return None
+        self.prepare()
+        result: Optional[Set[int]] = None
+        # Los términos largos suelen ser los más selectivos: se cruzan primero
+        for term in sorted(set(terms), key=len, reverse=True):
+            docs = self._match(term)
+            result = docs if result is None else result & docs
+            if not result:
+                return []
+        if self._removed:
+            result = result - self._removed
+
+        keys = self._keys
+        if len(result) * 8 < len(keys):
+            return [keys[doc] for doc in sorted(result)]
+        # Muchos resultados: marcar y filtrar en orden es más rápido que ordenar
+        mask = bytearray(len(keys))
+        for doc in result:
+            mask[doc] = 1
+        return list(compress(keys, mask))
+
+    def ranked(self, query: str, limit: int = RANKED_LIMIT) -> Optional[List[Hashable]]:
+        """Las `limit` claves que mejor coinciden con todos los términos de `query`, la mejor primero.
+
+        A diferencia de `search` también acepta palabras con una letra de
+        diferencia (términos de al menos `FUZZY_MIN_LENGTH` letras) y ordena por
+        puntaje: palabra exacta, inicio de palabra, parte de ella y aproximada.
+        Los empates quedan en el orden en que se agregaron. Devuelve None si la
+        consulta no tiene términos.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return None
+        self.prepare()
+        scores: Optional[Dict[int, int]] = None
+        for term in sorted(set(terms), key=len, reverse=True):
+            term_scores = self._term_scores(term)
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {doc: score + term_scores[doc] for doc, score in scores.items() if doc in term_scores}
+            if not scores:
+                return []
+        removed = self._removed
+        best = heapq.nsmallest(limit, ((-score, doc) for doc, score in scores.items() if doc not in removed))
+        return [self._keys[doc] for _, doc in best]
+
+    def _term_scores(self, term: str) -> Dict[int, int]:
+        """Mejor puntaje de `term` en cada documento que lo contiene."""
+        token_scores: Dict[str, int] = {}
+        for token in self._matching_tokens(term):
+            if token == term:
+                token_scores[token] = EXACT_SCORE
+            elif token.startswith(term):
+                token_scores[token] = PREFIX_SCORE
+            else:
+                token_scores[token] = SUBSTRING_SCORE
+        if len(term) >= FUZZY_MIN_LENGTH:
+            for token in self._fuzzy_tokens(term):
+                token_scores.setdefault(token, FUZZY_SCORE)
+
+        doc_scores: Dict[int, int] = {}
+        postings = self._postings
+        for token, score in token_scores.items():
+            for doc in postings[token]:
+                if doc_scores.get(doc, 0) < score:
+                    doc_scores[doc] = score
+        return doc_scores
+
+    def _fuzzy_tokens(self, term: str) -> List[str]:
+        """Palabras a una letra de distancia de `term` (cambiada, sobrante o faltante)."""
+        n = self.ngram
+        candidates: Set[str] = set()
+        for i in range(len(term) - n + 1):
+            candidates.update(self._grams.get(term[i:i + n], ()))
+        # Un error en las primeras letras puede no dejar n-gramas en común: se suman las
+        # palabras que empiezan con la misma letra
+        tokens = self._sorted_tokens
+        start = bisect.bisect_left(tokens, term[0])
+        end = bisect.bisect_left(tokens, term[0] + '\uffff', start)
+        candidates.update(tokens[start:end])
+        return [token for token in candidates if _one_edit_apart(term, token)]
+
+    def _match(self, term: str) -> Set[int]:
+        cached = self._term_cache.get(term)
+        if cached is not None:
+            self._term_cache.move_to_end(term)
+            return cached
+
+        docs: Set[int] = set()
+        for token in self._matching_tokens(term):
+            docs.update(self._postings[token])
+
+        self._term_cache[term] = docs
+        if len(self._term_cache) > TERM_CACHE_SIZE:
+            self._term_cache.popitem(last=False)
+        return docs
+
+    def _matching_tokens(self, term: str) -> Iterable[str]:
+        if len(term) < self.ngram:
+            # Prefijo: rango de palabras ordenadas que empiezan con `term`
+            tokens = self._sorted_tokens
+            start = bisect.bisect_left(tokens, term)
+            end = bisect.bisect_left(tokens, term + '\uffff', start)
+            return tokens[start:end]
+
+        n = self.ngram
+        candidates: Optional[Set[str]] = None
+        for i in range(len(term) - n + 1):
+            with_gram = self._grams.get(term[i:i + n])
+            if not with_gram:
+                return ()
+            candidates = set(with_gram) if candidates is None else candidates & with_gram
+        return [token for token in candidates if term in token]
+
+
+def _one_edit_apart(a: str, b: str) -> bool:
+    """True si `a` y `b` difieren en exactamente una letra (cambiada, sobrante o faltante)."""
+    if abs(len(a) - len(b)) > 1 or a == b:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) == len(b):
+        return a[i + 1:] == b[i + 1:]
+    return a[i:] == b[i + 1:]
@@ -0,0 +1,246 @@
+# frontend/sync_engine.py
+import json
+import os
+import sqlite3
+import threading
+from typing import List, Iterable, NamedTuple
+from records import Record, Subscriber, Payment, loads
+
+DEFAULT_REPLICA_PATH = os.path.join(os.getcwd(), 'Cache_Local', 'replica.sqlite3')
+
+# Recurso -> campo identificador de cada registro
+ID_FIELDS = {
+    'users': 'id_usuario',
+    'payments': 'id_pago',
+}
+RECORD_TYPES = {
+    'users': Subscriber,
+    'payments': Payment,
+}
+
+
+class SyncResult(NamedTuple):
+    changed: List[Record]   # registros nuevos o modificados
+    deleted: List[int]      # ids eliminados (solo detectables en una sincronización completa)
+    full: bool              # True si se descargó el conjunto completo
+
+
+class _Watermark:
+    """Marca de agua de una pasada: el `updated_at` más reciente o, si falta en algún registro, el id más alto."""
+
+    def __init__(self, id_field: str):
+        self.id_field = id_field
+        self.timestamps = True
+        self.max_updated = None
+        self.max_id = None
+
+    def update(self, records: Iterable[Record]):
+        for record in records:
+            updated = record.get('updated_at')
+            if updated:
+                updated = str(updated)
+                if self.max_updated is None or updated > self.max_updated:
+                    self.max_updated = updated
+            else:
+                self.timestamps = False
+            record_id = record[self.id_field]
+            if self.max_id is None or record_id > self.max_id:
+                self.max_id = record_id
+
+    def cursor(self):
+        """(campo, valor) de la marca, o None si la pasada no trajo registros."""
+        if self.max_id is None:
+            return None
+        if self.timestamps:
+            return 'updated_at', self.max_updated
+        return 'id', self.max_id
+
+
+class SyncEngine:
+    """Réplica local (SQLite) de suscriptores y pagos sincronizada por deltas.
+
+    Tras la primera descarga completa solo se piden los registros posteriores
+    a la marca de agua guardada: `updated_at` si el servidor lo envía, o el id
+    más alto en su defecto. Si el servidor ignora el filtro, la fusión local
+    igualmente devuelve solo los registros que cambiaron.
+    """
+
+    def __init__(self, api_client, path: str = DEFAULT_REPLICA_PATH):
+        self.api_client = api_client
+        self.path = path
+        self._lock = threading.Lock()
+
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        for resource in ID_FIELDS:
+            self._conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {resource} (
+                    id INTEGER PRIMARY KEY,
+                    data TEXT NOT NULL
+                )
+            """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS sync_state (
+                resource TEXT PRIMARY KEY,
+                cursor_field TEXT,
+                cursor_value TEXT
+            )
+        """)
+
+    # ---------- Lectura de la réplica ----------
+
+    def records(self, resource: str) -> List[Record]:
+        """Devuelve todos los registros guardados localmente, en orden de id."""
+        with self._lock:
+            rows = self._conn.execute(f"SELECT data FROM {resource} ORDER BY id").fetchall()
+        from_dict = RECORD_TYPES[resource].from_dict
+        return [from_dict(loads(data)) for (data,) in rows]
+
+    def has_data(self, resource: str) -> bool:
+        return self._cursor(resource) is not None
+
+    # ---------- Sincronización ----------
+
+    def sync_users(self) -> SyncResult:
+        """Sincroniza los suscriptores con el servidor."""
+        cursor = self._cursor('users')
+        if cursor and cursor[0] == 'updated_at':
+            users = self.api_client.get_users(updated_since=cursor[1])
+            return self._merge('users', users, full=False)
+        # Sin marca de tiempo no hay forma de ver modificaciones: lista completa y diferencia local
+        return self._merge('users', self.api_client.get_users(), full=True)
+
+    def sync_payments(self) -> SyncResult:
+        """Sincroniza los pagos con el servidor."""
+        cursor = self._cursor('payments')
+        params = {}
+        if cursor and cursor[0] == 'updated_at':
+            params['updated_since'] = cursor[1]
+        elif cursor and cursor[0] == 'id':
+            params['since_id'] = int(cursor[1])
+
+        changed = []
+        seen = set() if not params else None
+        watermark = _Watermark(ID_FIELDS['payments'])
+        for page in self.api_client.iter_payments(**params):
+            # Los registros se guardan página a página, pero la marca de agua no: si la
+            # descarga se corta (o las páginas no vienen ordenadas por el cursor) la
+            # próxima sincronización vuelve a pedir desde la marca anterior
+            changed.extend(self._merge('payments', page, full=False, advance=False).changed)
+            watermark.update(page)
+            if seen is not None:
+                seen.update(payment['id_pago'] for payment in page)
+
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                deleted = self._delete_missing_locked('payments', seen) if seen is not None else []
+                self._advance_cursor('payments', watermark.cursor())
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return SyncResult(changed, deleted, full=not params)
+
+    def invalidate(self, resources: Iterable[str]):
+        """Fuerza una sincronización completa de los recursos cuyos registros existentes cambiaron.
+
+        'payment' (detalle de pago) solo se invalida cuando cambian pagos ya
+        guardados, p. ej. al editar el nombre de un suscriptor; un cursor por id
+        no detectaría ese cambio.
+        """
+        if 'payment' in resources:
+            with self._lock:
+                self._conn.execute(
+                    "DELETE FROM sync_state WHERE resource = 'payments' AND cursor_field = 'id'"
+                )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # ---------- Internos ----------
+
+    def _cursor(self, resource: str):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT cursor_field, cursor_value FROM sync_state WHERE resource = ?", (resource,)
+            ).fetchone()
+
+    def _merge(self, resource: str, records: List[Record], full: bool, advance: bool = True) -> SyncResult:
+        """Inserta o actualiza `records` y devuelve los que realmente cambiaron.
+
+        Con `advance` la marca de agua se actualiza en la misma transacción;
+        sin él, quien llama la guarda al terminar todas las páginas.
+        """
+        id_field = ID_FIELDS[resource]
+        changed = []
+        with self._lock:
+            existing = {}
+            ids = [record[id_field] for record in records]
+            # Consultar en bloques para no exceder el límite de parámetros de SQLite
+            for start in range(0, len(ids), 500):
+                block = ids[start:start + 500]
+                placeholders = ','.join('?' for _ in block)
+                existing.update(self._conn.execute(
+                    f"SELECT id, data FROM {resource} WHERE id IN ({placeholders})", block
+                ).fetchall())
+
+            rows = []
+            for record in records:
+                data = json.dumps(record.to_dict(), sort_keys=True, default=str)
+                if existing.get(record[id_field]) != data:
+                    changed.append(record)
+                    rows.append((record[id_field], data))
+
+            self._conn.execute("BEGIN")
+            self._conn.executemany(f"INSERT OR REPLACE INTO {resource} (id, data) VALUES (?, ?)", rows)
+            if advance:
+                watermark = _Watermark(id_field)
+                watermark.update(records)
+                self._advance_cursor(resource, watermark.cursor())
+            self._conn.execute("COMMIT")
+
+        deleted = self._delete_missing(resource, set(ids)) if full else []
+        return SyncResult(changed, deleted, full)
+
+    def _advance_cursor(self, resource: str, cursor):
+        """Guarda la marca de agua `cursor` (ver `_Watermark.cursor`) si es posterior a la actual. Requiere `_lock`."""
+        if cursor is None:
+            current = self._conn.execute(
+                "SELECT 1 FROM sync_state WHERE resource = ?", (resource,)
+            ).fetchone()
+            if current is None:
+                # Conjunto vacío: registrar que ya se sincronizó una vez
+                self._conn.execute(
+                    "INSERT INTO sync_state (resource, cursor_field, cursor_value) VALUES (?, NULL, NULL)",
+                    (resource,),
+                )
+            return
+
+        field, value = cursor
+        current = self._conn.execute(
+            "SELECT cursor_field, cursor_value FROM sync_state WHERE resource = ?", (resource,)
+        ).fetchone()
+        if current and current[0] == field and current[1] is not None:
+            old = current[1] if field == 'updated_at' else int(current[1])
+            value = max(old, value)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO sync_state (resource, cursor_field, cursor_value) VALUES (?, ?, ?)",
+            (resource, field, str(value)),
+        )
+
+    def _delete_missing(self, resource: str, present_ids: set) -> List[int]:
+        """Elimina de la réplica los registros que ya no existen en el servidor."""
+        with self._lock:
+            return self._delete_missing_locked(resource, present_ids)
+
+    def _delete_missing_locked(self, resource: str, present_ids: set) -> List[int]:
+        """Cuerpo de `_delete_missing`, para usarlo dentro de una transacción. Requiere `_lock`."""
+        stored = [row[0] for row in self._conn.execute(f"SELECT id FROM {resource}")]
+        missing = [record_id for record_id in stored if record_id not in present_ids]
+        if missing:
+            self._conn.executemany(f"DELETE FROM {resource} WHERE id = ?", [(i,) for i in missing])
+        return missing
@@ -0,0 +1 @@
+# frontend/tools/__init__.py
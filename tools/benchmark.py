@@ -0,0 +1,452 @@
+# frontend/tools/benchmark.py
+"""Benchmarks del cliente: API, formato de filas, llenado de tablas y exportación.
+
+Uso (desde el directorio frontend):
+
+    python -m tools.benchmark --output linea_base.json
+    python -m tools.benchmark --compare linea_base.json --threshold 0.2
+
+Las pruebas de interfaz necesitan un display; en Linux sin display se inicia
+Xvfb si está instalado y, si no, esas pruebas se marcan como omitidas. Con
+`--compare` una prueba omitida o con error cuenta como fallo.
+
+La línea base depende de la máquina, por lo que no se versiona: se genera
+con `--output` en la misma máquina que luego compara (p. ej. el runner de CI)
+y se guarda allí, fuera del repositorio.
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Optional, Dict, List, Callable
+from unittest import mock
+
+from api_client import APIClient
+from records import Payment, Subscriber
+from tools.data_generator import SyntheticData, PAGOS_USUARIO_HEADERS
+from tools.fake_backend import FakeBackend
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+DEFAULT_REPEAT = 3
+# Aumento relativo de la mediana a partir del cual se considera una regresión
+DEFAULT_THRESHOLD = 0.20
+# Un suscriptor paga un mes por ciclo: con más pagos que esto se reparten entre 50 000 suscriptores
+MAX_SUBSCRIBERS = 50_000
+
+
+class SkipBenchmark(Exception):
+    """La prueba no puede ejecutarse en este entorno (p. ej. sin display)."""
+
+
+class BenchmarkEnv:
+    """Recursos compartidos entre pruebas: backends de prueba, ventana Tk y carpeta temporal."""
+
+    def __init__(self):
+        self.tmpdir = tempfile.mkdtemp(prefix='benchmark-')
+        self._backends: Dict[tuple, FakeBackend] = {}
+        self._datasets: Dict[tuple, SyntheticData] = {}
+        self._engines: Dict[int, object] = {}
+        self._root = None
+        self._xvfb: Optional[subprocess.Popen] = None
+        self._widgets = []
+        # Ruta que devuelve el diálogo "Guardar como" durante las pruebas
+        self.save_path = os.path.join(self.tmpdir, 'exportado')
+
+    def data(self, subscribers: int, payments: int) -> SyntheticData:
+        key = (subscribers, payments)
+        if key not in self._datasets:
+            self._datasets[key] = SyntheticData(subscribers, payments, seed=1)
+        return self._datasets[key]
+
+    def payments_data(self, size: int) -> SyntheticData:
+        return self.data(min(size, MAX_SUBSCRIBERS), size)
+
+    def report_engine(self, size: int):
+        """Motor de reportes local con `size` pagos (se arma una vez por tamaño)."""
+        from report_engine import NUMPY_AVAILABLE, ReportEngine
+        if not NUMPY_AVAILABLE:
+            raise SkipBenchmark("NumPy no está instalado")
+        if size not in self._engines:
+            data = self.payments_data(size)
+            self._engines[size] = ReportEngine.from_records(Subscriber.from_list(data.iter_subscribers()),
+                                                            Payment.from_list(data.iter_payments()))
+        return self._engines[size]
+
+    def backend(self, data: SyntheticData) -> FakeBackend:
+        key = (data.subscriber_count, data.payment_count)
+        if key not in self._backends:
+            self._backends[key] = FakeBackend(data).start()
+        return self._backends[key]
+
+    def client(self, data: SyntheticData) -> APIClient:
+        """Cliente nuevo (sin cachés en memoria) con sesión iniciada en el backend de `data`."""
+        client = APIClient(base_url=self.backend(data).base_url, deadline=None)
+        client.login('admin', 'admin123')
+        return client
+
+    def root(self):
+        """Ventana raíz oculta para construir los frames de la aplicación."""
+        if self._root is None:
+            self._ensure_display()
+            import customtkinter as ctk
+            try:
+                self._root = ctk.CTk()
+            except Exception as e:
+                raise SkipBenchmark(f"sin display: {e}")
+            self._root.withdraw()
+        return self._root
+
+    def track(self, widget):
+        """Registra un widget para destruirlo al terminar la repetición."""
+        self._widgets.append(widget)
+        return widget
+
+    def cleanup(self):
+        for widget in self._widgets:
+            widget.destroy()
+        self._widgets.clear()
+
+    def close(self):
+        self.cleanup()
+        for backend in self._backends.values():
+            backend.stop()
+        if self._root is not None:
+            self._root.destroy()
+        if self._xvfb is not None:
+            self._xvfb.terminate()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _ensure_display(self):
+        if sys.platform != 'linux' or os.environ.get('DISPLAY'):
+            return
+        xvfb = shutil.which('Xvfb')
+        if not xvfb:
+            raise SkipBenchmark("sin display y sin Xvfb instalado")
+        display = ':%d' % (90 + os.getpid() % 100)
+        self._xvfb = subprocess.Popen([xvfb, display, '-screen', '0', '1280x1024x24'],
+                                      stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        os.environ['DISPLAY'] = display
+        time.sleep(0.5)
+
+
+class _Benchmark:
+    def __init__(self, name: str, func: Callable, max_size: Optional[int], scales: bool):
+        self.name = name
+        self.func = func
+        self.max_size = max_size
+        self.scales = scales
+
+
+BENCHMARKS: List[_Benchmark] = []
+
+
+def benchmark(name: str, max_size: Optional[int] = None, scales: bool = True):
+    """Registra una prueba: `func(env, size)` prepara los datos y devuelve la función a medir."""
+    def decorator(func):
+        BENCHMARKS.append(_Benchmark(name, func, max_size, scales))
+        return func
+    return decorator
+
+
+# ---------- API ----------
+
+@benchmark('api.get_users')
+def bench_get_users(env: BenchmarkEnv, size: int):
+    client = env.client(env.data(size, 0))
+    return client.get_users
+
+
+@benchmark('api.get_payments')
+def bench_get_payments(env: BenchmarkEnv, size: int):
+    client = env.client(env.payments_data(size))
+    return client.get_payments
+
+
+@benchmark('api.iter_payments')
+def bench_iter_payments(env: BenchmarkEnv, size: int):
+    client = env.client(env.payments_data(size))
+    return lambda: sum(len(page) for page in client.iter_payments())
+
+
+# ---------- Formato de filas y tablas ----------
+
+@benchmark('ui.format_payment_rows')
+def bench_format_payment_rows(env: BenchmarkEnv, size: int):
+    from modules.payments import format_payment_row
+    payments = Payment.from_list(env.payments_data(size).iter_payments())
+    return lambda: [format_payment_row(payment) for payment in payments]
+
+
+def _wait_background(window, key: str):
+    """Procesa eventos de Tk hasta que terminen la carga `key` de la ventana y el llenado de su tabla."""
+    while window.runner.is_running(key) or window.populator.is_running():
+        window.update()
+        time.sleep(0.001)
+
+
+@benchmark('ui.users_load_users')
+def bench_users_load_users(env: BenchmarkEnv, size: int):
+    from modules.users import UsersWindow
+    from modules.data_store import DataStore
+    root = env.root()
+    users = list(env.data(size, 0).iter_subscribers())
+    client = APIClient(base_url='http://127.0.0.1:9', deadline=None)
+    # La ventana se crea vacía; la carga medida recibe `size` suscriptores ya descargados
+    client.prime('/users/', [], params={'active_only': 'false'})
+    window = env.track(UsersWindow(root, client))
+    _wait_background(window, 'suscriptores')
+
+    def run():
+        client.prime('/users/', users, params={'active_only': 'false'})
+        # Almacén vacío en cada repetición: se mide la primera carga, no una recarga sin cambios
+        window.store = DataStore(client, window.runner)
+        window.store.subscribe('users', window.on_users_changed)
+        window.load_users()
+        _wait_background(window, 'suscriptores')
+        window.update_idletasks()
+    return run
+
+
+@benchmark('ui.reports_display_report')
+def bench_reports_display_report(env: BenchmarkEnv, size: int):
+    from modules.reports import ReportsWindow
+    root = env.root()
+    rows = list(env.payments_data(size).iter_report_pagos_usuario())
+    window = env.track(ReportsWindow(root, APIClient(base_url='http://127.0.0.1:9')))
+
+    def run():
+        window.display_report("Detalle de Pagos por Usuario", PAGOS_USUARIO_HEADERS, rows)
+        _wait_background(window, 'reporte')
+        window.update_idletasks()
+    return run
+
+
+# ---------- Reportes locales ----------
+
+@benchmark('report.local_morosos')
+def bench_local_morosos(env: BenchmarkEnv, size: int):
+    engine = env.report_engine(size)
+    today = env.payments_data(size).today
+
+    def run():
+        # Sin el último pago guardado: se mide el cálculo completo
+        engine.update_payments()
+        engine.morosos(today)
+    return run
+
+
+@benchmark('report.local_ingresos')
+def bench_local_ingresos(env: BenchmarkEnv, size: int):
+    from report_engine import ReportFilter
+    engine = env.report_engine(size)
+    today = env.payments_data(size).today
+    filters = ReportFilter(end=today, metodo='Efectivo')
+    return lambda: engine.ingresos(filters)
+
+
+@benchmark('report.local_group_by_usuario')
+def bench_local_group_by_usuario(env: BenchmarkEnv, size: int):
+    engine = env.report_engine(size)
+    return lambda: engine.group_by('id_usuario')
+
+
+# ---------- Exportación ----------
+
+@benchmark('export.receipt', scales=False)
+def bench_receipt(env: BenchmarkEnv, size: int):
+    from modules.pdf_generator import generate_receipt
+    payment = env.payments_data(1_000).payment(1)
+    pago_info = {'IdPago': payment['id_pago'], 'Monto': payment['monto'], 'MesPagado': payment['mes_pagado'],
+                 'FechaPago': payment['fecha_pago'], 'MetodoPago': payment['metodo_pago'],
+                 'Observacion': payment['observacion']}
+    user_info = {'Nombre': payment['nombre'], 'Apellido': payment['apellido'],
+                 'Direccion': payment['direccion'], 'NumeroPaja': payment['numero_paja']}
+    return lambda: generate_receipt(pago_info, user_info)
+
+
+@benchmark('export.report_pdf', max_size=100_000)
+def bench_report_pdf(env: BenchmarkEnv, size: int):
+    from modules.pdf_generator import generate_report_pdf
+    rows = list(env.payments_data(size).iter_report_pagos_usuario())
+    return lambda: generate_report_pdf("Detalle de Pagos por Usuario", PAGOS_USUARIO_HEADERS, rows)
+
+
+@benchmark('export.excel', max_size=100_000)
+def bench_export_excel(env: BenchmarkEnv, size: int):
+    from modules.reports import ReportsWindow
+    root = env.root()
+    window = env.track(ReportsWindow(root, APIClient(base_url='http://127.0.0.1:9')))
+    window.current_report_title = "Detalle de Pagos por Usuario"
+    window.current_report_headers = PAGOS_USUARIO_HEADERS
+    window.current_report_data = list(env.payments_data(size).iter_report_pagos_usuario())
+    env.save_path = os.path.join(env.tmpdir, f'reporte-{size}.xlsx')
+    return window.export_excel
+
+
+# ---------- Ejecución ----------
+
+class _DialogRecorder:
+    """Reemplaza los cuadros de diálogo modales para que no bloqueen la medición."""
+
+    def __init__(self, env: BenchmarkEnv):
+        self.errors: List[str] = []
+        self._patches = [
+            mock.patch('tkinter.filedialog.asksaveasfilename', side_effect=lambda *a, **kw: env.save_path),
+            mock.patch('tkinter.messagebox.showinfo'),
+            mock.patch('tkinter.messagebox.showwarning'),
+            mock.patch('tkinter.messagebox.showerror', side_effect=self._error),
+            # Los recibos se abren con el visor del sistema al generarse
+            mock.patch('os.system', return_value=0),
+        ]
+        if hasattr(os, 'startfile'):
+            self._patches.append(mock.patch('os.startfile'))
+
+    def _error(self, title, message, **kwargs):
+        self.errors.append(f"{title}: {message}")
+
+    def __enter__(self):
+        for patch in self._patches:
+            patch.start()
+        return self
+
+    def __exit__(self, *exc):
+        for patch in reversed(self._patches):
+            patch.stop()
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, repeat: int = DEFAULT_REPEAT, only: Optional[str] = None,
+                   all_sizes: bool = False, log=print) -> Dict:
+    """Ejecuta las pruebas seleccionadas y devuelve los resultados en formato serializable."""
+    env = BenchmarkEnv()
+    results = {}
+    cwd = os.getcwd()
+    # Recibos y reportes se guardan relativos al directorio actual
+    os.chdir(env.tmpdir)
+    try:
+        with _DialogRecorder(env) as dialogs:
+            for case in BENCHMARKS:
+                if only and not re.search(only, case.name):
+                    continue
+                for size in (sizes if case.scales else sizes[:1]):
+                    size = size if case.scales else 1
+                    key = f"{case.name}@{size}"
+                    if case.max_size and size > case.max_size and not all_sizes:
+                        results[key] = {'name': case.name, 'size': size, 'status': 'omitido', 'size_limited': True,
+                                        'reason': f"tamaño mayor que {case.max_size} (usar --all-sizes)"}
+                        log(f"{key:<40} omitido")
+                        continue
+                    results[key] = _run_case(env, dialogs, case, size, repeat)
+                    result = results[key]
+                    if result['status'] == 'ok':
+                        log(f"{key:<40} mediana {result['median']:.4f} s  (mín {result['min']:.4f} s)")
+                    else:
+                        log(f"{key:<40} {result['status']}: {result.get('reason', '')}")
+    finally:
+        os.chdir(cwd)
+        env.close()
+
+    return {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def _run_case(env: BenchmarkEnv, dialogs: _DialogRecorder, case: _Benchmark, size: int, repeat: int) -> Dict:
+    timings = []
+    try:
+        for _ in range(repeat):
+            run = case.func(env, size)
+            dialogs.errors.clear()
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+            env.cleanup()
+            if dialogs.errors:
+                return {'name': case.name, 'size': size, 'status': 'error', 'reason': dialogs.errors[0]}
+    except SkipBenchmark as e:
+        return {'name': case.name, 'size': size, 'status': 'omitido', 'reason': str(e)}
+    except Exception as e:
+        return {'name': case.name, 'size': size, 'status': 'error', 'reason': f"{type(e).__name__}: {e}"}
+    finally:
+        env.cleanup()
+    return {
+        'name': case.name, 'size': size, 'status': 'ok', 'repeat': repeat,
+        'median': statistics.median(timings), 'min': min(timings), 'max': max(timings),
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold: float = DEFAULT_THRESHOLD) -> List[Dict]:
+    """Compara las medianas con una línea base y devuelve las pruebas que empeoraron más de `threshold`."""
+    regressions = []
+    for key, result in current['results'].items():
+        base = baseline.get('results', {}).get(key)
+        if result.get('status') != 'ok' or not base or base.get('status') != 'ok' or not base['median']:
+            continue
+        ratio = result['median'] / base['median']
+        if ratio > 1 + threshold:
+            regressions.append({'benchmark': key, 'baseline': base['median'],
+                                'current': result['median'], 'ratio': ratio})
+    return regressions
+
+
+def unmeasured(current: Dict) -> List[Dict]:
+    """Pruebas sin medición por el entorno (p. ej. sin display) o por un error.
+
+    Las omitidas por tamaño (`--all-sizes`) no cuentan: se omiten igual en la línea base.
+    """
+    return [{'benchmark': key, 'status': result.get('status'), 'reason': result.get('reason', '')}
+            for key, result in current['results'].items()
+            if result.get('status') != 'ok' and not result.get('size_limited')]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks del frontend")
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                        help="cantidades de filas separadas por comas")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--only', help="expresión regular para elegir pruebas (p. ej. '^api\\.')")
+    parser.add_argument('--all-sizes', action='store_true', help="no limitar el tamaño de las exportaciones")
+    parser.add_argument('--output', help="archivo JSON donde guardar los resultados")
+    parser.add_argument('--compare', help="archivo JSON de línea base contra el cual comparar")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="aumento relativo tolerado antes de marcar una regresión (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    results = run_benchmarks(sizes, args.repeat, args.only, args.all_sizes)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESIÓN {regression['benchmark']}: {regression['baseline']:.4f} s -> "
+                  f"{regression['current']:.4f} s (x{regression['ratio']:.2f})")
+        # Una prueba que no se pudo medir no demuestra que no haya regresión
+        missing = unmeasured(results)
+        for item in missing:
+            print(f"SIN MEDIR {item['benchmark']} ({item['status']}): {item['reason']}")
+        if regressions or missing:
+            return 1
+        print("Sin regresiones respecto a la línea base.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,386 @@
+# frontend/tools/data_generator.py
+import datetime
+import threading
+from typing import Optional, Dict, List, Iterator, Tuple
+
+NOMBRES = ('José', 'María', 'Juan', 'Ana', 'Carlos', 'Rosa', 'Luis', 'Carmen', 'Pedro', 'Marta',
+           'Miguel', 'Lucía', 'Jorge', 'Elena', 'Mario', 'Sofía', 'Óscar', 'Julia', 'Edgar', 'Gladys',
+           'Byron', 'Ingrid', 'Erick', 'Claudia', 'Walter', 'Brenda', 'Marvin', 'Karla', 'Otto', 'Sandra')
+APELLIDOS = ('López', 'García', 'Pérez', 'Hernández', 'Martínez', 'González', 'Rodríguez', 'Morales',
+             'Ramírez', 'Cruz', 'Reyes', 'Castillo', 'Ortiz', 'Mendoza', 'Chávez', 'Juárez', 'Ajú',
+             'Xicay', 'Coj', 'Tzul', 'Barrios', 'Estrada', 'Gómez', 'Sandoval', 'Velásquez', 'Orellana')
+CALLES = ('Calle Principal', 'Avenida Central', 'Barrio El Centro', 'Colonia Las Flores',
+          'Aldea San José', 'Sector La Cumbre', 'Callejón del Río', 'Cantón Norte')
+MESES = ('Enero', 'Febrero', 'Marzo', 'Abril', 'Mayo', 'Junio', 'Julio', 'Agosto',
+         'Septiembre', 'Octubre', 'Noviembre', 'Diciembre')
+METODOS = ('Efectivo', 'Efectivo', 'Efectivo', 'Crédito', 'Transferencia')
+MONTOS = (25.0, 25.0, 30.0, 35.0, 50.0)
+OBSERVACIONES = (None, None, None, None, None, None, 'Pago con mora', 'Pagó un familiar')
+
+PAGOS_USUARIO_HEADERS = ['ID Pago', 'Nombre', 'Apellido', 'N° Paja', 'Fecha Pago', 'Monto (Q)',
+                         'Método', 'Mes Pagado']
+
+# Mes del primer pago generado; los meses siguientes se asignan en orden de id
+DEFAULT_START_MONTH = (2018, 1)
+_MASK = (1 << 64) - 1
+
+
+def _mix(seed: int, index: int, salt: int = 0) -> int:
+    """Hash determinista de 64 bits (splitmix64) de un índice."""
+    z = (seed * 0x9E3779B97F4A7C15 + index * 0xBF58476D1CE4E5B9 + salt * 0x94D049BB133111EB) & _MASK
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK
+    return z ^ (z >> 31)
+
+
+class SyntheticData:
+    """Datos de prueba reproducibles: suscriptores, pagos y administradores.
+
+    Los registros base no se guardan en memoria: cada uno se calcula a partir
+    de la semilla y su índice, por lo que 5 millones de pagos ocupan lo mismo
+    que 1000. Cada suscriptor paga un mes por ciclo (el pago `i` pertenece al
+    suscriptor `i % subscribers`), de modo que no hay pagos duplicados por mes.
+    Las altas y modificaciones se guardan aparte, encima de los datos base.
+    """
+
+    def __init__(self, subscribers: int = 50_000, payments: int = 5_000_000, seed: int = 1,
+                 start_month: Tuple[int, int] = DEFAULT_START_MONTH):
+        if subscribers <= 0:
+            raise ValueError("Se necesita al menos un suscriptor")
+        self.subscriber_count = subscribers
+        self.payment_count = payments
+        self.seed = seed
+        self.start_month = start_month
+        self._lock = threading.Lock()
+        self._user_overrides: Dict[int, Dict] = {}
+        self._subscriber_cache: Optional[List[Dict]] = None
+        self._new_users: List[Dict] = []
+        self._new_payments: List[Dict] = []
+        self._new_payment_keys = set()
+        self._admins: Dict[int, Dict] = {
+            1: {'id_admin': 1, 'usuario': 'admin', 'nombre': 'Administrador', 'rol': 'Presidente', 'estado': True},
+            2: {'id_admin': 2, 'usuario': 'tesorero', 'nombre': 'Tesorero', 'rol': 'Tesorero', 'estado': True},
+            3: {'id_admin': 3, 'usuario': 'secretario', 'nombre': 'Secretario', 'rol': 'Secretario', 'estado': True},
+        }
+        self._passwords: Dict[int, str] = {1: 'admin123', 2: 'tesorero123', 3: 'secretario123'}
+        # Incrementa con cada escritura (sirve de ETag)
+        self.version = 0
+        self._ingresos: Optional[Tuple[int, Dict]] = None
+
+    # ---------- Suscriptores ----------
+
+    @property
+    def total_subscribers(self) -> int:
+        return self.subscriber_count + len(self._new_users)
+
+    def subscriber(self, user_id: int) -> Optional[Dict]:
+        """Suscriptor con id `user_id` (1..N), incluidos los cambios posteriores."""
+        if user_id in self._user_overrides:
+            return self._user_overrides[user_id]
+        if 1 <= user_id <= self.subscriber_count:
+            return self._base_subscribers[user_id - 1]
+        if self.subscriber_count < user_id <= self.total_subscribers:
+            return self._new_users[user_id - self.subscriber_count - 1]
+        return None
+
+    @property
+    def _base_subscribers(self) -> List[Dict]:
+        """Suscriptores base (se generan una sola vez: cada pago los consulta)."""
+        if self._subscriber_cache is None:
+            self._subscriber_cache = [self._base_subscriber(user_id)
+                                      for user_id in range(1, self.subscriber_count + 1)]
+        return self._subscriber_cache
+
+    def iter_subscribers(self, active_only: bool = False) -> Iterator[Dict]:
+        for user_id in range(1, self.total_subscribers + 1):
+            user = self.subscriber(user_id)
+            if not active_only or user['estado']:
+                yield user
+
+    def _base_subscriber(self, user_id: int) -> Dict:
+        h = _mix(self.seed, user_id, 1)
+        return {
+            'id_usuario': user_id,
+            'nombre': NOMBRES[h % len(NOMBRES)],
+            'apellido': f"{APELLIDOS[(h >> 8) % len(APELLIDOS)]} {APELLIDOS[(h >> 16) % len(APELLIDOS)]}",
+            'direccion': f"{CALLES[(h >> 24) % len(CALLES)]} {(h >> 32) % 200 + 1}",
+            'telefono': f"{3 + (h >> 40) % 6}{(h >> 20) % 10_000_000:07d}" if (h >> 44) % 10 else None,
+            'numero_paja': str(user_id),
+            # Aproximadamente 1 de cada 20 suscriptores está inactivo
+            'estado': bool((h >> 48) % 20),
+            'updated_at': None,
+        }
+
+    def create_subscriber(self, data: Dict) -> Dict:
+        with self._lock:
+            if any(user['numero_paja'] == str(data.get('numero_paja')) for user in self._new_users) or \
+                    self._is_base_paja(data.get('numero_paja')):
+                raise ValueError(f"Ya existe un suscriptor con el número de paja {data.get('numero_paja')}")
+            user = {**data, 'id_usuario': self.total_subscribers + 1, 'estado': data.get('estado', True),
+                    'updated_at': self._now()}
+            self._new_users.append(user)
+            self.version += 1
+            return user
+
+    def update_subscriber(self, user_id: int, data: Dict) -> Optional[Dict]:
+        with self._lock:
+            user = self.subscriber(user_id)
+            if user is None:
+                return None
+            user = {**user, **data, 'id_usuario': user_id, 'updated_at': self._now()}
+            self._store_subscriber(user)
+            return user
+
+    def toggle_subscriber(self, user_id: int) -> Optional[Dict]:
+        with self._lock:
+            user = self.subscriber(user_id)
+            if user is None:
+                return None
+            user = {**user, 'estado': not user['estado'], 'updated_at': self._now()}
+            self._store_subscriber(user)
+            return user
+
+    def _store_subscriber(self, user: Dict):
+        """Guarda un suscriptor modificado. Requiere `_lock`."""
+        user_id = user['id_usuario']
+        if user_id > self.subscriber_count:
+            self._new_users[user_id - self.subscriber_count - 1] = user
+        else:
+            self._user_overrides[user_id] = user
+        self.version += 1
+
+    def _is_base_paja(self, numero_paja) -> bool:
+        return str(numero_paja).isdigit() and 1 <= int(numero_paja) <= self.subscriber_count
+
+    # ---------- Pagos ----------
+
+    @property
+    def total_payments(self) -> int:
+        return self.payment_count + len(self._new_payments)
+
+    def payment(self, payment_id: int) -> Optional[Dict]:
+        if 1 <= payment_id <= self.payment_count:
+            return self._base_payment(payment_id - 1)
+        if self.payment_count < payment_id <= self.total_payments:
+            return self._with_subscriber(dict(self._new_payments[payment_id - self.payment_count - 1]))
+        return None
+
+    def iter_payments(self, skip: int = 0, limit: Optional[int] = None, since_id: Optional[int] = None,
+                      search: Optional[str] = None) -> Iterator[Dict]:
+        """Pagos en orden de id, con los mismos filtros que el backend."""
+        if search:
+            ids = self._search_payment_ids(search)
+            if since_id:
+                ids = (payment_id for payment_id in ids if payment_id > since_id)
+        else:
+            # Sin búsqueda los ids son consecutivos: se salta directamente a la página pedida
+            ids = iter(range(max(since_id or 0, 0) + 1 + skip, self.total_payments + 1))
+            skip = 0
+
+        emitted = 0
+        for position, payment_id in enumerate(ids):
+            if position < skip:
+                continue
+            if limit is not None and emitted >= limit:
+                return
+            yield self.payment(payment_id)
+            emitted += 1
+
+    def _search_payment_ids(self, search: str) -> Iterator[int]:
+        """Ids de los pagos cuyo suscriptor coincide con el texto buscado (sin recorrer todos los pagos)."""
+        term = search.lower()
+        user_ids = [user['id_usuario'] for user in self.iter_subscribers()
+                    if term in f"{user['nombre']} {user['apellido']}".lower() or term == str(user['numero_paja'])]
+        base_ids = []
+        for user_id in user_ids:
+            if user_id <= self.subscriber_count:
+                # El pago i pertenece al suscriptor (i % N) + 1
+                base_ids.extend(range(user_id, self.payment_count + 1, self.subscriber_count))
+        base_ids.sort()
+        yield from base_ids
+        wanted = set(user_ids)
+        for offset, payment in enumerate(self._new_payments):
+            if payment['id_usuario'] in wanted:
+                yield self.payment_count + offset + 1
+
+    def _base_payment(self, index: int) -> Dict:
+        user_id = index % self.subscriber_count + 1
+        cycle = index // self.subscriber_count
+        year, month = self._month(cycle)
+        h = _mix(self.seed, index, 2)
+        day = h % 28 + 1
+        payment = {
+            'id_pago': index + 1,
+            'id_usuario': user_id,
+            'fecha_pago': f"{year:04d}-{month:02d}-{day:02d}T{8 + (h >> 8) % 9:02d}:{(h >> 16) % 60:02d}:00",
+            'monto': MONTOS[(h >> 24) % len(MONTOS)],
+            'mes_pagado': f"{MESES[month - 1]} {year}",
+            'metodo_pago': METODOS[(h >> 32) % len(METODOS)],
+            'observacion': OBSERVACIONES[(h >> 40) % len(OBSERVACIONES)],
+            'updated_at': None,
+        }
+        return self._with_subscriber(payment)
+
+    def _with_subscriber(self, payment: Dict) -> Dict:
+        """Agrega los datos del suscriptor que la API incluye en cada pago."""
+        user = self.subscriber(payment['id_usuario']) or {}
+        payment['nombre'] = user.get('nombre')
+        payment['apellido'] = user.get('apellido')
+        payment['numero_paja'] = user.get('numero_paja')
+        payment['direccion'] = user.get('direccion')
+        return payment
+
+    def create_payment(self, data: Dict) -> Dict:
+        with self._lock:
+            user_id = data.get('id_usuario')
+            if self.subscriber(user_id) is None:
+                raise LookupError(f"Suscriptor {user_id} no encontrado")
+            key = (user_id, data.get('mes_pagado'))
+            if key in self._new_payment_keys or self._base_payment_exists(*key):
+                raise ValueError(f"Ya existe un pago de {data.get('mes_pagado')} para este suscriptor")
+            payment = {
+                'id_pago': self.total_payments + 1,
+                'id_usuario': user_id,
+                'fecha_pago': data.get('fecha_pago') or self._now(),
+                'monto': data.get('monto'),
+                'mes_pagado': data.get('mes_pagado'),
+                'metodo_pago': data.get('metodo_pago'),
+                'observacion': data.get('observacion'),
+                'updated_at': self._now(),
+            }
+            self._new_payments.append(payment)
+            self._new_payment_keys.add(key)
+            self.version += 1
+            return self._with_subscriber(dict(payment))
+
+    def _base_payment_exists(self, user_id: int, mes_pagado: str) -> bool:
+        if not isinstance(user_id, int) or not 1 <= user_id <= self.subscriber_count or not mes_pagado:
+            return False
+        try:
+            name, year = mes_pagado.rsplit(' ', 1)
+            month = MESES.index(name) + 1
+            cycle = (int(year) - self.start_month[0]) * 12 + month - self.start_month[1]
+        except ValueError:
+            return False
+        return cycle >= 0 and cycle * self.subscriber_count + user_id - 1 < self.payment_count
+
+    def _month(self, cycle: int) -> Tuple[int, int]:
+        months = self.start_month[0] * 12 + self.start_month[1] - 1 + cycle
+        return months // 12, months % 12 + 1
+
+    @property
+    def today(self) -> datetime.date:
+        """Fecha de referencia de los datos: día 10 del mes siguiente al último pago generado.
+
+        Así quien pagó el último mes en sus primeros días ya supera los 35 días
+        de mora, lo que da un reporte de morosos de tamaño realista.
+        """
+        year, month = self._month(max(self.payment_count - 1, 0) // self.subscriber_count + 1)
+        return datetime.date(year, month, 10)
+
+    # ---------- Reportes ----------
+
+    def report_morosos(self, days: int = 35) -> Dict:
+        """Suscriptores activos cuyo último pago tiene más de `days` días."""
+        today = self.today
+        rows = []
+        last_payments = self._last_payments()
+        for user in self.iter_subscribers(active_only=True):
+            last = last_payments.get(user['id_usuario'])
+            last_date = datetime.date.fromisoformat(last[:10]) if last else None
+            overdue = (today - last_date).days if last_date else None
+            if overdue is None or overdue > days:
+                rows.append([user['id_usuario'], user['nombre'], user['apellido'], user['telefono'] or '',
+                             user['numero_paja'], last[:10] if last else 'Sin pagos',
+                             overdue if overdue is not None else '-'])
+        return {'encabezados': ['ID', 'Nombre', 'Apellido', 'Teléfono', 'N° Paja', 'Último Pago', 'Días Mora'],
+                'datos': rows}
+
+    def _last_payments(self) -> Dict[int, str]:
+        """Fecha del último pago de cada suscriptor."""
+        last = {}
+        first_of_last_cycle = max(self.payment_count - self.subscriber_count, 0)
+        for index in range(first_of_last_cycle, self.payment_count):
+            payment = self._base_payment(index)
+            last[payment['id_usuario']] = payment['fecha_pago']
+        for payment in self._new_payments:
+            if payment['fecha_pago'] > last.get(payment['id_usuario'], ''):
+                last[payment['id_usuario']] = payment['fecha_pago']
+        return last
+
+    def report_ingresos(self) -> Dict:
+        """Total recaudado por mes pagado (recorre todos los pagos; se guarda hasta la próxima escritura)."""
+        if self._ingresos and self._ingresos[0] == self.version:
+            return self._ingresos[1]
+        version = self.version
+        totals: Dict[str, List] = {}
+        for payment_id in range(1, self.total_payments + 1):
+            payment = self.payment(payment_id)
+            entry = totals.setdefault(payment['mes_pagado'], [0, 0.0])
+            entry[0] += 1
+            entry[1] += payment['monto'] or 0
+        rows = [[mes, count, round(total, 2)] for mes, (count, total) in totals.items()]
+        report = {'encabezados': ['Mes', 'Total Pagos', 'Monto Total (Q)'], 'datos': rows}
+        self._ingresos = (version, report)
+        return report
+
+    def iter_report_pagos_usuario(self) -> Iterator[List]:
+        """Filas del reporte de pagos por usuario (se generan a medida que se envían)."""
+        for payment_id in range(1, self.total_payments + 1):
+            p = self.payment(payment_id)
+            yield [p['id_pago'], p['nombre'], p['apellido'], p['numero_paja'], p['fecha_pago'][:10],
+                   p['monto'], p['metodo_pago'], p['mes_pagado']]
+
+    # ---------- Administradores ----------
+
+    def admins(self) -> List[Dict]:
+        return list(self._admins.values())
+
+    def admin(self, admin_id: int) -> Optional[Dict]:
+        return self._admins.get(admin_id)
+
+    def authenticate(self, usuario: str, clave: str) -> Optional[Dict]:
+        for admin_id, admin in self._admins.items():
+            if admin['usuario'] == usuario and self._passwords.get(admin_id) == clave and admin['estado']:
+                return admin
+        return None
+
+    def create_admin(self, data: Dict) -> Dict:
+        with self._lock:
+            if any(admin['usuario'] == data.get('usuario') for admin in self._admins.values()):
+                raise ValueError(f"Ya existe un administrador con el usuario {data.get('usuario')}")
+            admin_id = max(self._admins, default=0) + 1
+            admin = {'id_admin': admin_id, 'usuario': data.get('usuario'), 'nombre': data.get('nombre'),
+                     'rol': data.get('rol'), 'estado': data.get('estado', True)}
+            self._admins[admin_id] = admin
+            self._passwords[admin_id] = data.get('clave', '')
+            self.version += 1
+            return admin
+
+    def update_admin(self, admin_id: int, data: Dict) -> Optional[Dict]:
+        with self._lock:
+            if admin_id not in self._admins:
+                return None
+            data = {key: value for key, value in data.items() if key != 'clave'}
+            self._admins[admin_id] = {**self._admins[admin_id], **data, 'id_admin': admin_id}
+            self.version += 1
+            return self._admins[admin_id]
+
+    def change_admin_password(self, admin_id: int, clave: str) -> bool:
+        with self._lock:
+            if admin_id not in self._admins:
+                return False
+            self._passwords[admin_id] = clave
+            return True
+
+    def delete_admin(self, admin_id: int) -> bool:
+        with self._lock:
+            if self._admins.pop(admin_id, None) is None:
+                return False
+            self._passwords.pop(admin_id, None)
+            self.version += 1
+            return True
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.datetime.now().isoformat(timespec='seconds')
@@ -0,0 +1,444 @@
+# frontend/tools/fake_backend.py
+"""Backend local de prueba con las mismas rutas que usa APIClient.
+
+Uso (desde el directorio frontend):
+
+    python -m tools.fake_backend --subscribers 50000 --payments 5000000 --latency 0.05
+
+Luego se apunta el cliente a http://127.0.0.1:8765 (usuario `admin`, clave `admin123`).
+"""
+import argparse
+import json
+import random
+import re
+import secrets
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Iterable, Iterator
+from urllib.parse import urlsplit, parse_qs
+
+from tools.data_generator import SyntheticData, PAGOS_USUARIO_HEADERS
+
+DEFAULT_PORT = 8765
+# Elementos serializados por bloque al enviar listas grandes
+STREAM_BATCH = 1000
+# Bytes por escritura al limitar el ancho de banda
+WRITE_CHUNK = 16 * 1024
+
+
+class FaultConfig:
+    """Condiciones de red simuladas: latencia, ancho de banda y errores."""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0,
+                 bandwidth: Optional[float] = None,
+                 error_rate: float = 0.0, error_status: int = 503,
+                 reset_rate: float = 0.0, seed: Optional[int] = None):
+        self.latency = latency            # segundos antes de responder
+        self.jitter = jitter              # variación aleatoria (+/-) de la latencia
+        self.bandwidth = bandwidth        # bytes por segundo (None: sin límite)
+        self.error_rate = error_rate      # fracción de peticiones que responden `error_status`
+        self.error_status = error_status
+        self.reset_rate = reset_rate      # fracción de peticiones que cierran la conexión sin responder
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def delay(self) -> float:
+        with self._lock:
+            offset = self._random.uniform(-self.jitter, self.jitter) if self.jitter else 0.0
+        return max(self.latency + offset, 0.0)
+
+    def roll(self) -> Optional[str]:
+        """Decide si la petición actual falla: 'reset', 'error' o None."""
+        with self._lock:
+            value = self._random.random()
+        if value < self.reset_rate:
+            return 'reset'
+        if value < self.reset_rate + self.error_rate:
+            return 'error'
+        return None
+
+
+class _HTTPError(Exception):
+    def __init__(self, status: int, detail: str):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+
+
+class FakeBackendHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server: "FakeBackendServer"
+
+    # (método, patrón de ruta) -> nombre del método que la atiende
+    ROUTES = [
+        ('POST', r'/auth/login', 'login'),
+        ('GET', r'/users/', 'list_users'),
+        ('POST', r'/users/', 'create_user'),
+        ('GET', r'/users/(\d+)', 'get_user'),
+        ('PUT', r'/users/(\d+)', 'update_user'),
+        ('PATCH', r'/users/(\d+)/toggle-status', 'toggle_user'),
+        ('GET', r'/payments/', 'list_payments'),
+        ('POST', r'/payments/', 'create_payment'),
+        ('POST', r'/payments/bulk', 'create_payments_bulk'),
+        ('GET', r'/payments/(\d+)', 'get_payment'),
+        ('GET', r'/reports/morosos', 'report_morosos'),
+        ('GET', r'/reports/ingresos', 'report_ingresos'),
+        ('GET', r'/reports/pagos-usuario', 'report_pagos_usuario'),
+        ('GET', r'/admins/', 'list_admins'),
+        ('POST', r'/admins/', 'create_admin'),
+        ('GET', r'/admins/(\d+)', 'get_admin'),
+        ('PUT', r'/admins/(\d+)', 'update_admin'),
+        ('PATCH', r'/admins/(\d+)/change-password', 'change_password'),
+        ('DELETE', r'/admins/(\d+)', 'delete_admin'),
+    ]
+    _COMPILED = [(method, re.compile(pattern + '$'), name) for method, pattern, name in ROUTES]
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def do_PUT(self):
+        self._dispatch('PUT')
+
+    def do_PATCH(self):
+        self._dispatch('PATCH')
+
+    def do_DELETE(self):
+        self._dispatch('DELETE')
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    # ---------- Despacho ----------
+
+    def _dispatch(self, method: str):
+        url = urlsplit(self.path)
+        self.query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        body = self._read_body()
+        faults = self.server.faults
+
+        delay = faults.delay()
+        if delay:
+            time.sleep(delay)
+        outcome = faults.roll()
+        if outcome == 'reset':
+            self.close_connection = True
+            return
+        if outcome == 'error':
+            self._send_json({'detail': 'Error simulado del servidor'}, faults.error_status)
+            return
+
+        allowed = False
+        for route_method, pattern, name in self._COMPILED:
+            match = pattern.match(url.path)
+            if not match:
+                continue
+            allowed = True
+            if route_method != method:
+                continue
+            try:
+                if name != 'login':
+                    self._check_token()
+                args = [int(group) for group in match.groups()]
+                result = getattr(self, name)(*args, **({'body': body} if method in ('POST', 'PUT', 'PATCH') else {}))
+            except _HTTPError as e:
+                self._send_json({'detail': e.detail}, e.status)
+                return
+            if result is not None:
+                self._send_json(result)
+            return
+        self._send_json({'detail': 'Method Not Allowed' if allowed else 'Not Found'}, 405 if allowed else 404)
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if not length:
+            return None
+        try:
+            return json.loads(self.rfile.read(length))
+        except ValueError:
+            return None
+
+    def _check_token(self):
+        auth = self.headers.get('Authorization', '')
+        if not auth.startswith('Bearer ') or auth[7:] not in self.server.tokens:
+            raise _HTTPError(401, 'No autenticado')
+
+    # ---------- Respuestas ----------
+
+    def _send_json(self, data, status: int = 200, etag: Optional[str] = None):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if etag:
+            self.send_header('ETag', etag)
+        self.end_headers()
+        self._write(body)
+
+    def _send_json_array(self, items: Iterable, etag: Optional[str] = None):
+        """Envía una lista posiblemente enorme por bloques (chunked), sin construirla en memoria."""
+        if etag and self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Transfer-Encoding', 'chunked')
+        if etag:
+            self.send_header('ETag', etag)
+        self.end_headers()
+        for chunk in _encode_array(items):
+            self._write(b'%x\r\n%s\r\n' % (len(chunk), chunk))
+        self._write(b'0\r\n\r\n')
+
+    def _write(self, data: bytes):
+        bandwidth = self.server.faults.bandwidth
+        if not bandwidth:
+            self.wfile.write(data)
+            return
+        for start in range(0, len(data), WRITE_CHUNK):
+            block = data[start:start + WRITE_CHUNK]
+            self.wfile.write(block)
+            time.sleep(len(block) / bandwidth)
+
+    def _etag(self, resource: str) -> str:
+        return f'"{resource}-{self.server.data.version}"'
+
+    # ---------- Autenticación ----------
+
+    def login(self, body):
+        body = body or {}
+        admin = self.server.data.authenticate(body.get('usuario'), body.get('clave'))
+        if admin is None:
+            raise _HTTPError(401, 'Usuario o contraseña incorrectos')
+        token = secrets.token_hex(16)
+        self.server.tokens.add(token)
+        return {
+            'access_token': token,
+            'token_type': 'bearer',
+            'user_data': {'IdAdmin': admin['id_admin'], 'Usuario': admin['usuario'], 'Nombre': admin['nombre'],
+                          'Rol': admin['rol'], 'Estado': 1 if admin['estado'] else 0},
+        }
+
+    # ---------- Usuarios ----------
+
+    def list_users(self):
+        active_only = self.query.get('active_only') == 'true'
+        self._send_json_array(self.server.data.iter_subscribers(active_only),
+                              etag=self._etag(f"users-{active_only}"))
+
+    def get_user(self, user_id):
+        return self._found(self.server.data.subscriber(user_id), 'Usuario no encontrado')
+
+    def create_user(self, body):
+        try:
+            return self.server.data.create_subscriber(body or {})
+        except ValueError as e:
+            raise _HTTPError(400, str(e))
+
+    def update_user(self, user_id, body):
+        return self._found(self.server.data.update_subscriber(user_id, body or {}), 'Usuario no encontrado')
+
+    def toggle_user(self, user_id, body=None):
+        return self._found(self.server.data.toggle_subscriber(user_id), 'Usuario no encontrado')
+
+    # ---------- Pagos ----------
+
+    def list_payments(self):
+        query = self.query
+        limit = int(query['limit']) if 'limit' in query else None
+        payments = self.server.data.iter_payments(
+            skip=int(query.get('skip', 0)), limit=limit,
+            since_id=int(query['since_id']) if 'since_id' in query else None,
+            search=query.get('search'),
+        )
+        self._send_json_array(payments, etag=self._etag(f"payments-{self.path}"))
+
+    def get_payment(self, payment_id):
+        return self._found(self.server.data.payment(payment_id), 'Pago no encontrado')
+
+    def create_payment(self, body):
+        try:
+            return self.server.data.create_payment(body or {})
+        except ValueError as e:
+            raise _HTTPError(400, str(e))
+        except LookupError as e:
+            raise _HTTPError(404, str(e))
+
+    def create_payments_bulk(self, body):
+        if not self.server.bulk:
+            raise _HTTPError(404, 'Not Found')
+        results = []
+        for item in body or []:
+            try:
+                results.append(self.server.data.create_payment(item))
+            except (ValueError, LookupError) as e:
+                results.append({'error': str(e)})
+        return results
+
+    # ---------- Reportes ----------
+
+    def report_morosos(self):
+        return self.server.data.report_morosos()
+
+    def report_ingresos(self):
+        return self.server.data.report_ingresos()
+
+    def report_pagos_usuario(self):
+        # {"encabezados": [...], "datos": [...]} enviado por bloques
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        head = b'{"encabezados": ' + json.dumps(PAGOS_USUARIO_HEADERS, ensure_ascii=False).encode('utf-8') + \
+            b', "datos": '
+        for chunk in [head, *_encode_array(self.server.data.iter_report_pagos_usuario()), b'}']:
+            self._write(b'%x\r\n%s\r\n' % (len(chunk), chunk))
+        self._write(b'0\r\n\r\n')
+
+    # ---------- Administradores ----------
+
+    def list_admins(self):
+        return self.server.data.admins()
+
+    def get_admin(self, admin_id):
+        return self._found(self.server.data.admin(admin_id), 'Administrador no encontrado')
+
+    def create_admin(self, body):
+        try:
+            return self.server.data.create_admin(body or {})
+        except ValueError as e:
+            raise _HTTPError(400, str(e))
+
+    def update_admin(self, admin_id, body):
+        return self._found(self.server.data.update_admin(admin_id, body or {}), 'Administrador no encontrado')
+
+    def change_password(self, admin_id, body):
+        if not self.server.data.change_admin_password(admin_id, (body or {}).get('nueva_clave', '')):
+            raise _HTTPError(404, 'Administrador no encontrado')
+        return {'mensaje': 'Contraseña actualizada'}
+
+    def delete_admin(self, admin_id):
+        if not self.server.data.delete_admin(admin_id):
+            raise _HTTPError(404, 'Administrador no encontrado')
+        return {'mensaje': 'Administrador eliminado'}
+
+    @staticmethod
+    def _found(result, detail: str):
+        if result is None:
+            raise _HTTPError(404, detail)
+        return result
+
+
+def _encode_array(items: Iterable) -> Iterator[bytes]:
+    """Serializa una lista JSON en bloques de `STREAM_BATCH` elementos."""
+    yield b'['
+    separator = b''
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == STREAM_BATCH:
+            yield separator + json.dumps(batch, ensure_ascii=False)[1:-1].encode('utf-8')
+            separator = b','
+            batch = []
+    if batch:
+        yield separator + json.dumps(batch, ensure_ascii=False)[1:-1].encode('utf-8')
+    yield b']'
+
+
+class FakeBackendServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, data: SyntheticData, faults: FaultConfig, bulk: bool, verbose: bool):
+        super().__init__(address, FakeBackendHandler)
+        self.data = data
+        self.faults = faults
+        self.bulk = bulk
+        self.verbose = verbose
+        self.tokens = set()
+
+    def handle_error(self, request, client_address):
+        # Un cliente que abandona una respuesta en streaming (p. ej. solo lee la primera página) no es un error
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+
+class FakeBackend:
+    """Servidor de prueba en un hilo, para benchmarks y pruebas de carga reproducibles.
+
+        with FakeBackend(SyntheticData(1000, 20000), latency=0.02) as backend:
+            client = APIClient(base_url=backend.base_url)
+    """
+
+    def __init__(self, data: Optional[SyntheticData] = None, host: str = '127.0.0.1', port: int = 0,
+                 bulk: bool = True, verbose: bool = False, **faults):
+        self.data = data or SyntheticData()
+        self.faults = FaultConfig(**faults)
+        self.server = FakeBackendServer((host, port), self.data, self.faults, bulk, verbose)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeBackend":
+        self._thread = threading.Thread(target=self.server.serve_forever, name="fake-backend", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backend local de prueba con datos sintéticos")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--subscribers', type=int, default=50_000)
+    parser.add_argument('--payments', type=int, default=5_000_000)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--latency', type=float, default=0.0, help="segundos de latencia por petición")
+    parser.add_argument('--jitter', type=float, default=0.0, help="variación de la latencia (segundos)")
+    parser.add_argument('--bandwidth', type=float, default=None, help="límite en bytes por segundo")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fracción de respuestas con error")
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--reset-rate', type=float, default=0.0, help="fracción de conexiones cortadas")
+    parser.add_argument('--no-bulk', action='store_true', help="sin endpoint POST /payments/bulk")
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args(argv)
+
+    data = SyntheticData(args.subscribers, args.payments, seed=args.seed)
+    backend = FakeBackend(data, host=args.host, port=args.port, bulk=not args.no_bulk, verbose=args.verbose,
+                          latency=args.latency, jitter=args.jitter, bandwidth=args.bandwidth,
+                          error_rate=args.error_rate, error_status=args.error_status,
+                          reset_rate=args.reset_rate, seed=args.seed)
+    print(f"Backend de prueba en {backend.base_url} "
+          f"({args.subscribers} suscriptores, {args.payments} pagos). Ctrl+C para detener.")
+    try:
+        backend.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        backend.server.server_close()
+
+
+if __name__ == '__main__':
+    main()
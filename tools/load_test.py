@@ -0,0 +1,254 @@
+# frontend/tools/load_test.py
+"""Generador de carga: simula varias cajas (sesiones) usando APIClient al mismo tiempo.
+
+Uso (desde el directorio frontend):
+
+    python -m tools.load_test --sessions 8 --duration 60
+    python -m tools.load_test --url http://127.0.0.1:8765 --sessions 20 --mode process \\
+        --mix browse_users=2,search_payments=3,register_payment=4,reports=1
+
+Sin `--url` se inicia un backend de prueba local (`tools.fake_backend`).
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Optional, Dict, List
+
+from api_client import APIClient
+from metrics import Histogram
+from tools.data_generator import SyntheticData, MESES
+from tools.fake_backend import FakeBackend
+
+# Peso relativo de cada operación en una sesión típica de caja
+DEFAULT_MIX = {
+    'browse_users': 2,
+    'view_user': 2,
+    'browse_payments': 2,
+    'search_payments': 3,
+    'register_payment': 4,
+    'reports': 1,
+}
+DEFAULT_THINK_TIME = 0.5
+LATENCY_SAMPLES = 100_000
+
+
+class CashierSession:
+    """Una caja: inicia sesión, carga suscriptores y ejecuta operaciones según la mezcla."""
+
+    def __init__(self, base_url: str, usuario: str, clave: str, mix: Dict[str, float],
+                 think_time: float, seed: int):
+        self.client = APIClient(base_url=base_url)
+        self.usuario = usuario
+        self.clave = clave
+        self.operations = list(mix)
+        self.weights = [mix[name] for name in self.operations]
+        self.think_time = think_time
+        self.random = random.Random(seed)
+        self.users = []
+
+    def login(self):
+        self.client.login(self.usuario, self.clave)
+        # Igual que la aplicación: al entrar se carga la lista de suscriptores
+        self.users = self.client.get_users()
+
+    # ---------- Operaciones ----------
+
+    def browse_users(self):
+        self.users = self.client.get_users()
+
+    def view_user(self):
+        self.client.get_user(self._random_user().id_usuario)
+
+    def browse_payments(self):
+        # La tabla de pagos muestra la primera página en cuanto llega
+        next(self.client.iter_payments(), None)
+
+    def search_payments(self):
+        self.client.get_payments(search=self._random_user().apellido.split()[0])
+
+    def register_payment(self):
+        year = self.random.randint(2018, 2030)
+        self.client.create_payment({
+            'id_usuario': self._random_user().id_usuario,
+            'fecha_pago': time.strftime('%Y-%m-%d'),
+            'monto': self.random.choice((25.0, 30.0, 50.0)),
+            'mes_pagado': f"{self.random.choice(MESES)} {year}",
+            'metodo_pago': self.random.choice(('Efectivo', 'Crédito', 'Transferencia')),
+            'observacion': None,
+        })
+
+    def reports(self):
+        self.random.choice((self.client.get_morosos_report, self.client.get_ingresos_report,
+                            self.client.get_pagos_usuario_report))()
+
+    def _random_user(self):
+        return self.random.choice(self.users)
+
+    # ---------- Ciclo ----------
+
+    def run(self, duration: float, max_operations: Optional[int] = None) -> Dict[str, Dict]:
+        """Ejecuta operaciones hasta agotar `duration` y devuelve tiempos y errores por operación."""
+        stats: Dict[str, Dict] = {}
+        self._timed(stats, 'login', self.login)
+        deadline = time.monotonic() + duration
+        done = 0
+        while time.monotonic() < deadline and (max_operations is None or done < max_operations):
+            if not self.users:
+                break
+            name = self.random.choices(self.operations, self.weights)[0]
+            self._timed(stats, name, getattr(self, name))
+            done += 1
+            if self.think_time:
+                time.sleep(self.random.expovariate(1 / self.think_time))
+        self.client.close()
+        return stats
+
+    @staticmethod
+    def _timed(stats: Dict[str, Dict], name: str, operation):
+        entry = stats.setdefault(name, {'latencies': [], 'errors': 0, 'duplicates': 0, 'error_samples': []})
+        start = time.perf_counter()
+        try:
+            operation()
+        except Exception as e:
+            if APIClient._is_duplicate_error(e):
+                # Mes ya pagado: respuesta válida del servidor, no un fallo
+                entry['duplicates'] += 1
+            else:
+                entry['errors'] += 1
+                if len(entry['error_samples']) < 3:
+                    entry['error_samples'].append(f"{type(e).__name__}: {str(e)[:200]}")
+                return
+        entry['latencies'].append(time.perf_counter() - start)
+
+
+def _run_session(args) -> Dict[str, Dict]:
+    """Punto de entrada de cada sesión (también en procesos separados)."""
+    base_url, usuario, clave, mix, think_time, seed, duration, max_operations = args
+    session = CashierSession(base_url, usuario, clave, mix, think_time, seed)
+    return session.run(duration, max_operations)
+
+
+def run_load(base_url: str, sessions: int, duration: float, mix: Dict[str, float] = None,
+             mode: str = 'thread', think_time: float = DEFAULT_THINK_TIME,
+             usuario: str = 'admin', clave: str = 'admin123', seed: int = 1,
+             max_operations: Optional[int] = None) -> Dict:
+    """Ejecuta `sessions` cajas en paralelo y devuelve el resumen por operación."""
+    mix = mix or DEFAULT_MIX
+    jobs = [(base_url, usuario, clave, mix, think_time, seed + i, duration, max_operations)
+            for i in range(sessions)]
+    executor_cls = ProcessPoolExecutor if mode == 'process' else ThreadPoolExecutor
+    start = time.perf_counter()
+    with executor_cls(max_workers=sessions) as executor:
+        results = list(executor.map(_run_session, jobs))
+    elapsed = time.perf_counter() - start
+    return summarize(results, elapsed, sessions)
+
+
+def summarize(results: List[Dict[str, Dict]], elapsed: float, sessions: int) -> Dict:
+    merged: Dict[str, Dict] = {}
+    for stats in results:
+        for name, entry in stats.items():
+            target = merged.setdefault(name, {'histogram': Histogram(LATENCY_SAMPLES), 'errors': 0,
+                                              'duplicates': 0, 'error_samples': []})
+            for latency in entry['latencies']:
+                target['histogram'].add(latency)
+            target['errors'] += entry['errors']
+            target['duplicates'] += entry['duplicates']
+            target['error_samples'].extend(entry['error_samples'][:3 - len(target['error_samples'])])
+
+    operations = {}
+    for name, entry in sorted(merged.items()):
+        ok = entry['histogram'].count
+        total = ok + entry['errors']
+        operations[name] = {
+            'count': total,
+            'errors': entry['errors'],
+            'throughput': total / elapsed if elapsed else 0.0,
+            'error_rate': entry['errors'] / total if total else 0.0,
+            'duplicates': entry['duplicates'],
+            'latency': entry['histogram'].summary(),
+            'error_samples': entry['error_samples'],
+        }
+    total = sum(op['count'] for op in operations.values())
+    errors = sum(op['errors'] for op in operations.values())
+    return {
+        'sessions': sessions,
+        'elapsed': elapsed,
+        'throughput': total / elapsed if elapsed else 0.0,
+        'error_rate': errors / total if total else 0.0,
+        'operations': operations,
+    }
+
+
+def print_summary(summary: Dict):
+    print(f"\n{summary['sessions']} sesiones, {summary['elapsed']:.1f} s, "
+          f"{summary['throughput']:.1f} op/s, errores {summary['error_rate']:.1%}\n")
+    print(f"{'operación':<18}{'total':>8}{'op/s':>9}{'error':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for name, op in summary['operations'].items():
+        latency = op['latency']
+        p = [latency.get(key, 0.0) * 1000 for key in ('p50', 'p95', 'p99')]
+        print(f"{name:<18}{op['count']:>8}{op['throughput']:>9.2f}{op['error_rate']:>8.1%}"
+              f"{p[0]:>9.1f}{p[1]:>9.1f}{p[2]:>9.1f}")
+        for sample in op['error_samples']:
+            print(f"    {sample}")
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """Convierte 'browse_users=2,reports=1' en un dict de pesos."""
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if not hasattr(CashierSession, name) or name.startswith('_') or name in ('run', 'login'):
+            raise argparse.ArgumentTypeError(f"operación desconocida: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simula varias cajas usando el backend al mismo tiempo")
+    parser.add_argument('--url', help="backend a probar (por defecto se inicia uno de prueba local)")
+    parser.add_argument('--sessions', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=30.0, help="segundos por sesión")
+    parser.add_argument('--max-operations', type=int, default=None, help="operaciones por sesión")
+    parser.add_argument('--mode', choices=('thread', 'process'), default='thread')
+    parser.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX,
+                        help="pesos por operación, p. ej. 'browse_users=2,register_payment=4'")
+    parser.add_argument('--think-time', type=float, default=DEFAULT_THINK_TIME,
+                        help="pausa media entre operaciones (segundos)")
+    parser.add_argument('--user', default='admin')
+    parser.add_argument('--password', default='admin123')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--subscribers', type=int, default=5_000, help="solo con el backend de prueba")
+    parser.add_argument('--payments', type=int, default=200_000, help="solo con el backend de prueba")
+    parser.add_argument('--latency', type=float, default=0.0, help="solo con el backend de prueba")
+    parser.add_argument('--output', help="archivo JSON donde guardar el resumen")
+    args = parser.parse_args(argv)
+
+    backend = None
+    base_url = args.url
+    if not base_url:
+        backend = FakeBackend(SyntheticData(args.subscribers, args.payments, seed=args.seed),
+                              latency=args.latency).start()
+        base_url = backend.base_url
+        print(f"Backend de prueba en {base_url}")
+
+    try:
+        summary = run_load(base_url, args.sessions, args.duration, args.mix, args.mode, args.think_time,
+                           args.user, args.password, args.seed, args.max_operations)
+    finally:
+        if backend:
+            backend.stop()
+
+    print_summary(summary)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
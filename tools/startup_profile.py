@@ -0,0 +1,125 @@
+# frontend/tools/startup_profile.py
+"""Perfil de arranque: cuánto tarda en importarse la aplicación y qué lo causa.
+
+Uso (desde el directorio frontend):
+
+    python main.py --profile-startup
+    python -m tools.startup_profile --budget-ms 400 --top 20
+
+Importa `ui_main` en un intérprete nuevo con `-X importtime` (varias veces,
+se toma la más rápida) y muestra los módulos que más tardan, al estilo de
+`python -X importtime`. Termina con código 1 si el arranque supera el
+presupuesto o si se cargó alguna dependencia pesada que solo debe importarse
+al usarse (PDF, Excel, httpx, NumPy), para usarlo como prueba de regresión.
+"""
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, NamedTuple
+
+# Módulo que se importa al arrancar (main.py -> ui_main)
+STARTUP_MODULE = 'ui_main'
+# Presupuesto (ms) de importación del arranque
+DEFAULT_BUDGET_MS = 400
+DEFAULT_REPEAT = 3
+DEFAULT_TOP = 15
+# Dependencias que solo deben cargarse al imprimir, exportar, precargar datos o abrir los reportes
+DEFERRED_MODULES = ('reportlab', 'fpdf', 'openpyxl', 'httpx', 'numpy')
+
+FRONTEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class ImportEntry(NamedTuple):
+    name: str
+    depth: int
+    self_us: int
+    cumulative_us: int
+
+
+def parse_importtime(output: str) -> List[ImportEntry]:
+    """Convierte la salida de `-X importtime` en entradas (módulo, nivel, propio, acumulado)."""
+    entries = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # encabezado
+        raw_name = parts[2].rstrip()
+        name = raw_name.lstrip()
+        depth = (len(raw_name) - len(name) - 1) // 2
+        entries.append(ImportEntry(name, depth, int(parts[0]), int(parts[1])))
+    return entries
+
+
+def profile_imports(module: str = STARTUP_MODULE, python: str = sys.executable) -> List[ImportEntry]:
+    """Importa `module` en un intérprete nuevo y devuelve los tiempos de cada importación."""
+    result = subprocess.run([python, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=FRONTEND_DIR, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"No se pudo importar {module}:\n{result.stderr.strip()[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def startup_ms(entries: List[ImportEntry], module: str = STARTUP_MODULE) -> float:
+    """Tiempo total (ms) de importar `module`, incluidas sus dependencias."""
+    for entry in entries:
+        if entry.name == module and entry.depth == 0:
+            return entry.cumulative_us / 1000
+    return sum(entry.cumulative_us for entry in entries if entry.depth == 0) / 1000
+
+
+def deferred_loaded(entries: List[ImportEntry]) -> List[str]:
+    """Dependencias pesadas que se importaron durante el arranque."""
+    loaded = {entry.name.split('.')[0] for entry in entries}
+    return [name for name in DEFERRED_MODULES if name in loaded]
+
+
+def print_report(entries: List[ImportEntry], total_ms: float, top: int):
+    print(f"Importación de {STARTUP_MODULE}: {total_ms:.1f} ms")
+    print(f"{'propio [ms]':>12} | {'acumulado [ms]':>14} | módulo")
+    # Cada módulo una sola vez, los más costosos primero
+    by_name: Dict[str, ImportEntry] = {}
+    for entry in entries:
+        previous = by_name.get(entry.name)
+        if previous is None or entry.cumulative_us > previous.cumulative_us:
+            by_name[entry.name] = entry
+    ranked = sorted(by_name.values(), key=lambda entry: entry.cumulative_us, reverse=True)
+    for entry in ranked[:top]:
+        print(f"{entry.self_us / 1000:12.1f} | {entry.cumulative_us / 1000:14.1f} | "
+              f"{entry.name}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Perfil de tiempos de importación del arranque")
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS,
+                        help="tiempo máximo de importación antes de marcar una regresión")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help="veces que se mide (se toma la más rápida)")
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP, help="módulos a mostrar")
+    args = parser.parse_args(argv)
+
+    # La primera medición también compila los .pyc; la más rápida es la más representativa
+    runs = [profile_imports() for _ in range(max(1, args.repeat))]
+    entries = min(runs, key=startup_ms)
+    total_ms = startup_ms(entries)
+    print_report(entries, total_ms, args.top)
+
+    failed = False
+    loaded = deferred_loaded(entries)
+    if loaded:
+        print(f"REGRESIÓN: se cargan al arrancar dependencias que deben importarse al usarse: "
+              f"{', '.join(loaded)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f"REGRESIÓN: el arranque tarda {total_ms:.1f} ms (presupuesto {args.budget_ms:.0f} ms)")
+        failed = True
+    if failed:
+        return 1
+    print(f"Arranque dentro del presupuesto ({args.budget_ms:.0f} ms).")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,15 +1,26 @@
 # frontend/ui_main.py
 import customtkinter as ctk
+import importlib.util
 from tkinter import messagebox
 from modules.users import UsersWindow
 from modules.login import LoginWindow
 from api_client import APIClient
+from local_cache import DEFAULT_CACHE_PATH
+from offline_queue import DEFAULT_QUEUE_PATH
+from sync_engine import DEFAULT_REPLICA_PATH
+from modules.background import runner_for
+from modules.data_store import store_for
 import sys
 
-# Importar todos los módulos adaptados
-from modules.payments import PaymentsWindow
-from modules.reports import ReportsWindow
-from modules.admins import AdminsWindow
+# Espera (ms) tras mostrar la primera pantalla antes de precargar las demás pestañas,
+# para que su petición no compita con la de la pantalla visible
+PREFETCH_DELAY_MS = 300
+# Datos que descarga el almacén compartido (no se precargan como respuestas HTTP)
+STORE_REQUESTS = [
+    ("/users/", {'active_only': 'false'}),
+    ("/users/", {'active_only': 'true'}),
+    ("/admins/", {}),
+]
 
 class App(ctk.CTk):
     def __init__(self):
@@ -20,12 +31,22 @@ class App(ctk.CTk):
         self.grid_rowconfigure(0, weight=1)
         self.grid_columnconfigure(1, weight=1)
 
-        # Inicializar cliente API
-        self.api_client = APIClient()
+        # Inicializar cliente API (con caché local en disco, diario de escrituras sin conexión
+        # y réplica local de suscriptores y pagos)
+        self.api_client = APIClient(cache_path=DEFAULT_CACHE_PATH,
+                                    queue_path=DEFAULT_QUEUE_PATH,
+                                    replica_path=DEFAULT_REPLICA_PATH)
         
         self.current_user = None
         self.login_window = None
         self.current_frame = None
+        # Ventanas ya construidas, por nombre; cada una se crea al visitarla por primera vez
+        self.frames = {}
+        # Pool compartido para las llamadas a la API de todas las ventanas
+        self.runner = runner_for(self)
+        # Suscriptores, pagos y administradores compartidos por todas las ventanas
+        self.store = store_for(self, self.api_client)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
 
         self.show_login()
 
@@ -37,20 +58,15 @@ class App(ctk.CTk):
         self.current_user = self.login_window.user_data
         
         if self.current_user and self.current_user.get('Estado', 0) == 1:
-            # Inicializar todas las ventanas/frames del sistema
-            # Pasar api_client a cada módulo
-            self.users_frame = UsersWindow(self, self.api_client)
-            
-            # Inicializar todos los módulos con api_client
-            self.payments_frame = PaymentsWindow(self, self.api_client)
-            self.reports_frame = ReportsWindow(self, self.api_client)
-            self.admins_frame = AdminsWindow(self, self.current_user, self.api_client)
-            
             # Configurar la UI principal
             self.setup_ui()
             
-            # Seleccionar el frame inicial
+            # Seleccionar el frame inicial: solo se construye (y consulta la API) esta ventana;
+            # las demás se crean al abrirlas por primera vez
             self.select_frame_by_name("users")
+            
+            # Con la primera pantalla ya dibujada, descargar en segundo plano los datos de las demás
+            self.after(PREFETCH_DELAY_MS, self.prefetch_other_tabs)
         else:
             messagebox.showerror("Acceso Denegado", "No se pudo iniciar sesión o la cuenta está inactiva. Cerrando el sistema.")
             self.quit()
@@ -138,30 +154,68 @@ class App(ctk.CTk):
                       hover_color=self.LOGOUT_HOVER_COLOR
                       ).grid(row=7, column=0, sticky="ew", padx=20, pady=(5, 20))
 
+    def prefetch_other_tabs(self):
+        """Precarga en segundo plano los datos de las pestañas que todavía no se abrieron."""
+        if self.current_user is None:
+            return
+        # Pagos y administradores van al almacén: las ventanas abrirán con los datos listos
+        self.store.ensure('payments')
+        if self.current_user['Rol'] == 'Presidente':
+            self.store.ensure('admins')
+        # Con NumPy los reportes se calculan en el equipo a partir del almacén y no queda
+        # nada que precargar (el detalle de pagos del servidor puede ser enorme)
+        if importlib.util.find_spec('numpy') is None:
+            self.runner.submit('precarga', self.fetch_other_tabs_data)
+
+    def fetch_other_tabs_data(self):
+        """Corre en el pool: no toca widgets, solo deja los reportes listos en `api_client`."""
+        # httpx/asyncio se cargan aquí, fuera del arranque
+        from async_api_client import prefetch_initial_data
+        prefetch_initial_data(self.api_client, skip=STORE_REQUESTS)
+
+    def create_frame(self, name):
+        """Construye la ventana `name` (la primera vez que se abre).
+
+        Los módulos de las ventanas que no se ven al iniciar se importan aquí, no al arrancar.
+        """
+        if name == "users":
+            return UsersWindow(self, self.api_client)
+        if name == "payments":
+            from modules.payments import PaymentsWindow
+            return PaymentsWindow(self, self.api_client)
+        if name == "reports":
+            from modules.reports import ReportsWindow
+            return ReportsWindow(self, self.api_client)
+        if name == "admins":
+            from modules.admins import AdminsWindow
+            return AdminsWindow(self, self.current_user, self.api_client)
+        return None
+
     def select_frame_by_name(self, name):
         """Maneja el cambio de contenido en la vista principal."""
         
+        if name == "admins" and self.current_user['Rol'] != 'Presidente':
+            return
+        
         for key, button in self.navigation_buttons.items():
             button.configure(fg_color=self.DEFAULT_BUTTON_COLOR, hover_color=self.HOVER_BUTTON_COLOR) 
             
         if self.current_frame:
             self.current_frame.grid_forget()
 
-        if name == "users":
-            self.current_frame = self.users_frame
-        elif name == "payments":
-            self.current_frame = self.payments_frame
-        elif name == "reports":
-            self.current_frame = self.reports_frame
-            if hasattr(self.reports_frame, 'reset_view'):
-                self.reports_frame.reset_view()
-        elif name == "admins":
-            if self.current_user['Rol'] == 'Presidente':
-                self.current_frame = self.admins_frame
-                if hasattr(self.admins_frame, 'load_admins'):
-                    self.admins_frame.load_admins()
-            else:
-                return
+        frame = self.frames.get(name)
+        created = frame is None
+        if created:
+            frame = self.frames[name] = self.create_frame(name)
+        self.current_frame = frame
+
+        if name == "reports":
+            if hasattr(frame, 'reset_view'):
+                frame.reset_view()
+        elif name == "admins" and not created:
+            # Al crearse la ventana ya carga la lista
+            if hasattr(frame, 'load_admins'):
+                frame.load_admins()
             
         if self.current_frame:
             self.current_frame.grid(row=0, column=1, sticky="nsew", padx=10, pady=10)
@@ -172,6 +226,9 @@ class App(ctk.CTk):
     def logout(self):
         """Cierra la sesión y vuelve a la pantalla de login."""
         if messagebox.askyesno("Cerrar Sesión", "¿Estás seguro de que deseas cerrar la sesión actual?"):
+            # Las respuestas pendientes ya no tienen ventana donde mostrarse
+            self.runner.cancel_all()
+            self.store.clear()
             self.api_client.logout()
             self.current_user = None
             
@@ -181,17 +238,16 @@ class App(ctk.CTk):
             self.setup_ui_for_login_restart()
             self.show_login()
             
+    def on_close(self):
+        """Cancela las cargas en curso, cierra las conexiones y el diario de escrituras y cierra la aplicación."""
+        self.runner.shutdown()
+        self.api_client.close()
+        self.destroy()
+
     def setup_ui_for_login_restart(self):
         """Limpia las referencias a frames."""
         self.current_frame = None
-        try:
-            del self.users_frame
-            del self.payments_frame
-            del self.reports_frame
-            if hasattr(self, 'admins_frame'):
-                del self.admins_frame
-        except AttributeError:
-            pass
+        self.frames = {}
 
 if __name__ == "__main__":
     app = App()